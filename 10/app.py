@@ -11,8 +11,13 @@ from datetime import datetime, timedelta
 from io import StringIO
 import csv
 import os
+import sys
 import logging
 from functools import wraps
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "9"))
+from common import TimerScheduler, SQLiteConnectionPool, GroupCommitWriter
 
 
 app = Flask(__name__)
@@ -28,6 +33,7 @@ log.setLevel(logging.ERROR)
 
 DB_PATH = "exam_system.db"
 REPLICATION_DB_PATH = "marksheet_replicated.db"
+CHEATING_CHECK_INTERVAL = 60
 
 
 students_data = {
@@ -72,6 +78,41 @@ exam_questions_bank = {
 }
 
 
+# Sessions point into exam_questions_bank by topic and question index instead of copying question dicts
+class ActiveExam:
+    __slots__ = ("student_id", "exam_id", "exam_title", "topic", "question_indexes", "current_question",
+                 "answer_codes", "score", "start_time", "duration", "status", "server",
+                 "monitor_timer", "auto_submit_timer")
+
+    def __init__(self, student_id, exam_id, exam_title, topic, question_indexes, duration, server):
+        self.student_id = student_id
+        self.exam_id = exam_id
+        self.exam_title = exam_title
+        self.topic = topic
+        self.question_indexes = array("B", question_indexes)
+        self.current_question = 0
+        self.answer_codes = array("B")
+        self.score = 0
+        self.start_time = time.time()
+        self.duration = duration
+        self.status = "ACTIVE"
+        self.server = server
+        self.monitor_timer = None
+        self.auto_submit_timer = None
+
+    def question(self, position):
+        return exam_questions_bank[self.topic][self.question_indexes[position]]
+
+    def record_answer(self, answer):
+        current_q = self.question(self.current_question)
+        # 0 marks an answer that is not one of the question's options
+        code = current_q["options"].index(answer) + 1 if answer in current_q["options"] else 0
+        self.answer_codes.append(code)
+        if answer == current_q["correct"]:
+            self.score += 1
+        self.current_question += 1
+
+
 active_exams = {}
 posted_exams = []
 server_logs = []
@@ -92,8 +133,78 @@ replica_nodes = [
 # Map student_id to count of cheating warnings
 student_cheating_warnings = {}
 
+def log_timer_error(name, error):
+    add_server_log(f"TIMER ERROR: {name} callback failed: {error}", "ERROR")
+
+# Single scheduler thread drives every exam's cheating checks and auto-submit deadline
+exam_scheduler = TimerScheduler(name="exam-timer", on_error=log_timer_error)
+
+# Pooled WAL-mode connections so request threads reuse handles and cached statements
+db_pool = SQLiteConnectionPool()
+
+# Batches submission inserts from many request threads into one transaction
+submission_writer = GroupCommitWriter(db_pool, name="submission-writer")
+
+# Each entry is one schema version; PRAGMA user_version records how many have been applied
+SCHEMA_MIGRATIONS = [
+    [
+        "CREATE INDEX IF NOT EXISTS idx_submissions_student_time ON submissions(student_id, submission_time)",
+        "CREATE INDEX IF NOT EXISTS idx_submissions_final_marks ON submissions(final_marks)",
+        "CREATE INDEX IF NOT EXISTS idx_posted_exams_status_time ON posted_exams(status, posted_time)"
+    ]
+]
+
+# Queries behind the dashboard poll and student pages; checked at startup for full scans
+HOT_QUERIES = {
+    "my_results": ("""
+        SELECT s.exam_id, e.title, s.score, s.final_marks, s.submission_type,
+               s.submission_time, s.server_used
+        FROM submissions s
+        LEFT JOIN posted_exams e ON s.exam_id = e.id
+        WHERE s.student_id = ?
+        ORDER BY s.submission_time DESC
+    """, (0,)),
+    "available_exams": ("""
+        SELECT id, title, topic, duration, posted_time, expires_at, status
+        FROM posted_exams WHERE status = 'active'
+        ORDER BY posted_time DESC
+    """, ()),
+    "total_submissions": ("SELECT COUNT(*) FROM submissions", ()),
+    "average_score": ("SELECT AVG(final_marks) FROM submissions WHERE final_marks > 0", ()),
+    "unique_students": ("SELECT COUNT(DISTINCT student_id) FROM submissions", ())
+}
+
+
+def apply_schema_migrations(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number in range(version + 1, len(SCHEMA_MIGRATIONS) + 1):
+        conn.execute("BEGIN")
+        try:
+            for statement in SCHEMA_MIGRATIONS[number - 1]:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = number
+    return version
+
+
+def check_query_plans(conn, queries=HOT_QUERIES):
+    problems = []
+    for name, (sql, params) in queries.items():
+        for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+            detail = row[-1]
+            if detail.startswith("SCAN") and "INDEX" not in detail:
+                problems.append(f"{name}: full table scan ({detail})")
+            elif "TEMP B-TREE" in detail:
+                problems.append(f"{name}: sort without index ({detail})")
+    return problems
+
+
 def init_database():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.acquire(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS submissions (
@@ -120,7 +231,8 @@ def init_database():
         )
     """)
     conn.commit()
-    conn.close()
+    apply_schema_migrations(conn)
+    db_pool.release(DB_PATH, conn)
 
 
     conn2 = sqlite3.connect(REPLICATION_DB_PATH)
@@ -156,11 +268,11 @@ def sync_replicas():
     while True:
         time.sleep(20)
         try:
-            conn = sqlite3.connect(DB_PATH)
+            conn = db_pool.acquire(DB_PATH)
             cursor = conn.cursor()
             cursor.execute("SELECT student_id, SUM(final_marks) as total, COUNT(*) as exams FROM submissions GROUP BY student_id")
             data = cursor.fetchall()
-            conn.close()
+            db_pool.release(DB_PATH, conn)
 
 
             conn2 = sqlite3.connect(REPLICATION_DB_PATH)
@@ -289,7 +401,7 @@ def get_server_logs():
 
 @app.route('/api/server/stats', methods=['GET'])
 def get_server_stats():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.acquire(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT COUNT(*) FROM submissions")
     total_submissions = cursor.fetchone()[0]
@@ -297,10 +409,10 @@ def get_server_stats():
     avg_score = cursor.fetchone()[0] or 0
     cursor.execute("SELECT COUNT(DISTINCT student_id) FROM submissions")
     active_students = cursor.fetchone()[0]
-    conn.close()
+    db_pool.release(DB_PATH, conn)
 
 
-    active_exam_students = [sid for sid, exam in active_exams.items() if exam['status'] == 'ACTIVE']
+    active_exam_students = [sid for sid, exam in active_exams.items() if exam.status == 'ACTIVE']
 
 
     return jsonify({
@@ -325,7 +437,7 @@ def post_exam():
     duration = data.get('duration', 300)
 
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.acquire(DB_PATH)
     cursor = conn.cursor()
     expires_at = datetime.now() + timedelta(seconds=duration)
     cursor.execute("""
@@ -334,7 +446,7 @@ def post_exam():
     """, (title, topic, duration, expires_at))
     exam_id = cursor.lastrowid
     conn.commit()
-    conn.close()
+    db_pool.release(DB_PATH, conn)
 
 
     exam_info = {
@@ -357,7 +469,7 @@ def post_exam():
 
 @app.route('/api/student/available_exams', methods=['GET'])
 def get_available_exams():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.acquire(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("""
         SELECT id, title, topic, duration, posted_time, expires_at, status
@@ -365,7 +477,7 @@ def get_available_exams():
         ORDER BY posted_time DESC
     """)
     exams = cursor.fetchall()
-    conn.close()
+    db_pool.release(DB_PATH, conn)
 
 
     exam_list = []
@@ -386,7 +498,7 @@ def get_available_exams():
 
 @app.route('/api/teacher/results', methods=['GET'])
 def get_all_results():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.acquire(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("""
         SELECT s.student_id, s.exam_id, s.score, s.final_marks, s.submission_type,
@@ -396,7 +508,7 @@ def get_all_results():
         ORDER BY s.submission_time DESC
     """)
     submissions = cursor.fetchall()
-    conn.close()
+    db_pool.release(DB_PATH, conn)
 
 
     results = []
@@ -420,7 +532,7 @@ def get_all_results():
 
 @app.route('/api/teacher/download_results', methods=['GET'])
 def download_results():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.acquire(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("""
         SELECT s.student_id, s.exam_id, s.score, s.final_marks, s.submission_type,
@@ -430,7 +542,7 @@ def download_results():
         ORDER BY s.student_id, s.submission_time
     """)
     submissions = cursor.fetchall()
-    conn.close()
+    db_pool.release(DB_PATH, conn)
 
 
     output = StringIO()
@@ -463,11 +575,11 @@ def start_exam():
         return jsonify({"success": False, "message": "Already taking an exam"})
 
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.acquire(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT title, topic, duration FROM posted_exams WHERE id = ? AND status = 'active'", (exam_id,))
     exam = cursor.fetchone()
-    conn.close()
+    db_pool.release(DB_PATH, conn)
 
 
     if not exam:
@@ -475,7 +587,9 @@ def start_exam():
 
 
     title, topic, duration = exam
-    questions = random.sample(exam_questions_bank.get(topic, exam_questions_bank["Data Structures"]), 10)
+    if topic not in exam_questions_bank:
+        topic = "Data Structures"
+    question_indexes = random.sample(range(len(exam_questions_bank[topic])), 10)
 
 
     total_requests += 1
@@ -494,37 +608,20 @@ def start_exam():
             return jsonify({"success": False, "message": "Server overloaded"})
 
 
-    exam_session = {
-        "student_id": student_id,
-        "exam_id": exam_id,
-        "exam_title": title,
-        "questions": questions,
-        "current_question": 0,
-        "answers": [],
-        "score": 0,
-        "start_time": time.time(),
-        "duration": duration,
-        "status": "ACTIVE",
-        "server": server_used
-    }
+    exam_session = ActiveExam(student_id, exam_id, title, topic, question_indexes, duration, server_used)
     active_exams[student_id] = exam_session
 
 
-    def monitoring_thread():
-        check_interval = 60  # check every 60 seconds
-        elapsed = 0
-        while elapsed < duration:
-            time.sleep(check_interval)
-            elapsed += check_interval
-            if student_id not in active_exams or active_exams[student_id]["status"] != "ACTIVE":
-                break
-            # Cheating monitor function
+    def cheating_check():
+        if student_id in active_exams and active_exams[student_id].status == "ACTIVE":
             monitor_cheating_during_exam(student_id)
-        # Once time is up or exam ended, auto-submit if still active
-        if student_id in active_exams and active_exams[student_id]["status"] == "ACTIVE":
+
+    def auto_submit_check():
+        if student_id in active_exams and active_exams[student_id].status == "ACTIVE":
             submit_exam_auto(student_id)
 
-    threading.Thread(target=monitoring_thread, daemon=True).start()
+    exam_session.monitor_timer = exam_scheduler.schedule(CHEATING_CHECK_INTERVAL, cheating_check, interval=CHEATING_CHECK_INTERVAL)
+    exam_session.auto_submit_timer = exam_scheduler.schedule(duration, auto_submit_check)
 
     add_server_log(f"ACTIVE EXAM: Student {student_id} giving {title}", "INFO")
 
@@ -541,17 +638,17 @@ def monitor_cheating_during_exam(student_id):
         student_cheating_warnings[student_id] = count
         session = active_exams.get(student_id)
         if session:
-            base_score = session.get("score", 0)
-            exam_title = session.get("exam_title", "Unknown")
+            base_score = session.score
+            exam_title = session.exam_title
             if count == 1:
                 # First offence - reduce score by 50%
                 new_score = base_score // 2
-                session["score"] = new_score
+                session.score = new_score
                 add_server_log(f"CHEATING WARNING: Student {student_id} caught cheating - score reduced to {new_score}/10 for exam '{exam_title}'", "WARNING")
             elif count >= 2:
                 # Second offence - fail exam
-                session["score"] = 0
-                session["status"] = "CHEATING_FAILED"
+                session.score = 0
+                session.status = "CHEATING_FAILED"
                 add_server_log(f"CHEATING FAILED: Student {student_id} caught cheating again - exam '{exam_title}' failed with score 0", "ERROR")
                 submit_exam_auto(student_id)
                 student_cheating_warnings[student_id] = 0  # reset counter after failure
@@ -568,26 +665,26 @@ def get_question():
 
 
     session_data = active_exams[student_id]
-    elapsed = time.time() - session_data["start_time"]
-    remaining = max(0, session_data["duration"] - elapsed)
+    elapsed = time.time() - session_data.start_time
+    remaining = max(0, session_data.duration - elapsed)
 
 
     if remaining <= 0:
         return jsonify({"success": False, "time_expired": True})
 
 
-    if session_data["current_question"] >= len(session_data["questions"]):
+    if session_data.current_question >= len(session_data.question_indexes):
         return jsonify({"success": False, "completed": True})
 
 
-    current_q = session_data["questions"][session_data["current_question"]]
+    current_q = session_data.question(session_data.current_question)
 
 
     return jsonify({
         "success": True,
         "question": current_q["q"],
         "options": current_q["options"],
-        "question_number": session_data["current_question"] + 1,
+        "question_number": session_data.current_question + 1,
         "total_questions": 10,
         "remaining_time": int(remaining)
     })
@@ -605,16 +702,13 @@ def submit_answer():
 
 
     session_data = active_exams[student_id]
-    current_q = session_data["questions"][session_data["current_question"]]
-    session_data["answers"].append(answer)
-
-
-    if answer == current_q["correct"]:
-        session_data["score"] += 1
+    session_data.record_answer(answer)
+    return jsonify({"success": True, "next_question": session_data.current_question < 10})
 
 
-    session_data["current_question"] += 1
-    return jsonify({"success": True, "next_question": session_data["current_question"] < 10})
+def cancel_exam_timers(session_data):
+    exam_scheduler.cancel(session_data.monitor_timer)
+    exam_scheduler.cancel(session_data.auto_submit_timer)
 
 
 @app.route('/api/student/submit_exam', methods=['POST'])
@@ -628,23 +722,22 @@ def submit_exam():
 
 
     with submission_lock:
+        if student_id not in active_exams:
+            return jsonify({"success": False})
         session_data = active_exams[student_id]
-        session_data["status"] = "SUBMITTED"
-        score = session_data["score"]
+        cancel_exam_timers(session_data)
+        session_data.status = "SUBMITTED"
+        score = session_data.score
         final_marks = score * 10
-        server_used = session_data["server"]
-        exam_id = session_data["exam_id"]
-        exam_title = session_data["exam_title"]
+        server_used = session_data.server
+        exam_id = session_data.exam_id
+        exam_title = session_data.exam_title
 
 
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("""
+        submission_written = submission_writer.write(DB_PATH, [("""
             INSERT INTO submissions (student_id, exam_id, score, final_marks, submission_type, server_used)
             VALUES (?, ?, ?, ?, 'manual', ?)
-        """, (student_id, exam_id, score, final_marks, server_used))
-        conn.commit()
-        conn.close()
+        """, (student_id, exam_id, score, final_marks, server_used))])
 
 
         add_server_log(f"MANUAL SUBMIT: Student {student_id} - {exam_title} - Score: {score}/10", "SUCCESS")
@@ -652,6 +745,8 @@ def submit_exam():
         del active_exams[student_id]
 
 
+    # Wait for the batched commit so the student's results page already shows this submission
+    submission_written.result()
     return jsonify({"success": True, "score": score, "final_marks": final_marks})
 
 
@@ -661,28 +756,27 @@ def submit_exam_auto(student_id):
 
 
     with submission_lock:
+        if student_id not in active_exams:
+            return
         session_data = active_exams[student_id]
-        status = session_data.get("status", "ACTIVE")
+        cancel_exam_timers(session_data)
+        status = session_data.status
         if status == "CHEATING_FAILED":
             final_score = 0
         else:
-            final_score = session_data["score"]
+            final_score = session_data.score
 
-        session_data["status"] = "AUTO_SUBMITTED"
+        session_data.status = "AUTO_SUBMITTED"
         final_marks = final_score * 10
-        server_used = session_data["server"]
-        exam_id = session_data["exam_id"]
-        exam_title = session_data["exam_title"]
+        server_used = session_data.server
+        exam_id = session_data.exam_id
+        exam_title = session_data.exam_title
 
 
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("""
+        submission_writer.write(DB_PATH, [("""
             INSERT INTO submissions (student_id, exam_id, score, final_marks, submission_type, server_used, deadlock_detected)
             VALUES (?, ?, ?, ?, 'auto', ?, TRUE)
-        """, (student_id, exam_id, final_score, final_marks, server_used))
-        conn.commit()
-        conn.close()
+        """, (student_id, exam_id, final_score, final_marks, server_used))])
 
 
         add_server_log(f"AUTO SUBMIT: Student {student_id} - {exam_title} - Score: {final_score}/10 (TIMEOUT)", "WARNING")
@@ -696,7 +790,7 @@ def get_my_results():
     student_id = data.get('student_id')
 
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.acquire(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("""
         SELECT s.exam_id, e.title, s.score, s.final_marks, s.submission_type,
@@ -707,7 +801,7 @@ def get_my_results():
         ORDER BY s.submission_time DESC
     """, (student_id,))
     results = cursor.fetchall()
-    conn.close()
+    db_pool.release(DB_PATH, conn)
 
 
     result_list = []
@@ -749,7 +843,7 @@ def random_cheating_monitor():
     while True:
         time.sleep(check_interval)
         # Get list of students currently taking active exams
-        active_students = [sid for sid, e in active_exams.items() if e.get('status') == 'ACTIVE']
+        active_students = [sid for sid, e in active_exams.items() if e.status == 'ACTIVE']
         if not active_students:
             continue
         # Randomly pick one student
@@ -761,17 +855,17 @@ def random_cheating_monitor():
         
         session = active_exams.get(cheater)
         if session:
-            base_score = session.get('score', 0)
-            exam_title = session.get('exam_title', 'Unknown')
+            base_score = session.score
+            exam_title = session.exam_title
             if count == 1:
                 # First cheat: reduce score by 50%
                 new_score = base_score // 2
-                session['score'] = new_score
+                session.score = new_score
                 add_server_log(f"CHEATING WARNING: Student {cheater} caught cheating - score reduced to {new_score}/10 for exam '{exam_title}'", "WARNING")
             elif count >= 2:
                 # Second cheat: fail exam immediately
-                session['score'] = 0
-                session['status'] = 'CHEATING_FAILED'
+                session.score = 0
+                session.status = 'CHEATING_FAILED'
                 add_server_log(f"CHEATING FAILED: Student {cheater} caught cheating again - exam '{exam_title}' failed with score 0", "ERROR")
                 submit_exam_auto(cheater)
                 student_cheating_warnings[cheater] = 0  # reset
@@ -788,6 +882,10 @@ if __name__ == '__main__':
     add_server_log("Deadlock Detection: ACTIVE", "INFO")
     add_server_log("Load Balancing (Main/Backup): ACTIVE", "INFO")
     add_server_log("Database Replication (RF=3): ACTIVE", "INFO")
+    conn = db_pool.acquire(DB_PATH)
+    for problem in check_query_plans(conn):
+        add_server_log(f"QUERY PLAN WARNING: {problem}", "WARNING")
+    db_pool.release(DB_PATH, conn)
     print("="*80)
     print("DISTRIBUTED EXAM SYSTEM - RUNNING")
     print("="*80)
@@ -0,0 +1,17 @@
+import importlib
+import sqlite3
+
+
+def test_hot_queries_use_indexes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    app = importlib.import_module("app")
+    db_path = str(tmp_path / "plans.db")
+    monkeypatch.setattr(app, "DB_PATH", db_path)
+    app.init_database()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(app.SCHEMA_MIGRATIONS)
+        assert app.check_query_plans(conn) == []
+    finally:
+        conn.close()
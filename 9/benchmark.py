@@ -0,0 +1,609 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+import xmlrpc.client
+from xmlrpc.server import SimpleXMLRPCServer
+
+import common
+import server as exam_server
+
+def print_header(title):
+    print("=" * 80)
+    print(f"BENCHMARK: {title}")
+    print("=" * 80)
+
+def print_row(label, value):
+    print(f"{label:<45} {value}")
+
+def run_threads(num_threads, target):
+    threads = [threading.Thread(target=target, daemon=True) for _ in range(num_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+def start_rpc_server(server_class, **kwargs):
+    rpc_server = server_class(("127.0.0.1", 0), allow_none=True, logRequests=False, **kwargs)
+    rpc_server.register_function(exam_server.receive_reply, "receive_reply")
+    threading.Thread(target=rpc_server.serve_forever, daemon=True).start()
+    return rpc_server, f"http://127.0.0.1:{rpc_server.server_address[1]}"
+
+def benchmark_rpc(args):
+    print_header(f"RPC calls/sec ({args.calls} calls x {args.threads} threads)")
+
+    def per_call_proxy(url):
+        def worker():
+            for i in range(args.calls):
+                proxy = xmlrpc.client.ServerProxy(url + "/RPC2", allow_none=True)
+                proxy.receive_reply("benchmark", i)
+        return worker
+
+    def pooled_proxy(url):
+        def worker():
+            for i in range(args.calls):
+                exam_server.rpc_pool.call(url, "receive_reply", "benchmark", i, timeout=5)
+        return worker
+
+    baseline_server, baseline_url = start_rpc_server(SimpleXMLRPCServer)
+    pooled_server, pooled_url = start_rpc_server(exam_server.PooledXMLRPCServer)
+    total_calls = args.calls * args.threads
+
+    before = run_threads(args.threads, per_call_proxy(baseline_url))
+    after = run_threads(args.threads, pooled_proxy(pooled_url))
+
+    print_row("Before (new ServerProxy per call, serial server):", f"{total_calls / before:,.0f} calls/s")
+    print_row("After (keep-alive proxy pool, pooled server):", f"{total_calls / after:,.0f} calls/s")
+    print_row("Speedup:", f"{before / after:.2f}x")
+    print_row("Proxy pool:", exam_server.rpc_pool.get_stats())
+    print_row("Server queue:", pooled_server.get_queue_stats())
+
+    baseline_server.shutdown()
+    pooled_server.shutdown()
+
+def measure_allocation(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    sessions = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return allocated, sessions
+
+def benchmark_sessions(args):
+    num_sessions = args.sessions
+    answered = len(exam_server.exam_questions) // 2
+    print_header(f"Memory per active exam session ({num_sessions:,} sessions, {answered} answers each)")
+
+    def build_dict_sessions():
+        sessions = {}
+        for student_id in range(num_sessions):
+            session = {
+                "student_id": student_id,
+                "questions": exam_server.exam_questions.copy(),
+                "current_question": 0,
+                "answers": [],
+                "score": 0,
+                "start_time": time.time(),
+                "duration": exam_server.exam_timer,
+                "status": "ACTIVE",
+                "server": "main"
+            }
+            for question in session["questions"][:answered]:
+                session["answers"].append({
+                    "question_id": question["id"],
+                    "user_answer": "B",
+                    "correct_answer": question["correct"],
+                    "is_correct": question["correct"] == "B"
+                })
+                session["current_question"] += 1
+            sessions[student_id] = session
+        return sessions
+
+    def build_slotted_sessions():
+        sessions = {}
+        for student_id in range(num_sessions):
+            session = exam_server.ExamSession(student_id, "main")
+            for _ in range(answered):
+                session.record_answer("B")
+            sessions[student_id] = session
+        return sessions
+
+    before, _ = measure_allocation(build_dict_sessions)
+    after, _ = measure_allocation(build_slotted_sessions)
+
+    print_row("Before (dict + question copy + answer dicts):", f"{before / num_sessions:,.0f} bytes/session")
+    print_row("After (slotted ExamSession + packed answers):", f"{after / num_sessions:,.0f} bytes/session")
+    print_row("Reduction:", f"{before / after:.2f}x")
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def benchmark_db(args):
+    total_writes = args.calls * args.threads
+    print_header(f"Submission writes ({args.calls} submissions x {args.threads} threads)")
+
+    temp_dir = tempfile.mkdtemp(prefix="exam_bench_")
+    baseline_path = os.path.join(temp_dir, "baseline.db")
+    pooled_path = os.path.join(temp_dir, "pooled.db")
+    original_path = exam_server.DB_PATH
+
+    exam_server.DB_PATH = pooled_path
+    with contextlib.redirect_stdout(io.StringIO()):
+        exam_server.init_database()
+
+    source = sqlite3.connect(pooled_path)
+    conn = sqlite3.connect(baseline_path)
+    for (schema,) in source.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"):
+        conn.execute(schema)
+    conn.commit()
+    conn.close()
+    source.close()
+
+    session = exam_server.ExamSession(0, "main")
+    for _ in range(len(exam_server.exam_questions)):
+        session.record_answer("B")
+    answers_json = json.dumps(session.answer_records())
+
+    status_sql = "INSERT INTO status_db (student_id, status, exam_type) VALUES (?, ?, ?)"
+    submission_sql = """
+        INSERT INTO submission_db
+        (student_id, score, submission_type, deadlock_detected, resolution_strategy, answers, exam_duration, server_used, final_marks, result)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def insert_submission(cursor, student_id):
+        cursor.execute(status_sql, (student_id, "exam_submitted", "Interactive"))
+        cursor.execute(submission_sql, (student_id, session.score, "manual", False, "none", answers_json,
+                                        session.duration, "main", session.score * 10, "PASS"))
+
+    def baseline_submit(student_id):
+        with exam_server.db_lock:
+            conn = sqlite3.connect(baseline_path)
+            insert_submission(conn.cursor(), student_id)
+            conn.commit()
+            conn.close()
+
+    def pooled_submit(student_id):
+        with exam_server.db_lock:
+            conn = exam_server.db_pool.acquire(pooled_path)
+            insert_submission(conn.cursor(), student_id)
+            conn.commit()
+            exam_server.db_pool.release(pooled_path, conn)
+
+    def group_commit_submit(student_id):
+        return exam_server.update_task6_databases(student_id, session.score, "manual", False, "none", session, "main")
+
+    def measure(submit):
+        latencies = []
+        futures = []
+
+        def record_latency(start):
+            return lambda future: latencies.append(time.perf_counter() - start)
+
+        def worker():
+            for i in range(args.calls):
+                start = time.perf_counter()
+                future = submit(i)
+                if future is None:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    future.add_done_callback(record_latency(start))
+                    futures.append(future)
+
+        def run_and_wait():
+            for future in futures:
+                future.result()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run_threads(args.threads, worker)
+            run_and_wait()
+            elapsed = time.perf_counter() - start
+        return total_writes / elapsed, percentile(latencies, 0.99) * 1000
+
+    exam_server.DB_PATH = pooled_path
+    before_rate, before_p99 = measure(baseline_submit)
+    pooled_rate, pooled_p99 = measure(pooled_submit)
+    after_rate, after_p99 = measure(group_commit_submit)
+    exam_server.DB_PATH = original_path
+
+    print_row("Before (connect per write, rollback journal):", f"{before_rate:,.0f} submissions/s, p99 {before_p99:.2f} ms")
+    print_row("Pooled WAL connections, commit per write:", f"{pooled_rate:,.0f} submissions/s, p99 {pooled_p99:.2f} ms")
+    print_row("After (group commit writer, p99 until durable):", f"{after_rate:,.0f} submissions/s, p99 {after_p99:.2f} ms")
+    print_row("Speedup:", f"{after_rate / before_rate:.2f}x")
+    print_row("Group commit writer:", exam_server.submission_writer.get_stats())
+    print_row("Connection pool:", exam_server.db_pool.get_stats())
+
+def benchmark_locks(args):
+    acquisitions = max(1, args.calls // 25)
+    hold_time = 0.001
+    print_header(f"Chunk write-lock handoff ({acquisitions} acquisitions x {args.threads} threads, {hold_time * 1000:.0f} ms hold)")
+
+    polling_state = {"writer": False}
+    polling_guard = threading.Lock()
+
+    def polling_acquire():
+        while True:
+            with polling_guard:
+                if not polling_state["writer"]:
+                    polling_state["writer"] = True
+                    return
+            time.sleep(0.1)
+
+    def polling_release():
+        polling_state["writer"] = False
+
+    manager = exam_server.ChunkLockManager()
+
+    def measure(acquire, release):
+        waits = []
+
+        def worker():
+            for _ in range(acquisitions):
+                start = time.perf_counter()
+                acquire()
+                waits.append(time.perf_counter() - start)
+                time.sleep(hold_time)
+                release()
+
+        run_threads(args.threads, worker)
+        return sum(waits) / len(waits) * 1000, percentile(waits, 0.99) * 1000
+
+    before_avg, before_p99 = measure(polling_acquire, polling_release)
+    after_avg, after_p99 = measure(lambda: manager.acquire_write(0), lambda: manager.release_write(0))
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        manager.acquire_read(1)
+        manager.release_read(1)
+    uncontended_us = (time.perf_counter() - start) / 10000 * 1e6
+
+    print_row("Before (poll every 100 ms):", f"avg wait {before_avg:.2f} ms, p99 {before_p99:.2f} ms")
+    print_row("After (Condition-based RW lock):", f"avg wait {after_avg:.2f} ms, p99 {after_p99:.2f} ms")
+    print_row("Uncontended acquire + release:", f"{uncontended_us:.1f} us")
+    print_row("Lock manager stats:", manager.get_stats()["write"])
+
+def benchmark_replicas(args):
+    writes_per_thread = max(1, args.calls // 5)
+    print_header(f"Replica writes ({writes_per_thread} updates x {args.threads} threads, RF={common.REPLICATION_FACTOR})")
+
+    temp_dir = tempfile.mkdtemp(prefix="exam_bench_")
+    original_path = exam_server.REPLICATION_DB_PATH
+    original_replicas = exam_server.replica_set
+    rolls = [29, 40, 42, 50, 52]
+
+    def measure(layout, consistency="ALL"):
+        exam_server.REPLICATION_DB_PATH = os.path.join(temp_dir, f"{layout}_{consistency}.db")
+        exam_server.replica_set = exam_server.ReplicaSet(exam_server.db_pool, exam_server.REPLICATION_DB_PATH, layout=layout)
+        latencies = []
+        failures = []
+
+        def worker():
+            for i in range(writes_per_thread):
+                roll = rolls[i % len(rolls)]
+                start = time.perf_counter()
+                if not exam_server.write_to_replicas(roll, {"ISA": i % 100, "MSE": 50, "ESE": 50}, consistency):
+                    failures.append(roll)
+                latencies.append(time.perf_counter() - start)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            exam_server.setup_replication_database()
+            exam_server.create_chunks_and_replicas()
+            elapsed = run_threads(args.threads, worker)
+        stats = exam_server.replica_set.get_stats()
+        return len(latencies) / elapsed, percentile(latencies, 0.99) * 1000, len(failures), stats
+
+    single_rate, single_p99, single_failed, single_stats = measure("single_file")
+    node_rate, node_p99, node_failed, node_stats = measure("per_node")
+    levels = {consistency: measure("per_node", consistency) for consistency in ("ONE", "QUORUM")}
+    exam_server.REPLICATION_DB_PATH = original_path
+    exam_server.replica_set = original_replicas
+
+    def replica_summary(stats):
+        return ", ".join(f"r{replica_id} avg {replica['avg_ms']} ms" for replica_id, replica in stats.items())
+
+    print_row("Single file (default, sequential replica updates):", f"{single_rate:,.0f} writes/s, p99 {single_p99:.2f} ms, failed {single_failed}")
+    print_row("One file per node (concurrent updates, ALL):", f"{node_rate:,.0f} writes/s, p99 {node_p99:.2f} ms, failed {node_failed}")
+    print_row("Per-node / single-file throughput:", f"{node_rate / single_rate:.2f}x")
+    print_row("Single-file per-replica latency:", replica_summary(single_stats))
+    print_row("Per-node per-replica latency:", replica_summary(node_stats))
+    for consistency, (rate, p99, failed, _) in levels.items():
+        print_row(f"Per-node writes at {consistency}:", f"{rate:,.0f} writes/s, p99 {p99:.2f} ms, failed {failed}")
+
+def benchmark_batch(args):
+    num_students = args.calls
+    print_header(f"Bulk grade updates ({num_students} students, RF={common.REPLICATION_FACTOR})")
+
+    temp_dir = tempfile.mkdtemp(prefix="exam_bench_")
+    original_path = exam_server.REPLICATION_DB_PATH
+    original_replicas = exam_server.replica_set
+    original_bounds = (exam_server.partitioner.range_starts, exam_server.partitioner.range_chunks)
+    exam_server.REPLICATION_DB_PATH = os.path.join(temp_dir, "batch.db")
+    exam_server.replica_set = exam_server.ReplicaSet(exam_server.db_pool, exam_server.REPLICATION_DB_PATH)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        exam_server.setup_replication_database()
+        exam_server.create_chunks_and_replicas()
+    for replica_id in exam_server.replica_set.replica_ids():
+        with exam_server.replica_set.connection(replica_id) as conn:
+            for chunk_id, rolls in exam_server.partitioner.plan(range(1000, 1000 + num_students)):
+                conn.executemany(f"INSERT OR REPLACE INTO chunk_{chunk_id}_replica_{replica_id} (roll_number, name, version) VALUES (?, ?, 1)",
+                                 [(roll, f"student_{roll}") for roll in rolls])
+            conn.commit()
+    exam_server.partitioner.load([(chunk_id, rolls[0]) for chunk_id, rolls in exam_server.partitioner.plan(range(1000, 1000 + num_students)) if rolls])
+
+    updates = [{"student_id": roll, "ISA": 20, "MSE": 30, "ESE": 40} for roll in range(1000, 1000 + num_students)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for update in updates:
+            exam_server.write_to_replicas(update["student_id"], update)
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        outcome = exam_server.write_batch_to_replicas(updates)
+        after = time.perf_counter() - start
+
+    exam_server.REPLICATION_DB_PATH = original_path
+    exam_server.replica_set = original_replicas
+    exam_server.partitioner.range_starts, exam_server.partitioner.range_chunks = original_bounds
+
+    print_row("Before (one write_to_replicas call per student):", f"{num_students / before:,.0f} updates/s")
+    print_row("After (write_batch_to_replicas, one txn per chunk):", f"{num_students / after:,.0f} updates/s")
+    print_row("Speedup:", f"{before / after:.2f}x")
+    print_row("Batch outcome:", f"{outcome['applied']} applied, {outcome['failed']} failed, {outcome['chunks']} chunks")
+
+def benchmark_jobs(args):
+    num_jobs = args.calls
+    job_seconds = 0.005
+    legacy_tick = 0.05
+    legacy_scale = 5 / legacy_tick
+    legacy_jobs = min(num_jobs, 40)
+    job_types = ["COUNT_STUDENTS", "AVERAGE_SCORES", "FILTER_BY_SCORE", "GENERATE_REPORT", "PROCESS_SUBMISSIONS"]
+    print_header(f"Job dispatch ({num_jobs} jobs of {job_seconds * 1000:.0f} ms, {exam_server.JOB_WORKER_THREADS} workers)")
+
+    def make_jobs(count):
+        return [{"job_id": f"bench_{i}", "job_type": job_types[i % len(job_types)]} for i in range(count)]
+
+    def run_legacy(jobs):
+        pending = queue.Queue()
+        waits = []
+        threads = []
+        start = time.perf_counter()
+        for job in jobs:
+            pending.put((time.perf_counter(), job))
+        while not pending.empty():
+            queued_at, job = pending.get_nowait()
+            waits.append(time.perf_counter() - queued_at)
+            thread = threading.Thread(target=time.sleep, args=(job_seconds,), daemon=True)
+            thread.start()
+            threads.append(thread)
+            time.sleep(legacy_tick)
+        for thread in threads:
+            thread.join()
+        return len(jobs) / (time.perf_counter() - start), waits
+
+    def run_dispatcher(jobs, one_at_a_time=False):
+        running = {}
+        peak = {}
+        lock = threading.Lock()
+        done = threading.Semaphore(0)
+
+        def runner(job):
+            with lock:
+                running[job["job_type"]] = running.get(job["job_type"], 0) + 1
+                peak[job["job_type"]] = max(peak.get(job["job_type"], 0), running[job["job_type"]])
+            time.sleep(job_seconds)
+            with lock:
+                running[job["job_type"]] -= 1
+            done.release()
+
+        dispatcher = exam_server.JobDispatcher(runner, lambda job: True)
+        dispatcher.start()
+        start = time.perf_counter()
+        for job in jobs:
+            dispatcher.submit(job)
+            if one_at_a_time:
+                done.acquire()
+        if not one_at_a_time:
+            for _ in jobs:
+                done.acquire()
+        return len(jobs) / (time.perf_counter() - start), dispatcher.get_stats(), peak
+
+    def run_contention(fifo):
+        waits = {}
+        lock = threading.Lock()
+        done = threading.Semaphore(0)
+        bulk = [{"job_id": f"bulk_{i}", "job_type": "PROCESS_SUBMISSIONS", "submitted_by": "bulk"} for i in range(num_jobs)]
+        interactive = [{"job_id": f"report_{i}", "job_type": "ANALYZE_MARKSHEET", "submitted_by": "teacher"} for i in range(10)]
+
+        def runner(job):
+            time.sleep(job_seconds)
+            with lock:
+                waits.setdefault(job.get("origin", job["submitted_by"]), []).append(job["queue_wait_ms"] / 1000)
+            done.release()
+
+        if fifo:
+            dispatcher = exam_server.JobDispatcher(runner, lambda job: True, type_limits={}, classes=("normal",), type_priority={})
+        else:
+            dispatcher = exam_server.JobDispatcher(runner, lambda job: True, type_limits={})
+        for job in bulk + interactive:
+            if fifo:
+                job["submitted_by"], job["origin"] = "all", job["submitted_by"]
+            dispatcher.submit(job)
+        dispatcher.start()
+        for _ in bulk + interactive:
+            done.acquire()
+        return waits
+
+    legacy_rate, legacy_waits = run_legacy(make_jobs(legacy_jobs))
+    burst_rate, burst_stats, peak = run_dispatcher(make_jobs(num_jobs))
+    _, idle_stats, _ = run_dispatcher(make_jobs(20), one_at_a_time=True)
+    fifo_waits = run_contention(fifo=True)
+    fair_waits = run_contention(fifo=False)
+
+    print_row("Before, modeled (1 job per 5 s tick, thread per job):", f"{legacy_rate / legacy_scale:,.2f} jobs/s, queue wait p50 {percentile(legacy_waits, 0.50) * legacy_scale:,.0f} s, p99 {percentile(legacy_waits, 0.99) * legacy_scale:,.0f} s")
+    print_row("After (event-driven dispatch, burst):", f"{burst_rate:,.0f} jobs/s, queue wait p50 {burst_stats['p50_queue_wait_ms']} ms, p99 {burst_stats['p99_queue_wait_ms']} ms")
+    print_row("After (idle cluster, one job at a time):", f"queue wait p50 {idle_stats['p50_queue_wait_ms']} ms, p99 {idle_stats['p99_queue_wait_ms']} ms")
+    print_row("Speedup over modeled before:", f"{burst_rate / (legacy_rate / legacy_scale):,.0f}x")
+    print_row("Peak concurrency by type (limit):", ", ".join(f"{job_type}={peak.get(job_type, 0)} ({burst_stats['type_limits'].get(job_type, burst_stats['type_limits'].get('default'))})" for job_type in job_types))
+    print_row("Teacher reports behind bulk (FIFO):", f"wait p50 {percentile(fifo_waits['teacher'], 0.50) * 1000:,.1f} ms, p99 {percentile(fifo_waits['teacher'], 0.99) * 1000:,.1f} ms")
+    print_row("Teacher reports behind bulk (priority):", f"wait p50 {percentile(fair_waits['teacher'], 0.50) * 1000:,.1f} ms, p99 {percentile(fair_waits['teacher'], 0.99) * 1000:,.1f} ms")
+    print_row("Bulk submitter wait (FIFO / priority):", f"p99 {percentile(fifo_waits['bulk'], 0.99) * 1000:,.1f} ms / {percentile(fair_waits['bulk'], 0.99) * 1000:,.1f} ms")
+    print_row("Before is modeled, not measured:", f"old loop replayed with a {legacy_tick * 1000:.0f} ms tick over {legacy_jobs} jobs, scaled x{legacy_scale:.0f} to the 5 s tick")
+
+def benchmark_mapreduce(args):
+    rows_per_chunk = args.calls * 100
+    repeats = 5
+    print_header(f"Chunk analytics ({common.NUM_CHUNKS} chunks x {rows_per_chunk} rows, RF={common.REPLICATION_FACTOR})")
+
+    temp_dir = tempfile.mkdtemp(prefix="exam_bench_")
+    original_path = exam_server.REPLICATION_DB_PATH
+    original_replicas = exam_server.replica_set
+    original_bounds = (exam_server.partitioner.range_starts, exam_server.partitioner.range_chunks)
+    exam_server.REPLICATION_DB_PATH = os.path.join(temp_dir, "mapreduce.db")
+    exam_server.replica_set = exam_server.ReplicaSet(exam_server.db_pool, exam_server.REPLICATION_DB_PATH)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        exam_server.setup_replication_database()
+        exam_server.create_chunks_and_replicas()
+    for replica_id in exam_server.replica_set.replica_ids():
+        with exam_server.replica_set.connection(replica_id) as conn:
+            for chunk_id in exam_server.partitioner.chunk_ids():
+                first_roll = 1000 + chunk_id * rows_per_chunk
+                conn.executemany(f"INSERT OR REPLACE INTO chunk_{chunk_id}_replica_{replica_id} (roll_number, name, total, version) VALUES (?, ?, ?, 1)",
+                                 [(roll, f"student_{roll}", roll * 7 % 300) for roll in range(first_roll, first_roll + rows_per_chunk)])
+            conn.commit()
+
+    serial = exam_server.MapReduceEngine(workers=1, name="map-serial")
+    parallel = exam_server.MapReduceEngine()
+    for name, (mapper, reducer) in exam_server.map_reduce.jobs.items():
+        serial.register(name, mapper, reducer)
+        parallel.register(name, mapper, reducer)
+
+    jobs = [("GENERATE_REPORT", {}), ("FILTER_BY_SCORE", {"min_score": 295}), ("AVERAGE_SCORES", {})]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, parameters in jobs:
+            for _ in range(repeats):
+                serial.run(name, parameters)
+                parallel.run(name, parameters)
+
+    exam_server.REPLICATION_DB_PATH = original_path
+    exam_server.replica_set = original_replicas
+    exam_server.partitioner.range_starts, exam_server.partitioner.range_chunks = original_bounds
+
+    serial_stats = serial.get_stats()
+    parallel_stats = parallel.get_stats()
+    print_row("CPUs available:", os.cpu_count())
+    for name, _ in jobs:
+        before = serial_stats[name]["avg_wall_ms"]
+        after = parallel_stats[name]
+        print_row(f"{name} before (chunks one after another):", f"{before:.2f} ms")
+        print_row(f"{name} after (one mapper per chunk):", f"{after['avg_wall_ms']:.2f} ms (largest chunk {after['avg_map_max_ms']:.2f} ms, speedup {before / after['avg_wall_ms']:.2f}x)")
+
+def benchmark_placement(args):
+    num_jobs = args.calls
+    job_seconds = 0.02
+    nodes = {"teacher": (4, 2048), "client": (2, 1024), "worker_3": (4, 1024)}
+    print_header(f"Node placement ({num_jobs} ANALYZE_MARKSHEET jobs of {job_seconds * 1000:.0f} ms on {len(nodes)} simulated nodes)")
+
+    def legacy_placer(job):
+        def score(node_id):
+            resources = exam_server.cluster_resources[node_id]["resources"]
+            return resources["cpu_percent"] + resources["memory_percent"]
+
+        job["assigned_node"] = min(nodes, key=score)
+        return True
+
+    def run_placement(placer):
+        running = {node_id: 0 for node_id in nodes}
+        peak = {node_id: 0 for node_id in nodes}
+        lock = threading.Lock()
+        done = threading.Semaphore(0)
+
+        def runner(job):
+            node_id = job["assigned_node"]
+            with lock:
+                running[node_id] += 1
+                peak[node_id] = max(peak[node_id], running[node_id])
+                slowdown = max(1, running[node_id] / nodes[node_id][0])
+            time.sleep(job_seconds * slowdown)
+            with lock:
+                running[node_id] -= 1
+            exam_server.node_reservations.release(job["job_id"])
+            done.release()
+
+        dispatcher = exam_server.JobDispatcher(runner, placer, workers=32, type_limits={})
+        original_dispatcher = exam_server.job_dispatcher
+        exam_server.job_dispatcher = dispatcher
+        with contextlib.redirect_stdout(io.StringIO()):
+            dispatcher.start()
+            start = time.perf_counter()
+            for i in range(num_jobs):
+                dispatcher.submit({"job_id": f"place_{i}", "job_type": "ANALYZE_MARKSHEET", "submitted_by": "bench"})
+            for _ in range(num_jobs):
+                done.acquire()
+            elapsed = time.perf_counter() - start
+        exam_server.job_dispatcher = original_dispatcher
+        return elapsed, peak, dispatcher.get_stats()
+
+    original_resources = dict(exam_server.cluster_resources)
+    exam_server.cluster_resources.clear()
+    for node_id, (cpu_count, memory_mb) in nodes.items():
+        exam_server.cluster_resources[node_id] = {
+            "capabilities": ["ANALYZE_MARKSHEET"],
+            "heartbeat": time.time(),
+            "resources": {"cpu_percent": 10 if node_id == "teacher" else 20, "memory_percent": 30, "cpu_count": cpu_count,
+                          "memory_available": memory_mb, "memory_total": memory_mb, "disk_free": 50}
+        }
+    legacy_time, legacy_peak, _ = run_placement(legacy_placer)
+    packed_time, packed_peak, packed_stats = run_placement(exam_server.select_best_node_for_job)
+    exam_server.cluster_resources.clear()
+    exam_server.cluster_resources.update(original_resources)
+
+    def describe(peak):
+        return ", ".join(f"{node_id}={peak[node_id]}/{nodes[node_id][0]}" for node_id in nodes)
+
+    print_row("Before (lowest cpu+memory between heartbeats):", f"{legacy_time * 1000:,.0f} ms, peak jobs/slots {describe(legacy_peak)}")
+    print_row("After (reservations, best-fit):", f"{packed_time * 1000:,.0f} ms, peak jobs/slots {describe(packed_peak)}")
+    print_row("Speedup:", f"{legacy_time / packed_time:.2f}x")
+    print_row("Placement retries while cluster full:", packed_stats["placement_retries"])
+    print_row("Node model:", "job runs slower in proportion to jobs over the node's CPU slots")
+
+BENCHMARKS = {
+    "rpc": benchmark_rpc,
+    "sessions": benchmark_sessions,
+    "db": benchmark_db,
+    "locks": benchmark_locks,
+    "replicas": benchmark_replicas,
+    "batch": benchmark_batch,
+    "jobs": benchmark_jobs,
+    "mapreduce": benchmark_mapreduce,
+    "placement": benchmark_placement
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the Task 9 exam server")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS) + ["all"])
+    parser.add_argument("--calls", type=int, default=500, help="calls per thread")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent client threads")
+    parser.add_argument("--sessions", type=int, default=10000, help="active sessions to allocate")
+    args = parser.parse_args()
+
+    names = sorted(BENCHMARKS) if args.benchmark == "all" else [args.benchmark]
+    for name in names:
+        BENCHMARKS[name](args)
+
+if __name__ == "__main__":
+    main()
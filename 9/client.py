@@ -1,5 +1,4 @@
-from xmlrpc.client import ServerProxy
-from xmlrpc.server import SimpleXMLRPCServer
+import xmlrpc.client
 from datetime import datetime, timedelta, timezone
 import random
 import time
@@ -11,6 +10,7 @@ import os
 import psutil
 import ping3
 import subprocess
+from common import RPC_WORKER_THREADS, RPC_QUEUE_DEPTH, PooledXMLRPCServer, PooledServerProxy, rpc_pool
 
 def load_config():
     config_paths = ['config.json', './config.json', '../config.json']
@@ -43,9 +43,6 @@ server_url = create_server_url(config, 'server')
 teacher_url = create_server_url(config, 'teacher')
 client_url = create_server_url(config, 'client')
 
-server = ServerProxy(server_url + "/RPC2", allow_none=True)
-teacher = ServerProxy(teacher_url + "/RPC2", allow_none=True)
-
 student_list = config.get('student_list', [29, 40, 42, 50, 52])
 student_status = {i: 0 for i in student_list}
 test_duration_sec = config.get('test_duration_sec', 60)
@@ -63,6 +60,8 @@ cs_lock = threading.Lock()
 my_process_id = "client"
 copying_students = [29, 40, 50, 52]
 
+rpc_server = None
+
 exam_active = False
 exam_results = {}
 current_exam_student = None
@@ -98,12 +97,17 @@ job_results = {}
 
 def increment_clock():
     global logical_clock
-    logical_clock += 1
-    return logical_clock
+    with cs_lock:
+        logical_clock += 1
+        return logical_clock
 
 def update_clock(received_timestamp):
     global logical_clock
-    logical_clock = max(logical_clock, received_timestamp) + 1
+    with cs_lock:
+        logical_clock = max(logical_clock, received_timestamp) + 1
+
+server = PooledServerProxy(server_url)
+teacher = PooledServerProxy(teacher_url)
 
 def get_formatted_time():
     global clock_offset
@@ -134,8 +138,10 @@ def get_system_resources():
         global system_resources
         system_resources = {
             "cpu_percent": cpu_percent,
+            "cpu_count": psutil.cpu_count() or 1,
             "memory_percent": memory.percent,
             "memory_available": memory.available // (1024*1024),
+            "memory_total": memory.total // (1024*1024),
             "disk_percent": disk.percent,
             "disk_free": disk.free // (1024*1024*1024),
             "network_bytes_sent": net_io.bytes_sent,
@@ -148,8 +154,10 @@ def get_system_resources():
         print(f"[{get_formatted_time()}] [CLIENT-TASK9] Error getting system resources: {e}")
         return {
             "cpu_percent": 0,
+            "cpu_count": 1,
             "memory_percent": 0,
             "memory_available": 1000,
+            "memory_total": 1000,
             "disk_percent": 50,
             "disk_free": 10,
             "network_bytes_sent": 0,
@@ -201,7 +209,11 @@ def start_resource_monitoring():
                     "resources": resources,
                     "network": network,
                     "status": "active",
-                    "heartbeat": time.time()
+                    "heartbeat": time.time(),
+                    "rpc_url": client_url,
+                    "capabilities": sorted(CLIENT_JOB_HANDLERS),
+                    "rpc_queue": rpc_server.get_queue_stats() if rpc_server else {},
+                    "rpc_pool": rpc_pool.get_stats()
                 }
                 
                 try:
@@ -219,12 +231,73 @@ def start_resource_monitoring():
     monitor_thread = threading.Thread(target=resource_monitor_thread, daemon=True)
     monitor_thread.start()
 
+def summarize_exam_results():
+    summary = {
+        "job_type": "SUMMARIZE_EXAM_RESULTS",
+        "processed_by": "client_node",
+        "students": {},
+        "submission_types": {}
+    }
+    
+    for student_id, exam_data in exam_results.items():
+        final_marks = exam_data.get("score", 0) * 10
+        summary["students"][str(student_id)] = {
+            "name": students_info.get(student_id, f"Student_{student_id}"),
+            "final_marks": final_marks,
+            "passed": final_marks >= 50
+        }
+        submission_type = exam_data.get("type", "unknown")
+        summary["submission_types"][submission_type] = summary["submission_types"].get(submission_type, 0) + 1
+    
+    passed = len([s for s in summary["students"].values() if s["passed"]])
+    summary["total_students"] = len(summary["students"])
+    summary["pass_rate"] = round(passed / len(summary["students"]) * 100, 2) if summary["students"] else 0
+    return summary
+
+def summarize_load_test():
+    return {
+        "job_type": "LOAD_TEST_SUMMARY",
+        "processed_by": "client_node",
+        "total_requests": total_requests_sent,
+        "successful_responses": successful_responses,
+        "failed_responses": failed_responses,
+        "main_server_responses": main_server_responses,
+        "backup_server_responses": backup_server_responses,
+        "success_rate": round(successful_responses / total_requests_sent * 100, 2) if total_requests_sent else 0
+    }
+
+CLIENT_JOB_HANDLERS = {
+    "SUMMARIZE_EXAM_RESULTS": summarize_exam_results,
+    "LOAD_TEST_SUMMARY": summarize_load_test
+}
+
+def execute_job(job):
+    job_type = job.get("job_type")
+    handler = CLIENT_JOB_HANDLERS.get(job_type)
+    if handler is None:
+        return {"success": False, "node_id": "client", "message": f"Client node cannot run {job_type} jobs"}
+    
+    print(f"[{get_formatted_time()}] [CLIENT-TASK9] Executing job {job.get('job_id')} ({job_type}) for Resource Manager")
+    start = time.time()
+    try:
+        result = handler()
+    except Exception as e:
+        result = {"error": str(e)}
+    
+    return {
+        "success": "error" not in result,
+        "node_id": "client",
+        "result": result,
+        "message": result.get("error", ""),
+        "elapsed_ms": round((time.time() - start) * 1000, 3)
+    }
+
 def stop_resource_monitoring():
     global resource_monitor_active
     resource_monitor_active = False
     print(f"[{get_formatted_time()}] [CLIENT-TASK9] Resource monitoring stopped")
 
-def submit_processing_job(job_type, parameters=None):
+def submit_processing_job(job_type, parameters=None, resources=None):
     job_id = f"job_{int(time.time())}_{random.randint(1000, 9999)}"
     
     job = {
@@ -235,6 +308,8 @@ def submit_processing_job(job_type, parameters=None):
         "submit_time": time.time(),
         "status": "submitted"
     }
+    if resources:
+        job["resources"] = resources
     
     try:
         print(f"[{get_formatted_time()}] [CLIENT-TASK9] Submitting processing job: {job_type}")
@@ -282,6 +357,7 @@ def view_cluster_resources():
         
         if result.get("success"):
             resources = result["resources"]
+            reservations = result.get("reservations", {}).get("nodes", {})
             
             print(f"\n[{get_formatted_time()}] " + "="*80)
             print(f"[{get_formatted_time()}] TASK 9: HADOOP-STYLE CLUSTER RESOURCE STATUS")
@@ -301,6 +377,10 @@ def view_cluster_resources():
                     print(f"[{get_formatted_time()}] Disk Free: {res.get('disk_free', 0)} GB")
                     print(f"[{get_formatted_time()}] Network Latency: Server={net.get('ping_server', 999):.2f}ms, Teacher={net.get('ping_teacher', 999):.2f}ms")
                     print(f"[{get_formatted_time()}] Network Packets: Sent={net.get('packets_sent', 0)}, Lost={net.get('packets_lost', 0)}")
+                    print(f"[{get_formatted_time()}] Job Types: {', '.join(metrics.get('capabilities', [])) or 'none'}")
+                    reserved = reservations.get(node_id)
+                    if reserved:
+                        print(f"[{get_formatted_time()}] Reserved: {reserved['cpu_slots']:g}/{reserved['cpu_capacity']:g} CPU slots, {reserved['memory_mb']:g}/{reserved['memory_capacity']:g} MB ({reserved['jobs']} jobs, busy for ~{reserved['busy_for']}s)")
                     
                     last_update = time.time() - metrics.get("heartbeat", 0)
                     print(f"[{get_formatted_time()}] Status: {'ONLINE' if last_update < 30 else 'OFFLINE'} (last seen {last_update:.0f}s ago)")
@@ -332,6 +412,18 @@ def view_job_queue():
             print(f"[{get_formatted_time()}] Completed Jobs: {queue_info['completed_jobs']}")
             print(f"[{get_formatted_time()}] Failed Jobs: {queue_info['failed_jobs']}")
             
+            dispatcher = queue_info.get("dispatcher")
+            if dispatcher:
+                running = ", ".join(f"{job_type}={count}" for job_type, count in sorted(dispatcher["running_by_type"].items())) or "none"
+                print(f"[{get_formatted_time()}] Workers: {dispatcher['active']}/{dispatcher['workers']} busy | Running by type: {running}")
+                print(f"[{get_formatted_time()}] Queue Wait: p50 {dispatcher['p50_queue_wait_ms']} ms | p99 {dispatcher['p99_queue_wait_ms']} ms | max {dispatcher['max_queue_wait_ms']} ms")
+                for priority_class, class_info in dispatcher.get("classes", {}).items():
+                    print(f"[{get_formatted_time()}]   {priority_class}: {class_info['queued']} queued | avg wait {class_info['avg_wait_ms']} ms | p99 {class_info['p99_wait_ms']} ms | oldest {class_info['oldest_wait_ms']} ms")
+            
+            result_cache = queue_info.get("result_cache")
+            if result_cache:
+                print(f"[{get_formatted_time()}] Result Cache: {result_cache['hits']} hits / {result_cache['misses']} misses ({result_cache['hit_rate']}% hit rate, {result_cache['size']} entries)")
+            
             if queue_info.get("recent_jobs"):
                 print(f"[{get_formatted_time()}] ")
                 print(f"[{get_formatted_time()}] Recent Jobs:")
@@ -356,10 +448,13 @@ def run_distributed_analytics():
     print(f"[{get_formatted_time()}] 3. Find students with scores > 80")
     print(f"[{get_formatted_time()}] 4. Generate distributed report")
     print(f"[{get_formatted_time()}] 5. Process exam submissions")
+    print(f"[{get_formatted_time()}] 6. Analyze teacher marksheet (teacher node)")
+    print(f"[{get_formatted_time()}] 7. Calculate grades (teacher node)")
+    print(f"[{get_formatted_time()}] 8. Summarize exam results (client node)")
     print(f"[{get_formatted_time()}] " + "="*80)
     
     try:
-        choice = input("Enter choice (1-5): ").strip()
+        choice = input("Enter choice (1-8): ").strip()
         
         job_id = None
         if choice == "1":
@@ -372,6 +467,12 @@ def run_distributed_analytics():
             job_id = submit_processing_job("GENERATE_REPORT")
         elif choice == "5":
             job_id = submit_processing_job("PROCESS_SUBMISSIONS")
+        elif choice == "6":
+            job_id = submit_processing_job("ANALYZE_MARKSHEET")
+        elif choice == "7":
+            job_id = submit_processing_job("CALCULATE_GRADES")
+        elif choice == "8":
+            job_id = submit_processing_job("SUMMARIZE_EXAM_RESULTS")
         else:
             print(f"[{get_formatted_time()}] [CLIENT-TASK9] Invalid choice")
             return
@@ -397,10 +498,7 @@ def run_distributed_analytics():
 
 def send_request_with_timeout(url, method, *args, timeout=5):
     try:
-        proxy = ServerProxy(url + "/RPC2", allow_none=True)
-        proxy._ServerProxy__transport.timeout = timeout
-        result = getattr(proxy, method)(*args)
-        return result
+        return rpc_pool.call(url, method, *args, timeout=timeout)
     except Exception as e:
         print(f"[{get_formatted_time()}] [CLIENT] Timeout/Error calling {method}: {e}")
         return False
@@ -578,6 +676,13 @@ def display_load_test_results():
         print(f"[{get_formatted_time()}] MAIN SERVER UTILIZATION: {(main_server_responses/total_requests_sent)*100:.1f}%")
         print(f"[{get_formatted_time()}] BACKUP SERVER UTILIZATION: {migration_rate:.1f}%")
         
+        try:
+            rpc_queue = server.get_rpc_server_stats()
+            for name, stats in rpc_queue.items():
+                print(f"[{get_formatted_time()}] {name.upper()} RPC QUEUE WAIT: avg {stats['avg_queue_wait_ms']:.1f}ms, max {stats['max_queue_wait_ms']:.1f}ms ({stats['requests_rejected']} rejected)")
+        except Exception as e:
+            print(f"[{get_formatted_time()}] Could not fetch RPC queue stats: {e}")
+        
         if backup_server_responses > 0:
             print(f"[{get_formatted_time()}] ")
             print(f"[{get_formatted_time()}] LOAD BALANCING: ACTIVE")
@@ -613,7 +718,10 @@ def start_interactive_exam(student_id):
         print(f"DEADLOCK RESOLUTION: Simultaneous manual/auto submission handling")
         print(f"="*80)
         
-        result = server.start_interactive_exam(student_id)
+        multicall = xmlrpc.client.MultiCall(server)
+        multicall.start_interactive_exam(student_id)
+        multicall.get_question(student_id)
+        result, first_question = multicall()
         
         if result and result.get("success"):
             exam_active = True
@@ -626,7 +734,7 @@ def start_interactive_exam(student_id):
             print(f"Server processing request transparently")
             print(f"="*80)
             
-            conduct_interactive_exam(student_id)
+            conduct_interactive_exam(student_id, first_question)
             return True
         else:
             print(f"EXAM INITIALIZATION FAILED")
@@ -637,7 +745,7 @@ def start_interactive_exam(student_id):
         print(f"Exception starting exam: {e}")
         return False
 
-def conduct_interactive_exam(student_id):
+def conduct_interactive_exam(student_id, question_data=None):
     global exam_active
     
     print(f"\n" + "="*90)
@@ -650,8 +758,9 @@ def conduct_interactive_exam(student_id):
     
     while exam_active:
         try:
-            print(f"\n[CLIENT] Getting question {question_count + 1} from server...")
-            question_data = server.get_question(student_id)
+            if question_data is None:
+                print(f"\n[CLIENT] Getting question {question_count + 1} from server...")
+                question_data = server.get_question(student_id)
             
             if not question_data.get("success"):
                 if question_data.get("completed"):
@@ -723,7 +832,8 @@ def conduct_interactive_exam(student_id):
                     continue
             
             print(f"[CLIENT] Submitting your answer '{user_answer}' to server...")
-            answer_result = server.submit_answer(student_id, user_answer)
+            answer_result = server.submit_answer_and_get_next(student_id, user_answer)
+            question_data = answer_result.get("next_question")
             
             if answer_result.get("success"):
                 is_correct = answer_result.get("is_correct", False)
@@ -993,21 +1103,24 @@ def get_time_for_berkeley():
     return get_local_time().isoformat()
 
 def run_client_server():
+    global rpc_server
     hostname = socket.gethostname()
     local_ip = socket.gethostbyname(hostname)
     print(f"[{get_formatted_time()}] [CLIENT-RA] Starting XML-RPC server on {local_ip}:{config['client']['port']}")
     
-    server_instance = SimpleXMLRPCServer(("0.0.0.0", config['client']['port']), allow_none=True)
+    server_instance = PooledXMLRPCServer(("0.0.0.0", config['client']['port']), name="client", allow_none=True)
+    rpc_server = server_instance
     server_instance.register_function(receive_request, "receive_request")
     server_instance.register_function(receive_reply, "receive_reply")
     server_instance.register_function(get_time_for_berkeley, "get_time_for_berkeley")
     server_instance.register_function(adjust_time, "adjust_time")
     server_instance.register_function(receive_exam_results, "receive_exam_results")
     server_instance.register_function(handle_exam_timeout, "handle_exam_timeout")
+    server_instance.register_function(execute_job, "execute_job")
     
     server_thread = threading.Thread(target=server_instance.serve_forever, daemon=True)
     server_thread.start()
-    print(f"[{get_formatted_time()}] [CLIENT-RA] XML-RPC server running...")
+    print(f"[{get_formatted_time()}] [CLIENT-RA] XML-RPC server running ({RPC_WORKER_THREADS} workers, queue depth {RPC_QUEUE_DEPTH})...")
 
 def run():
     global clock_offset
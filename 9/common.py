@@ -0,0 +1,1111 @@
+from xmlrpc.server import SimpleXMLRPCServer, SimpleXMLRPCRequestHandler
+import xmlrpc.client
+import http.client
+import queue
+from collections import deque, OrderedDict
+import heapq
+import bisect
+import itertools
+import threading
+import time
+import socket
+import select
+import selectors
+import sqlite3
+import json
+import hashlib
+import os
+import atexit
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait, FIRST_COMPLETED
+
+RPC_WORKER_THREADS = 16
+RPC_QUEUE_DEPTH = 64
+RPC_QUEUE_TIMEOUT = 5
+RPC_KEEPALIVE_TIMEOUT = 15
+RPC_KEEPALIVE_LINGER = 0.005
+RPC_POOL_MAX_IDLE = 8
+RPC_POOL_IDLE_TIMEOUT = 10
+TIMER_CALLBACK_WORKERS = 4
+SQLITE_POOL_MAX_IDLE = 16
+SQLITE_BUSY_TIMEOUT = 10
+SQLITE_CACHED_STATEMENTS = 128
+GROUP_COMMIT_INTERVAL = 0.005
+GROUP_COMMIT_MAX_ROWS = 256
+CHUNK_LOCK_TIMEOUT = 10
+NUM_CHUNKS = 3
+PARTITION_MODE = "range"
+REPLICATION_FACTOR = 3
+REPLICA_LAYOUT = "single_file"
+REPLICA_WRITE_WORKERS = 6
+REPLICA_LATENCY_SAMPLES = 512
+REPLICA_READ_POLICY = "round_robin"
+REPLICA_RETRY_AFTER = 5
+MERKLE_BUCKETS = 64
+JOB_CACHE_SIZE = 128
+JOB_CACHE_TTL = 300
+
+class KeepAliveXMLRPCRequestHandler(SimpleXMLRPCRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    timeout = RPC_KEEPALIVE_TIMEOUT
+    
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+
+class PooledXMLRPCServer(SimpleXMLRPCServer):
+    def __init__(self, addr, workers=RPC_WORKER_THREADS, queue_depth=RPC_QUEUE_DEPTH, name="rpc",
+                 requestHandler=KeepAliveXMLRPCRequestHandler, **kwargs):
+        self.name = name
+        self.workers = workers
+        self.request_queue_size = queue_depth
+        self.pending_requests = queue.Queue(maxsize=queue_depth)
+        self.stats_lock = threading.Lock()
+        self.requests_served = 0
+        self.requests_rejected = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.idle_lock = threading.Lock()
+        self.idle_connections = selectors.DefaultSelector()
+        self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+        self.idle_connections.register(self.wakeup_reader, selectors.EVENT_READ, None)
+        super().__init__(addr, requestHandler=requestHandler, **kwargs)
+        
+        for i in range(workers):
+            threading.Thread(target=self._worker_loop, name=f"{name}-worker-{i}", daemon=True).start()
+        threading.Thread(target=self._idle_loop, name=f"{name}-keepalive", daemon=True).start()
+    
+    def process_request(self, request, client_address):
+        try:
+            self.pending_requests.put((request, client_address, time.time()), timeout=RPC_QUEUE_TIMEOUT)
+        except queue.Full:
+            with self.stats_lock:
+                self.requests_rejected += 1
+            self.shutdown_request(request)
+    
+    def finish_request(self, request, client_address):
+        handler = self.RequestHandlerClass(request, client_address, self)
+        return not getattr(handler, "close_connection", True)
+    
+    def _worker_loop(self):
+        while True:
+            request, client_address, queued_at = self.pending_requests.get()
+            waited = time.time() - queued_at
+            
+            with self.stats_lock:
+                self.requests_served += 1
+                self.total_queue_wait += waited
+                self.max_queue_wait = max(self.max_queue_wait, waited)
+            
+            keep_alive = False
+            try:
+                keep_alive = self.finish_request(request, client_address)
+                while keep_alive and select.select([request], [], [], RPC_KEEPALIVE_LINGER)[0]:
+                    with self.stats_lock:
+                        self.requests_served += 1
+                    keep_alive = self.finish_request(request, client_address)
+            except Exception:
+                keep_alive = False
+                self.handle_error(request, client_address)
+            
+            if keep_alive:
+                with self.idle_lock:
+                    self.idle_connections.register(request, selectors.EVENT_READ, (client_address, time.time()))
+                self.wakeup_writer.send(b"x")
+            else:
+                self.shutdown_request(request)
+    
+    def _idle_loop(self):
+        while True:
+            events = self.idle_connections.select(timeout=1)
+            now = time.time()
+            ready = []
+            expired = []
+            
+            with self.idle_lock:
+                for key, mask in events:
+                    if key.fileobj is self.wakeup_reader:
+                        self.wakeup_reader.recv(4096)
+                        continue
+                    self.idle_connections.unregister(key.fileobj)
+                    ready.append((key.fileobj, key.data[0]))
+                
+                for key in list(self.idle_connections.get_map().values()):
+                    if key.data and now - key.data[1] > RPC_KEEPALIVE_TIMEOUT:
+                        self.idle_connections.unregister(key.fileobj)
+                        expired.append(key.fileobj)
+            
+            for request in expired:
+                self.shutdown_request(request)
+            for request, client_address in ready:
+                self.process_request(request, client_address)
+    
+    def get_queue_stats(self):
+        with self.stats_lock:
+            served = self.requests_served
+            return {
+                "workers": self.workers,
+                "queue_depth": self.pending_requests.maxsize,
+                "queued_now": self.pending_requests.qsize(),
+                "requests_served": served,
+                "requests_rejected": self.requests_rejected,
+                "avg_queue_wait_ms": round(self.total_queue_wait / served * 1000, 3) if served else 0,
+                "max_queue_wait_ms": round(self.max_queue_wait * 1000, 3),
+                "idle_connections": len(self.idle_connections.get_map()) - 1
+            }
+
+class KeepAliveTransport(xmlrpc.client.Transport):
+    def __init__(self, timeout=None):
+        super().__init__()
+        self.timeout = timeout
+    
+    def make_connection(self, host):
+        if self._connection and host == self._connection[0]:
+            return self._connection[1]
+        chost, self._extra_headers, x509 = self.get_host_info(host)
+        self._connection = host, http.client.HTTPConnection(chost, timeout=self.timeout)
+        return self._connection[1]
+
+class RPCProxyPool:
+    def __init__(self, max_idle_per_key=RPC_POOL_MAX_IDLE, idle_timeout=RPC_POOL_IDLE_TIMEOUT):
+        self.max_idle_per_key = max_idle_per_key
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.failed = 0
+        self.timeouts = 0
+    
+    def acquire(self, url, timeout):
+        now = time.time()
+        stale = []
+        
+        with self.lock:
+            for key, entries in self.idle.items():
+                while entries and now - entries[0][1] > self.idle_timeout:
+                    stale.append(entries.pop(0)[0])
+            self.evicted += len(stale)
+            
+            entries = self.idle.get((url, timeout))
+            if entries:
+                self.reused += 1
+                proxy = entries.pop()[0]
+            else:
+                self.created += 1
+                proxy = None
+        
+        for old_proxy in stale:
+            old_proxy("close")()
+        
+        if proxy is None:
+            proxy = xmlrpc.client.ServerProxy(url + "/RPC2", transport=KeepAliveTransport(timeout), allow_none=True)
+        return proxy
+    
+    def release(self, url, timeout, proxy, healthy=True):
+        if healthy:
+            with self.lock:
+                entries = self.idle.setdefault((url, timeout), [])
+                if len(entries) < self.max_idle_per_key:
+                    entries.append((proxy, time.time()))
+                    return
+        else:
+            with self.lock:
+                self.failed += 1
+        proxy("close")()
+    
+    def call(self, url, method, *args, timeout=None):
+        proxy = self.acquire(url, timeout)
+        try:
+            result = getattr(proxy, method)(*args)
+        except xmlrpc.client.Fault:
+            self.release(url, timeout, proxy)
+            raise
+        except socket.timeout:
+            with self.lock:
+                self.timeouts += 1
+            self.release(url, timeout, proxy, healthy=False)
+            raise
+        except Exception:
+            self.release(url, timeout, proxy, healthy=False)
+            raise
+        self.release(url, timeout, proxy)
+        return result
+    
+    def get_stats(self):
+        with self.lock:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "idle": sum(len(entries) for entries in self.idle.values())
+            }
+
+class PooledMethod:
+    def __init__(self, proxy, name):
+        self.proxy = proxy
+        self.name = name
+    
+    def __getattr__(self, name):
+        return PooledMethod(self.proxy, f"{self.name}.{name}")
+    
+    def __call__(self, *args):
+        return rpc_pool.call(self.proxy.url, self.name, *args, timeout=self.proxy.timeout)
+
+class PooledServerProxy:
+    def __init__(self, url, timeout=None):
+        self.url = url
+        self.timeout = timeout
+    
+    def __getattr__(self, name):
+        return PooledMethod(self, name)
+
+rpc_pool = RPCProxyPool()
+
+class ScheduledTimer:
+    __slots__ = ("due", "callback", "args", "interval", "cancelled", "fired")
+    
+    def __init__(self, due, callback, args, interval):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+        self.cancelled = False
+        self.fired = False
+
+class TimerScheduler:
+    def __init__(self, workers=TIMER_CALLBACK_WORKERS, name="timer", on_error=None):
+        self.name = name
+        self.on_error = on_error
+        self.heap = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.cancelled_count = 0
+        self.fired_count = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-callback")
+        self.thread = None
+    
+    def schedule(self, delay, callback, *args, interval=None):
+        timer = ScheduledTimer(time.time() + delay, callback, args, interval)
+        with self.condition:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name=f"{self.name}-scheduler", daemon=True)
+                self.thread.start()
+            heapq.heappush(self.heap, (timer.due, next(self.counter), timer))
+            self.condition.notify()
+        return timer
+    
+    def cancel(self, timer):
+        if timer is None:
+            return False
+        with self.condition:
+            if timer.cancelled:
+                return False
+            timer.cancelled = True
+            if timer.fired:
+                return False
+            self.cancelled_count += 1
+            if self.cancelled_count > 64 and self.cancelled_count > len(self.heap) // 2:
+                self.heap = [entry for entry in self.heap if not entry[2].cancelled]
+                heapq.heapify(self.heap)
+                self.cancelled_count = 0
+        return True
+    
+    def _run(self):
+        while True:
+            with self.condition:
+                while True:
+                    while self.heap and self.heap[0][2].cancelled:
+                        heapq.heappop(self.heap)
+                        self.cancelled_count = max(0, self.cancelled_count - 1)
+                    if not self.heap:
+                        self.condition.wait()
+                        continue
+                    delay = self.heap[0][0] - time.time()
+                    if delay <= 0:
+                        break
+                    self.condition.wait(delay)
+                
+                due, _, timer = heapq.heappop(self.heap)
+                if timer.interval:
+                    timer.due = due + timer.interval
+                    heapq.heappush(self.heap, (timer.due, next(self.counter), timer))
+                else:
+                    timer.fired = True
+                self.fired_count += 1
+            
+            self.executor.submit(self._fire, timer)
+    
+    def _fire(self, timer):
+        if timer.cancelled:
+            return
+        try:
+            timer.callback(*timer.args)
+        except Exception as e:
+            if self.on_error is not None:
+                self.on_error(self.name, e)
+            else:
+                print(f"[{self.name.upper()}] Timer callback error: {e}")
+    
+    def get_stats(self):
+        with self.condition:
+            return {
+                "pending_timers": len(self.heap) - self.cancelled_count,
+                "fired_timers": self.fired_count
+            }
+
+class SQLiteConnectionPool:
+    def __init__(self, max_idle=SQLITE_POOL_MAX_IDLE):
+        self.max_idle = max_idle
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.stats = {"opened": 0, "reused": 0, "closed": 0}
+    
+    def open(self, path):
+        conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False,
+                               cached_statements=SQLITE_CACHED_STATEMENTS)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def acquire(self, path):
+        with self.lock:
+            idle = self.idle.get(path)
+            if idle:
+                self.stats["reused"] += 1
+                return idle.pop()
+            self.stats["opened"] += 1
+        return self.open(path)
+    
+    def release(self, path, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self.lock:
+            idle = self.idle.setdefault(path, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+            self.stats["closed"] += 1
+        conn.close()
+    
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["idle"] = sum(len(idle) for idle in self.idle.values())
+        return stats
+
+class GroupCommitWriter:
+    def __init__(self, pool, lock=None, interval=GROUP_COMMIT_INTERVAL, max_rows=GROUP_COMMIT_MAX_ROWS, name="group-commit"):
+        self.pool = pool
+        self.lock = lock
+        self.interval = interval
+        self.max_rows = max_rows
+        self.name = name
+        self.pending = queue.Queue()
+        self.start_lock = threading.Lock()
+        self.thread = None
+        self.closed = False
+        self.stats_lock = threading.Lock()
+        self.stats = {"writes": 0, "batches": 0, "failed": 0, "largest_batch": 0}
+    
+    def start(self):
+        with self.start_lock:
+            self._start()
+    
+    def _start(self):
+        if self.thread is None and not self.closed:
+            self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self.thread.start()
+            atexit.register(self.close)
+    
+    def write(self, path, statements):
+        future = Future()
+        item = (path, statements, future)
+        with self.start_lock:
+            if not self.closed:
+                self._start()
+                self.pending.put(item)
+                return future
+        self._commit([item])
+        return future
+    
+    def close(self, timeout=10):
+        with self.start_lock:
+            if self.closed:
+                return
+            self.closed = True
+            thread = self.thread
+            if thread is not None:
+                self.pending.put(None)
+        if thread is not None:
+            thread.join(timeout)
+    
+    def _run(self):
+        running = True
+        while running:
+            item = self.pending.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self.pending.get(timeout=remaining) if remaining > 0 else self.pending.get(block=False)
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+            self._commit(batch)
+        
+        leftover = []
+        while True:
+            try:
+                item = self.pending.get(block=False)
+            except queue.Empty:
+                break
+            if item is not None:
+                leftover.append(item)
+        if leftover:
+            self._commit(leftover)
+    
+    def _commit(self, batch):
+        by_path = {}
+        for item in batch:
+            by_path.setdefault(item[0], []).append(item)
+        
+        for path, items in by_path.items():
+            try:
+                conn = self.pool.acquire(path)
+            except Exception as e:
+                failed = {index: e for index in range(len(items))}
+            else:
+                try:
+                    with self.lock if self.lock is not None else contextlib.nullcontext():
+                        try:
+                            for _, statements, _ in items:
+                                for sql, params in statements:
+                                    conn.execute(sql, params)
+                            conn.commit()
+                            failed = {}
+                        except Exception:
+                            conn.rollback()
+                            failed = self._commit_individually(conn, items)
+                finally:
+                    self.pool.release(path, conn)
+            
+            with self.stats_lock:
+                self.stats["writes"] += len(items)
+                self.stats["batches"] += 1
+                self.stats["failed"] += len(failed)
+                self.stats["largest_batch"] = max(self.stats["largest_batch"], len(items))
+            
+            for index, (_, _, future) in enumerate(items):
+                if index in failed:
+                    future.set_exception(failed[index])
+                else:
+                    future.set_result(True)
+    
+    def _commit_individually(self, conn, items):
+        failed = {}
+        for index, (_, statements, _) in enumerate(items):
+            try:
+                for sql, params in statements:
+                    conn.execute(sql, params)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                failed[index] = e
+        return failed
+    
+    def get_stats(self):
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats["queued_now"] = self.pending.qsize()
+        stats["avg_batch_size"] = round(stats["writes"] / stats["batches"], 2) if stats["batches"] else 0
+        return stats
+
+class ChunkRWLock:
+    __slots__ = ("condition", "readers", "writer", "writer_queue", "next_ticket")
+    
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.writer_queue = deque()
+        self.next_ticket = 0
+    
+    @property
+    def waiting_writers(self):
+        return len(self.writer_queue)
+
+class ChunkLockManager:
+    def __init__(self, timeout=CHUNK_LOCK_TIMEOUT):
+        self.timeout = timeout
+        self.chunks = {}
+        self.chunks_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            "read": {"acquired": 0, "timeouts": 0, "total_wait": 0.0, "max_wait": 0.0},
+            "write": {"acquired": 0, "timeouts": 0, "total_wait": 0.0, "max_wait": 0.0}
+        }
+    
+    def _lock_for(self, chunk_id):
+        chunk_lock = self.chunks.get(chunk_id)
+        if chunk_lock is None:
+            with self.chunks_lock:
+                chunk_lock = self.chunks.setdefault(chunk_id, ChunkRWLock())
+        return chunk_lock
+    
+    def _record(self, mode, waited, acquired):
+        with self.stats_lock:
+            stats = self.stats[mode]
+            if acquired:
+                stats["acquired"] += 1
+                stats["total_wait"] += waited
+                stats["max_wait"] = max(stats["max_wait"], waited)
+            else:
+                stats["timeouts"] += 1
+    
+    def acquire_read(self, chunk_id, timeout=None):
+        chunk_lock = self._lock_for(chunk_id)
+        start = time.perf_counter()
+        deadline = start + (self.timeout if timeout is None else timeout)
+        
+        with chunk_lock.condition:
+            while chunk_lock.writer or chunk_lock.waiting_writers:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._record("read", 0, False)
+                    return False
+                chunk_lock.condition.wait(remaining)
+            chunk_lock.readers += 1
+        
+        self._record("read", time.perf_counter() - start, True)
+        return True
+    
+    def release_read(self, chunk_id):
+        chunk_lock = self._lock_for(chunk_id)
+        with chunk_lock.condition:
+            chunk_lock.readers = max(0, chunk_lock.readers - 1)
+            if chunk_lock.readers == 0:
+                chunk_lock.condition.notify_all()
+    
+    def acquire_write(self, chunk_id, timeout=None):
+        chunk_lock = self._lock_for(chunk_id)
+        start = time.perf_counter()
+        deadline = start + (self.timeout if timeout is None else timeout)
+        
+        with chunk_lock.condition:
+            ticket = chunk_lock.next_ticket
+            chunk_lock.next_ticket += 1
+            chunk_lock.writer_queue.append(ticket)
+            while chunk_lock.writer or chunk_lock.readers or chunk_lock.writer_queue[0] != ticket:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    chunk_lock.writer_queue.remove(ticket)
+                    chunk_lock.condition.notify_all()
+                    self._record("write", 0, False)
+                    return False
+                chunk_lock.condition.wait(remaining)
+            chunk_lock.writer_queue.popleft()
+            chunk_lock.writer = True
+        
+        self._record("write", time.perf_counter() - start, True)
+        return True
+    
+    def release_write(self, chunk_id):
+        chunk_lock = self._lock_for(chunk_id)
+        with chunk_lock.condition:
+            chunk_lock.writer = False
+            chunk_lock.condition.notify_all()
+    
+    def get_chunk_state(self, chunk_id):
+        chunk_lock = self._lock_for(chunk_id)
+        with chunk_lock.condition:
+            return {"readers": chunk_lock.readers, "writer": chunk_lock.writer, "waiting_writers": chunk_lock.waiting_writers}
+    
+    def get_stats(self):
+        with self.stats_lock:
+            report = {}
+            for mode, stats in self.stats.items():
+                report[mode] = {
+                    "acquired": stats["acquired"],
+                    "timeouts": stats["timeouts"],
+                    "avg_wait_us": round(stats["total_wait"] / stats["acquired"] * 1e6, 1) if stats["acquired"] else 0,
+                    "max_wait_ms": round(stats["max_wait"] * 1000, 3)
+                }
+        return report
+
+class ChunkPartitioner:
+    def __init__(self, num_chunks=NUM_CHUNKS, mode=PARTITION_MODE):
+        if mode not in ("range", "hash"):
+            raise ValueError(f"Unknown partition mode: {mode}")
+        self.num_chunks = num_chunks
+        self.mode = mode
+        self.range_starts = []
+        self.range_chunks = []
+    
+    def chunk_ids(self):
+        return range(self.num_chunks)
+    
+    def hash_chunk(self, student_id):
+        return ((int(student_id) * 2654435761) & 0xFFFFFFFF) % self.num_chunks
+    
+    def plan(self, roll_numbers):
+        rolls = sorted(set(roll_numbers))
+        
+        if self.mode == "hash":
+            groups = {chunk_id: [] for chunk_id in self.chunk_ids()}
+            for roll in rolls:
+                groups[self.hash_chunk(roll)].append(roll)
+            return [(chunk_id, groups[chunk_id]) for chunk_id in self.chunk_ids()]
+        
+        size, extra = divmod(len(rolls), self.num_chunks)
+        plan = []
+        start = 0
+        for chunk_id in self.chunk_ids():
+            end = start + size + (1 if chunk_id < extra else 0)
+            plan.append((chunk_id, rolls[start:end]))
+            start = end
+        return plan
+    
+    def describe(self, rolls):
+        if self.mode == "hash":
+            return f"hash ({len(rolls)} students)"
+        if not rolls:
+            return "empty"
+        if len(rolls) == 1:
+            return str(rolls[0])
+        return f"{rolls[0]}-{rolls[-1]}"
+    
+    def load(self, rows):
+        bounds = sorted((range_start, chunk_id) for chunk_id, range_start in rows if range_start is not None)
+        self.range_starts = [range_start for range_start, _ in bounds]
+        self.range_chunks = [chunk_id for _, chunk_id in bounds]
+    
+    def chunk_for(self, student_id):
+        if self.mode == "hash":
+            return self.hash_chunk(student_id)
+        if not self.range_chunks:
+            raise LookupError(f"No chunk for student {student_id}: partition map not loaded")
+        index = bisect.bisect_right(self.range_starts, student_id) - 1
+        return self.range_chunks[max(index, 0)]
+
+def ensure_columns(cursor, table_name, columns):
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table_name})")}
+    for column, definition in columns.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {definition}")
+
+class ReplicaSet:
+    def __init__(self, pool, base_path, layout=REPLICA_LAYOUT, replication_factor=REPLICATION_FACTOR,
+                 workers=REPLICA_WRITE_WORKERS, read_policy=REPLICA_READ_POLICY):
+        if layout not in ("per_node", "single_file"):
+            raise ValueError(f"Unknown replica layout: {layout}")
+        if read_policy not in ("round_robin", "least_latency"):
+            raise ValueError(f"Unknown replica read policy: {read_policy}")
+        self.pool = pool
+        self.base_path = base_path
+        self.layout = layout
+        self.replication_factor = replication_factor
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="replica-io") if layout == "per_node" else None
+        self.stats_lock = threading.Lock()
+        self.latencies = {replica_id: deque(maxlen=REPLICA_LATENCY_SAMPLES) for replica_id in self.replica_ids()}
+        self.failures = {replica_id: 0 for replica_id in self.replica_ids()}
+        self.level_latencies = {}
+        self.level_failures = {}
+        self.repairs = 0
+        self.read_policy = read_policy
+        self.read_counts = {replica_id: 0 for replica_id in self.replica_ids()}
+        self.read_latency = {replica_id: 0.0 for replica_id in self.replica_ids()}
+        self.down_until = {replica_id: 0 for replica_id in self.replica_ids()}
+        self.next_replica = 0
+    
+    def replica_ids(self):
+        return range(1, self.replication_factor + 1)
+    
+    def path(self, replica_id):
+        if self.layout == "single_file" or replica_id == 1:
+            return self.base_path
+        root, ext = os.path.splitext(self.base_path)
+        return f"{root}_node_{replica_id}{ext}"
+    
+    def required_acks(self, consistency):
+        if consistency == "ONE":
+            return 1
+        if consistency == "QUORUM":
+            return self.replication_factor // 2 + 1
+        if consistency == "ALL":
+            return self.replication_factor
+        raise ValueError(f"Unknown consistency level: {consistency}")
+    
+    def acks(self, results):
+        return sum(1 for result in results.values() if result is not None and not isinstance(result, Exception))
+    
+    @contextlib.contextmanager
+    def connection(self, replica_id):
+        path = self.path(replica_id)
+        conn = self.pool.acquire(path)
+        try:
+            yield conn
+        finally:
+            self.pool.release(path, conn)
+    
+    def write_replica(self, replica_id, apply):
+        start = time.perf_counter()
+        with self.connection(replica_id) as conn:
+            apply(conn.cursor(), replica_id)
+            conn.commit()
+        return time.perf_counter() - start
+    
+    def write_single_file(self, apply):
+        results = {}
+        with self.connection(1) as conn:
+            cursor = conn.cursor()
+            try:
+                for replica_id in self.replica_ids():
+                    start = time.perf_counter()
+                    apply(cursor, replica_id)
+                    results[replica_id] = time.perf_counter() - start
+                start = time.perf_counter()
+                conn.commit()
+            except Exception as e:
+                return {replica_id: e for replica_id in self.replica_ids()}
+        commit_time = time.perf_counter() - start
+        return {replica_id: elapsed + commit_time for replica_id, elapsed in results.items()}
+    
+    def record_replica(self, replica_id, result):
+        with self.stats_lock:
+            if isinstance(result, Exception):
+                self.failures[replica_id] += 1
+            else:
+                self.latencies[replica_id].append(result)
+    
+    def record_level(self, operation, consistency, elapsed, succeeded):
+        key = (operation, consistency)
+        with self.stats_lock:
+            if succeeded:
+                self.level_latencies.setdefault(key, deque(maxlen=REPLICA_LATENCY_SAMPLES)).append(elapsed)
+            else:
+                self.level_failures[key] = self.level_failures.get(key, 0) + 1
+    
+    def read_order(self):
+        now = time.time()
+        with self.stats_lock:
+            replica_ids = list(self.replica_ids())
+            if self.read_policy == "round_robin":
+                offset = self.next_replica % len(replica_ids)
+                self.next_replica += 1
+                replica_ids = replica_ids[offset:] + replica_ids[:offset]
+            else:
+                replica_ids.sort(key=lambda replica_id: self.read_latency[replica_id])
+            return sorted(replica_ids, key=lambda replica_id: self.down_until[replica_id] > now)
+    
+    def record_read(self, replica_id, elapsed, succeeded):
+        with self.stats_lock:
+            if succeeded:
+                self.read_counts[replica_id] += 1
+                previous = self.read_latency[replica_id]
+                self.read_latency[replica_id] = elapsed if previous == 0 else previous * 0.8 + elapsed * 0.2
+                self.down_until[replica_id] = 0
+            else:
+                self.down_until[replica_id] = time.time() + REPLICA_RETRY_AFTER
+    
+    def gather(self, task, consistency):
+        required = self.required_acks(consistency)
+        futures = {self.executor.submit(task, replica_id): replica_id for replica_id in self.replica_ids()}
+        results = {replica_id: None for replica_id in self.replica_ids()}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                results[futures[future]] = e
+            if self.acks(results) >= required:
+                break
+        return futures, results
+    
+    def write(self, apply, consistency="ALL", record=True):
+        start = time.perf_counter()
+        if self.executor is None:
+            results = self.write_single_file(apply)
+            if record:
+                for replica_id, result in results.items():
+                    self.record_replica(replica_id, result)
+        else:
+            futures, results = self.gather(lambda replica_id: self.write_replica(replica_id, apply), consistency)
+            if record:
+                for future, replica_id in futures.items():
+                    future.add_done_callback(
+                        lambda done, replica_id=replica_id: self.record_replica(replica_id, done.exception() or done.result()))
+        
+        if record:
+            self.record_level("write", consistency, time.perf_counter() - start, self.acks(results) >= self.required_acks(consistency))
+        return results
+    
+    def read_replica(self, replica_id, fetch):
+        start = time.perf_counter()
+        try:
+            with self.connection(replica_id) as conn:
+                result = (fetch(conn.cursor(), replica_id),)
+        except Exception:
+            self.record_read(replica_id, 0, False)
+            raise
+        self.record_read(replica_id, time.perf_counter() - start, True)
+        return result
+    
+    def collect(self, fetch, required):
+        order = self.read_order()
+        responses = {replica_id: None for replica_id in self.replica_ids()}
+        
+        if self.executor is None:
+            for replica_id in order:
+                try:
+                    responses[replica_id] = self.read_replica(replica_id, fetch)
+                except Exception as e:
+                    responses[replica_id] = e
+                if self.acks(responses) >= required:
+                    break
+            return responses
+        
+        pending = {}
+        while order and len(pending) < required:
+            replica_id = order.pop(0)
+            pending[self.executor.submit(self.read_replica, replica_id, fetch)] = replica_id
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                replica_id = pending.pop(future)
+                try:
+                    responses[replica_id] = future.result()
+                except Exception as e:
+                    responses[replica_id] = e
+                    if order:
+                        fallback = order.pop(0)
+                        pending[self.executor.submit(self.read_replica, fallback, fetch)] = fallback
+            if self.acks(responses) >= required:
+                break
+        return responses
+    
+    def query(self, fetch):
+        for replica_id, response in self.collect(fetch, 1).items():
+            if response is not None and not isinstance(response, Exception):
+                return response[0]
+        raise sqlite3.OperationalError("no replica answered")
+    
+    def read(self, fetch, consistency="QUORUM", repair=None, record=True):
+        start = time.perf_counter()
+        required = self.required_acks(consistency)
+        responses = self.collect(fetch, required)
+        
+        answered = {replica_id: response[0] for replica_id, response in responses.items()
+                    if response is not None and not isinstance(response, Exception)}
+        row = max(answered.values(), key=lambda candidate: candidate[-1] if candidate else 0, default=None)
+        version = row[-1] if row else 0
+        stale = [replica_id for replica_id, candidate in answered.items() if (candidate[-1] if candidate else 0) < version]
+        succeeded = len(answered) >= required
+        if record:
+            self.record_level("read", consistency, time.perf_counter() - start, succeeded)
+        
+        if stale and repair is not None:
+            self.read_repair(stale, row, repair)
+        
+        return {
+            "row": row,
+            "version": version,
+            "acks": len(answered),
+            "required": required,
+            "succeeded": succeeded,
+            "stale": stale
+        }
+    
+    def read_repair(self, stale, row, repair):
+        def repair_replica(replica_id):
+            with self.connection(replica_id) as conn:
+                repair(conn.cursor(), replica_id, row)
+                conn.commit()
+        
+        with self.stats_lock:
+            self.repairs += len(stale)
+        for replica_id in stale:
+            if self.executor is None:
+                repair_replica(replica_id)
+            else:
+                self.executor.submit(repair_replica, replica_id)
+    
+    def get_stats(self):
+        stats = {}
+        with self.stats_lock:
+            for replica_id in self.replica_ids():
+                samples = sorted(self.latencies[replica_id])
+                stats[replica_id] = {
+                    "path": self.path(replica_id),
+                    "writes": len(samples),
+                    "failures": self.failures[replica_id],
+                    "avg_ms": round(sum(samples) / len(samples) * 1000, 3) if samples else 0,
+                    "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3) if samples else 0
+                }
+        return stats
+    
+    def get_consistency_stats(self):
+        stats = {}
+        with self.stats_lock:
+            keys = sorted(set(self.level_latencies) | set(self.level_failures))
+            for operation, consistency in keys:
+                samples = sorted(self.level_latencies.get((operation, consistency), ()))
+                
+                def latency_percentile(fraction):
+                    return round(samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000, 3) if samples else 0
+                
+                stats.setdefault(operation, {})[consistency] = {
+                    "count": len(samples),
+                    "failures": self.level_failures.get((operation, consistency), 0),
+                    "p50_ms": latency_percentile(0.50),
+                    "p95_ms": latency_percentile(0.95),
+                    "p99_ms": latency_percentile(0.99)
+                }
+            stats["read_repairs"] = self.repairs
+        return stats
+    
+    def get_read_distribution(self):
+        with self.stats_lock:
+            total = sum(self.read_counts.values())
+            return {
+                replica_id: {
+                    "reads": self.read_counts[replica_id],
+                    "share": round(self.read_counts[replica_id] / total * 100, 1) if total else 0,
+                    "ewma_ms": round(self.read_latency[replica_id] * 1000, 3),
+                    "healthy": self.down_until[replica_id] <= time.time()
+                }
+                for replica_id in self.replica_ids()
+            }
+
+def format_replica_latencies(results):
+    return ", ".join(
+        f"replica {replica_id}: pending" if result is None
+        else f"replica {replica_id}: FAILED ({result})" if isinstance(result, Exception)
+        else f"replica {replica_id}: {result * 1000:.2f} ms"
+        for replica_id, result in sorted(results.items())
+    )
+
+class MerkleTree:
+    __slots__ = ("buckets", "leaves", "levels")
+    
+    def __init__(self, rows, buckets=MERKLE_BUCKETS):
+        self.buckets = buckets
+        self.leaves = [{} for _ in range(buckets)]
+        for row in rows:
+            digest = hashlib.sha1(repr(row).encode()).digest()
+            self.leaves[self.bucket_for(row[0])][row[0]] = (row[-1], digest, row)
+        
+        level = [self.hash_leaf(leaf) for leaf in self.leaves]
+        self.levels = [level]
+        while len(level) > 1:
+            level = [hashlib.sha1(b"".join(level[index:index + 2])).digest() for index in range(0, len(level), 2)]
+            self.levels.append(level)
+    
+    def bucket_for(self, roll_number):
+        return ((int(roll_number) * 2654435761) & 0xFFFFFFFF) % self.buckets
+    
+    @staticmethod
+    def hash_leaf(leaf):
+        digest = hashlib.sha1()
+        for roll_number in sorted(leaf):
+            version, row_hash, _ = leaf[roll_number]
+            digest.update(f"{roll_number}:{version}:".encode())
+            digest.update(row_hash)
+        return digest.digest()
+    
+    @property
+    def root(self):
+        return self.levels[-1][0]
+    
+    def diff_buckets(self, other):
+        if self.root == other.root:
+            return []
+        candidates = [0]
+        for depth in range(len(self.levels) - 2, -1, -1):
+            level, other_level = self.levels[depth], other.levels[depth]
+            candidates = [child for index in candidates for child in (2 * index, 2 * index + 1)
+                          if child < len(level) and level[child] != other_level[child]]
+        return candidates
+    
+    def diff_rows(self, other):
+        divergent = set()
+        for bucket in self.diff_buckets(other):
+            mine, theirs = self.leaves[bucket], other.leaves[bucket]
+            for roll_number in mine.keys() | theirs.keys():
+                entry, other_entry = mine.get(roll_number), theirs.get(roll_number)
+                if entry is None or other_entry is None or entry[:2] != other_entry[:2]:
+                    divergent.add(roll_number)
+        return divergent
+    
+    def row(self, roll_number):
+        return self.leaves[self.bucket_for(roll_number)].get(roll_number)
+
+def plan_anti_entropy_repairs(trees):
+    reference_id = min(trees)
+    divergent = set()
+    for replica_id, tree in trees.items():
+        if replica_id != reference_id:
+            divergent |= trees[reference_id].diff_rows(tree)
+    
+    repairs = {}
+    for roll_number in divergent:
+        entries = {replica_id: tree.row(roll_number) for replica_id, tree in trees.items()}
+        present = [entry for entry in entries.values() if entry]
+        holders = {}
+        for entry in present:
+            holders[entry[:2]] = holders.get(entry[:2], 0) + 1
+        winner = max(present, key=lambda entry: (entry[0], holders[entry[:2]], entry[1]))
+        for replica_id, entry in entries.items():
+            if entry is None or entry[:2] != winner[:2]:
+                repairs.setdefault(replica_id, []).append(winner[2])
+    return divergent, repairs
+
+class JobResultCache:
+    def __init__(self, capacity=JOB_CACHE_SIZE, ttl=JOB_CACHE_TTL):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0}
+    
+    def key(self, job_type, parameters, data_version):
+        return job_type, json.dumps(parameters or {}, sort_keys=True), data_version
+    
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry[1] >= self.ttl:
+                del self.entries[key]
+                self.stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0]
+    
+    def put(self, key, result):
+        with self.lock:
+            self.entries[key] = (result, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+    
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self.entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups * 100, 1) if lookups else 0
+        return stats
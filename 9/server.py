@@ -1,15 +1,17 @@
-from xmlrpc.server import SimpleXMLRPCServer
-import xmlrpc.client
 from datetime import datetime, timedelta, timezone
 import queue
+from collections import deque, OrderedDict
 import threading
 import time
 import socket
 import random
 import sqlite3
 import json
-import os
+import zlib
 import psutil
+from array import array
+from concurrent.futures import ThreadPoolExecutor, Future
+from common import RPC_WORKER_THREADS, RPC_QUEUE_DEPTH, PooledXMLRPCServer, PooledServerProxy, rpc_pool, TimerScheduler, SQLiteConnectionPool, GroupCommitWriter, ChunkLockManager, ChunkPartitioner, ensure_columns, ReplicaSet, format_replica_latencies, MerkleTree, plan_anti_entropy_repairs, JobResultCache
 
 time_now = None
 clients = {}
@@ -35,6 +37,44 @@ replication_lock = threading.Lock()
 exam_timer = 60
 
 BACKUP_PORT = 8001
+PEER_NOTIFY_WORKERS = 8
+SESSION_LOCK_STRIPES = 32
+RPC_PEER_TIMEOUT = 10
+READ_CONSISTENCY = "QUORUM"
+WRITE_CONSISTENCY = "QUORUM"
+ROW_CACHE_SIZE = 1024
+ANTI_ENTROPY_INTERVAL = 15
+JOB_WORKER_THREADS = 8
+JOB_TYPE_CONCURRENCY = {"GENERATE_REPORT": 1, "PROCESS_SUBMISSIONS": 2, "default": 4}
+JOB_PLACEMENT_RETRY = 2
+JOB_LATENCY_SAMPLES = 512
+JOB_PRIORITY_CLASSES = ("interactive", "normal", "batch")
+JOB_TYPE_PRIORITY = {
+    "ANALYZE_MARKSHEET": "interactive",
+    "CALCULATE_GRADES": "interactive",
+    "GENERATE_REPORT": "interactive",
+    "SUMMARIZE_EXAM_RESULTS": "interactive",
+    "PROCESS_SUBMISSIONS": "batch",
+    "VALIDATE_SUBMISSIONS": "batch",
+    "PROCESS_REPLICATION": "batch",
+    "LOAD_TEST_SUMMARY": "batch"
+}
+JOB_AGING_INTERVAL = 10
+JOB_RESOURCE_REQUESTS = {
+    "GENERATE_REPORT": {"cpu_slots": 2, "memory_mb": 256, "estimated_duration": 15},
+    "PROCESS_SUBMISSIONS": {"cpu_slots": 1, "memory_mb": 128, "estimated_duration": 30},
+    "ANALYZE_MARKSHEET": {"cpu_slots": 1, "memory_mb": 128, "estimated_duration": 10},
+    "CALCULATE_GRADES": {"cpu_slots": 1, "memory_mb": 128, "estimated_duration": 10},
+    "default": {"cpu_slots": 1, "memory_mb": 64, "estimated_duration": 5}
+}
+NODE_MIN_DISK_FREE = 1
+JOB_REMOTE_WORKERS = 8
+JOB_REMOTE_TIMEOUT = 60
+MAP_REDUCE_WORKERS = 6
+JOB_HISTORY_SIZE = 1000
+JOB_HISTORY_AGE = 3600
+JOB_RECENT_SIZE = 10
+main_rpc_server = None
 main_server_buffer = queue.Queue(maxsize=8)
 backup_server_buffer = queue.Queue(maxsize=8)
 load_threshold = 5
@@ -43,20 +83,16 @@ total_requests = 0
 main_server_processed = 0
 backup_server_processed = 0
 failed_requests = 0
+load_balancer_lock = threading.Lock()
 
 replication_initialized = False
 chunk_metadata = {}
 replica_status = {}
-read_locks = {}
-write_locks = {}
 
 cluster_resources = {}
-job_queue = queue.Queue()
-processing_jobs = {}
-completed_jobs = []
-failed_jobs = []
 resource_manager_active = False
 job_counter = 0
+job_counter_lock = threading.Lock()
 
 exam_questions = [
     {"id": 1, "q": "What is a distributed system?", "options": ["A) Single processor system", "B) Collection of independent computers", "C) Database system", "D) Network protocol"], "correct": "B"},
@@ -71,10 +107,96 @@ exam_questions = [
     {"id": 10, "q": "What is the CAP theorem about?", "options": ["A) Computer performance", "B) Consistency, Availability, Partition tolerance", "C) Network cables", "D) Database size"], "correct": "B"}
 ]
 
-main_exam_sessions = {}
-backup_exam_sessions = {}
+ANSWER_CHOICES = ("", "A", "B", "C", "D")
+ANSWER_CODES = {choice: code for code, choice in enumerate(ANSWER_CHOICES) if choice}
+
+class ExamSession:
+    __slots__ = ("student_id", "server", "status", "score", "current_question", "start_time",
+                 "duration", "answer_codes", "manual_submission_attempted", "auto_submit_timer")
+    
+    def __init__(self, student_id, server, duration=None):
+        self.student_id = student_id
+        self.server = server
+        self.status = "ACTIVE"
+        self.score = 0
+        self.current_question = 0
+        self.start_time = time.time()
+        self.duration = exam_timer if duration is None else duration
+        self.answer_codes = array("B")
+        self.manual_submission_attempted = False
+        self.auto_submit_timer = None
+    
+    @property
+    def total_questions(self):
+        return len(exam_questions)
+    
+    @property
+    def completed(self):
+        return self.current_question >= len(exam_questions)
+    
+    def remaining_time(self):
+        return max(0, self.duration - (time.time() - self.start_time))
+    
+    def current(self):
+        return exam_questions[self.current_question]
+    
+    def record_answer(self, answer):
+        question = exam_questions[self.current_question]
+        is_correct = (answer == question["correct"])
+        if is_correct:
+            self.score += 1
+        self.answer_codes.append(ANSWER_CODES.get(answer, 0))
+        self.current_question += 1
+        return question, is_correct
+    
+    def answer_records(self):
+        records = []
+        for index, code in enumerate(self.answer_codes):
+            question = exam_questions[index]
+            user_answer = ANSWER_CHOICES[code]
+            records.append({
+                "question_id": question["id"],
+                "user_answer": user_answer,
+                "correct_answer": question["correct"],
+                "is_correct": user_answer == question["correct"]
+            })
+        return records
+
+class ExamSessionStore:
+    def __init__(self, stripes=SESSION_LOCK_STRIPES):
+        self.sessions = {"main": {}, "backup": {}}
+        self.locks = [threading.RLock() for _ in range(stripes)]
+    
+    def lock_for(self, student_id):
+        return self.locks[hash(student_id) % len(self.locks)]
+    
+    def get(self, student_id, backend=None):
+        if backend is not None:
+            return self.sessions[backend].get(student_id)
+        for sessions in self.sessions.values():
+            session = sessions.get(student_id)
+            if session is not None:
+                return session
+        return None
+    
+    def add(self, session):
+        with self.lock_for(session.student_id):
+            if self.get(session.student_id) is not None:
+                return False
+            self.sessions[session.server][session.student_id] = session
+            return True
+    
+    def remove(self, session):
+        with self.lock_for(session.student_id):
+            sessions = self.sessions[session.server]
+            if sessions.get(session.student_id) is session:
+                del sessions[session.student_id]
+    
+    def count(self, backend):
+        return len(self.sessions[backend])
+
+exam_sessions = ExamSessionStore()
 submission_lock = threading.Lock()
-deadlock_detection_lock = threading.Lock()
 status_db = {}
 submission_db = {}
 
@@ -94,17 +216,83 @@ def get_formatted_time():
 
 def increment_clock():
     global logical_clock
-    logical_clock += 1
-    return logical_clock
+    with cs_lock:
+        logical_clock += 1
+        return logical_clock
 
 def update_clock(received_timestamp):
     global logical_clock
-    logical_clock = max(logical_clock, received_timestamp) + 1
+    with cs_lock:
+        logical_clock = max(logical_clock, received_timestamp) + 1
+
+def log_timer_error(name, error):
+    print(f"[{get_formatted_time()}] [{name.upper()}] Timer callback error: {error}")
+
+exam_scheduler = TimerScheduler(name="exam-timer", on_error=log_timer_error)
+
+db_pool = SQLiteConnectionPool()
+
+submission_writer = GroupCommitWriter(db_pool, lock=db_lock, name="submission-writer")
+job_writer = GroupCommitWriter(db_pool, lock=db_lock, name="job-writer")
+
+SCHEMA_MIGRATIONS = [
+    [
+        "CREATE INDEX IF NOT EXISTS idx_submission_db_server_used ON submission_db(server_used)",
+        "CREATE INDEX IF NOT EXISTS idx_submission_db_submission_type ON submission_db(submission_type)",
+        "CREATE INDEX IF NOT EXISTS idx_submission_db_scores ON submission_db(score, final_marks)"
+    ],
+    [
+        "CREATE INDEX IF NOT EXISTS idx_processing_jobs_status ON processing_jobs(status, submit_time)"
+    ],
+    [
+        "ALTER TABLE processing_jobs ADD COLUMN priority TEXT"
+    ],
+    [
+        "ALTER TABLE processing_jobs ADD COLUMN resources TEXT"
+    ]
+]
+
+HOT_QUERIES = {
+    "submission_count": ("SELECT COUNT(*) FROM submission_db", ()),
+    "server_distribution": ("SELECT server_used, COUNT(*) FROM submission_db GROUP BY server_used", ()),
+    "submission_types": ("SELECT submission_type, COUNT(*) FROM submission_db GROUP BY submission_type", ()),
+    "average_scores": ("SELECT AVG(score), AVG(final_marks) FROM submission_db", ())
+}
+
+def apply_schema_migrations(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    for number in range(version + 1, len(SCHEMA_MIGRATIONS) + 1):
+        conn.execute("BEGIN")
+        try:
+            for statement in SCHEMA_MIGRATIONS[number - 1]:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = number
+    
+    return version
+
+def check_query_plans(conn, queries=HOT_QUERIES):
+    problems = []
+    
+    for name, (sql, params) in queries.items():
+        for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+            detail = row[-1]
+            if detail.startswith("SCAN") and "INDEX" not in detail:
+                problems.append(f"{name}: full table scan ({detail})")
+            elif "TEMP B-TREE" in detail:
+                problems.append(f"{name}: sort without index ({detail})")
+    
+    return problems
 
 def init_database():
     with db_lock:
         try:
-            conn = sqlite3.connect(DB_PATH)
+            conn = db_pool.acquire(DB_PATH)
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -164,13 +352,371 @@ def init_database():
             ''')
             
             conn.commit()
-            conn.close()
             
-            print(f"[{get_formatted_time()}] [SERVER-DB] All databases initialized")
+            schema_version = apply_schema_migrations(conn)
+            plan_problems = check_query_plans(conn)
+            db_pool.release(DB_PATH, conn)
+            
+            print(f"[{get_formatted_time()}] [SERVER-DB] All databases initialized (schema version {schema_version})")
+            for problem in plan_problems:
+                print(f"[{get_formatted_time()}] [SERVER-DB] WARNING query plan - {problem}")
             
         except Exception as e:
             print(f"[{get_formatted_time()}] [SERVER-DB] Database initialization failed: {e}")
 
+class JobRegistry:
+    FINISHED = ("completed", "failed")
+    
+    def __init__(self, max_finished=JOB_HISTORY_SIZE, max_age=JOB_HISTORY_AGE, recent_size=JOB_RECENT_SIZE, on_change=None):
+        self.max_finished = max_finished
+        self.max_age = max_age
+        self.jobs = {}
+        self.finished = deque()
+        self.recent = deque(maxlen=recent_size)
+        self.counts = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+        self.evicted = 0
+        self.on_change = on_change
+        self.lock = threading.Lock()
+    
+    def add(self, job):
+        with self.lock:
+            previous = self.jobs.get(job["job_id"])
+            if previous is not None and previous["status"] not in self.FINISHED:
+                raise ValueError(f"Job {job['job_id']} is already {previous['status']}")
+            if previous is not None:
+                self.counts[previous["status"]] -= 1
+            self.jobs[job["job_id"]] = job
+            self.counts[job["status"]] += 1
+            self.recent.append(job)
+    
+    def update(self, job_id, status, **fields):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] in self.FINISHED:
+                return False
+            self.counts[job["status"]] -= 1
+            self.counts[status] += 1
+            job["status"] = status
+            job.update(fields)
+            if status in self.FINISHED:
+                job.setdefault("completion_time", time.time())
+                self.finished.append((job["completion_time"], job_id))
+                self._evict(time.time())
+            snapshot = dict(job)
+        
+        if self.on_change is not None:
+            self.on_change(snapshot)
+        return True
+    
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+    
+    def get_counts(self):
+        with self.lock:
+            counts = dict(self.counts)
+        counts["total"] = sum(counts.values())
+        return counts
+    
+    def recent_jobs(self):
+        with self.lock:
+            return [dict(job) for job in reversed(self.recent) if self.jobs.get(job["job_id"]) is job]
+    
+    def evict(self):
+        with self.lock:
+            return self._evict(time.time())
+    
+    def _evict(self, now):
+        evicted = 0
+        while self.finished and (len(self.finished) > self.max_finished or now - self.finished[0][0] >= self.max_age):
+            finished_at, job_id = self.finished.popleft()
+            job = self.jobs.get(job_id)
+            if job is not None and job["status"] in self.FINISHED and job["completion_time"] == finished_at:
+                del self.jobs[job_id]
+                self.counts[job["status"]] -= 1
+                evicted += 1
+        self.evicted += evicted
+        return evicted
+
+def job_timestamp(value):
+    return datetime.fromtimestamp(value).isoformat() if value else None
+
+def compress_job_result(result):
+    return sqlite3.Binary(zlib.compress(result.encode("utf-8"))) if result else None
+
+def decompress_job_result(stored):
+    if isinstance(stored, bytes):
+        return zlib.decompress(stored).decode("utf-8")
+    return stored
+
+def report_job_write(completed):
+    error = completed.exception()
+    if error is not None:
+        print(f"[{get_formatted_time()}] [SERVER-DB] Failed to persist job status: {error}")
+
+def persist_job(job):
+    future = job_writer.write(DB_PATH, [('''
+        UPDATE processing_jobs
+        SET status = ?, start_time = ?, completion_time = ?, result = ?, error_message = ?, assigned_node = ?
+        WHERE job_id = ?
+    ''', (job["status"], job_timestamp(job.get("start_time")), job_timestamp(job.get("completion_time")),
+          compress_job_result(job.get("result")), job.get("error_message"),
+          job.get("executed_on", job.get("assigned_node")), job["job_id"]))])
+    future.add_done_callback(report_job_write)
+    return future
+
+def load_job_record(job_id):
+    conn = db_pool.acquire(DB_PATH)
+    try:
+        row = conn.execute('''
+            SELECT job_id, job_type, parameters, status, submitted_by, submit_time, start_time,
+                   completion_time, result, error_message, assigned_node
+            FROM processing_jobs WHERE job_id = ?
+        ''', (job_id,)).fetchone()
+    finally:
+        db_pool.release(DB_PATH, conn)
+    
+    if row is None:
+        return None
+    columns = ("job_id", "job_type", "parameters", "status", "submitted_by", "submit_time", "start_time",
+               "completion_time", "result", "error_message", "assigned_node")
+    job = {column: value for column, value in zip(columns, row) if value is not None}
+    if "result" in job:
+        job["result"] = decompress_job_result(job["result"])
+    return job
+
+job_registry = JobRegistry(on_change=persist_job)
+
+job_result_cache = JobResultCache()
+
+class JobDispatcher:
+    def __init__(self, runner, placer, workers=JOB_WORKER_THREADS, type_limits=None,
+                 retry_interval=JOB_PLACEMENT_RETRY, name="job-dispatch", classes=JOB_PRIORITY_CLASSES,
+                 type_priority=None, aging_interval=JOB_AGING_INTERVAL):
+        self.runner = runner
+        self.placer = placer
+        self.workers = workers
+        self.type_limits = dict(JOB_TYPE_CONCURRENCY if type_limits is None else type_limits)
+        self.retry_interval = retry_interval
+        self.name = name
+        self.classes = tuple(classes)
+        self.default_class = "normal" if "normal" in self.classes else self.classes[-1]
+        self.type_priority = dict(JOB_TYPE_PRIORITY if type_priority is None else type_priority)
+        self.aging_interval = aging_interval
+        self.pending = {priority_class: OrderedDict() for priority_class in self.classes}
+        self.queued_count = 0
+        self.running = {}
+        self.running_by_submitter = {}
+        self.deferred_types = {}
+        self.last_served = {}
+        self.served = 0
+        self.class_stats = {priority_class: {"dispatched": 0, "total_wait": 0.0, "max_wait": 0.0,
+                                             "waits": deque(maxlen=JOB_LATENCY_SAMPLES)}
+                            for priority_class in self.classes}
+        self.active = 0
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-worker")
+        self.thread = None
+        self.queue_waits = deque(maxlen=JOB_LATENCY_SAMPLES)
+        self.stats = {"submitted": 0, "dispatched": 0, "finished": 0, "placement_retries": 0}
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.total_run_time = 0.0
+    
+    def start(self):
+        with self.condition:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.thread.start()
+    
+    def priority_class(self, job):
+        requested = job.get("priority")
+        if requested in self.classes:
+            return requested
+        return self.type_priority.get(job.get("job_type"), self.default_class)
+    
+    def submit(self, job):
+        with self.condition:
+            priority_class = self.priority_class(job)
+            job["priority"] = priority_class
+            self._enqueue([time.monotonic(), job, 0, priority_class, job.get("submitted_by", "unknown")])
+            self.stats["submitted"] += 1
+            self.condition.notify()
+            return self.queued_count
+    
+    def _enqueue(self, entry, front=False):
+        entries = self.pending[entry[3]].setdefault(entry[4], deque())
+        if front:
+            entries.appendleft(entry)
+        else:
+            entries.append(entry)
+        self.queued_count += 1
+    
+    def notify(self):
+        with self.condition:
+            self.deferred_types.clear()
+            for submitters in self.pending.values():
+                for entries in submitters.values():
+                    for entry in entries:
+                        entry[2] = 0
+            self.condition.notify()
+    
+    def queued(self):
+        with self.condition:
+            return self.queued_count
+    
+    def limit(self, job_type):
+        return self.type_limits.get(job_type, self.type_limits.get("default", self.workers))
+    
+    def _next_job(self, now):
+        if self.active >= self.workers:
+            return None, None
+        best = None
+        best_key = None
+        retry_at = None
+        for rank, priority_class in enumerate(self.classes):
+            for submitter, entries in self.pending[priority_class].items():
+                for entry in entries:
+                    deferred_until = max(entry[2], self.deferred_types.get(entry[1]["job_type"], 0))
+                    if deferred_until > now:
+                        retry_at = deferred_until if retry_at is None else min(retry_at, deferred_until)
+                        continue
+                    if self.running.get(entry[1]["job_type"], 0) >= self.limit(entry[1]["job_type"]):
+                        continue
+                    effective_rank = max(0, rank - int((now - entry[0]) // self.aging_interval))
+                    key = (effective_rank, self.running_by_submitter.get(submitter, 0),
+                           self.last_served.get(submitter, 0), entry[0])
+                    if best_key is None or key < best_key:
+                        best, best_key = entry, key
+                    break
+        if best is None:
+            return None, retry_at
+        
+        submitters = self.pending[best[3]]
+        submitters[best[4]].remove(best)
+        if not submitters[best[4]]:
+            del submitters[best[4]]
+        self.queued_count -= 1
+        self.served += 1
+        if any(best[4] in submitters for submitters in self.pending.values()):
+            self.last_served[best[4]] = self.served
+        else:
+            self.last_served.pop(best[4], None)
+        return best, None
+    
+    def _run(self):
+        while True:
+            with self.condition:
+                while True:
+                    now = time.monotonic()
+                    entry, retry_at = self._next_job(now)
+                    if entry is not None:
+                        break
+                    self.condition.wait(retry_at - now if retry_at is not None else None)
+                
+                queued_at, job, _, priority_class, submitter = entry
+                self.running[job["job_type"]] = self.running.get(job["job_type"], 0) + 1
+                self.running_by_submitter[submitter] = self.running_by_submitter.get(submitter, 0) + 1
+                self.active += 1
+            
+            if not self.placer(job):
+                with self.condition:
+                    entry[2] = time.monotonic() + self.retry_interval
+                    self.deferred_types[job["job_type"]] = entry[2]
+                    self._enqueue(entry, front=True)
+                    self.running[job["job_type"]] -= 1
+                    self.running_by_submitter[submitter] -= 1
+                    self.active -= 1
+                    self.stats["placement_retries"] += 1
+                continue
+            
+            waited = time.monotonic() - queued_at
+            job["queue_wait_ms"] = round(waited * 1000, 3)
+            with self.condition:
+                self.stats["dispatched"] += 1
+                self.queue_waits.append(waited)
+                self.total_queue_wait += waited
+                self.max_queue_wait = max(self.max_queue_wait, waited)
+                class_stats = self.class_stats[priority_class]
+                class_stats["dispatched"] += 1
+                class_stats["waits"].append(waited)
+                class_stats["total_wait"] += waited
+                class_stats["max_wait"] = max(class_stats["max_wait"], waited)
+            self.executor.submit(self._execute, job)
+    
+    def _execute(self, job):
+        started = time.monotonic()
+        pending = None
+        try:
+            pending = self.runner(job)
+        except Exception as e:
+            print(f"[{get_formatted_time()}] [SERVER-TASK9] Job worker error: {e}")
+        
+        with self.condition:
+            self.active -= 1
+            self.condition.notify()
+        
+        if isinstance(pending, Future):
+            pending.add_done_callback(lambda _: self._finish(job, started))
+        else:
+            self._finish(job, started)
+    
+    def _finish(self, job, started):
+        elapsed = time.monotonic() - started
+        with self.condition:
+            self.running[job["job_type"]] -= 1
+            submitter = job.get("submitted_by", "unknown")
+            self.running_by_submitter[submitter] -= 1
+            if not self.running_by_submitter[submitter]:
+                del self.running_by_submitter[submitter]
+            self.stats["finished"] += 1
+            self.total_run_time += elapsed
+            self.condition.notify()
+    
+    def get_stats(self):
+        with self.condition:
+            samples = sorted(self.queue_waits)
+            dispatched = self.stats["dispatched"]
+            finished = self.stats["finished"]
+            
+            def wait_percentile(samples, fraction):
+                return round(samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000, 3) if samples else 0
+            
+            now = time.monotonic()
+            classes = {}
+            for priority_class in self.classes:
+                entries = [entry for submitter_entries in self.pending[priority_class].values() for entry in submitter_entries]
+                class_stats = self.class_stats[priority_class]
+                class_samples = sorted(class_stats["waits"])
+                classes[priority_class] = {
+                    "queued": len(entries),
+                    "submitters": {submitter: len(submitter_entries) for submitter, submitter_entries in self.pending[priority_class].items()},
+                    "oldest_wait_ms": round(max((now - entry[0] for entry in entries), default=0) * 1000, 3),
+                    "dispatched": class_stats["dispatched"],
+                    "avg_wait_ms": round(class_stats["total_wait"] / class_stats["dispatched"] * 1000, 3) if class_stats["dispatched"] else 0,
+                    "p99_wait_ms": wait_percentile(class_samples, 0.99),
+                    "max_wait_ms": round(class_stats["max_wait"] * 1000, 3)
+                }
+            
+            stats = dict(self.stats)
+            stats.update({
+                "workers": self.workers,
+                "active": self.active,
+                "queued_now": self.queued_count,
+                "classes": classes,
+                "aging_interval": self.aging_interval,
+                "running_by_type": {job_type: count for job_type, count in self.running.items() if count},
+                "running_by_submitter": dict(self.running_by_submitter),
+                "type_limits": dict(self.type_limits),
+                "avg_queue_wait_ms": round(self.total_queue_wait / dispatched * 1000, 3) if dispatched else 0,
+                "p50_queue_wait_ms": wait_percentile(samples, 0.50),
+                "p99_queue_wait_ms": wait_percentile(samples, 0.99),
+                "max_queue_wait_ms": round(self.max_queue_wait * 1000, 3),
+                "avg_run_ms": round(self.total_run_time / finished * 1000, 3) if finished else 0
+            })
+        return stats
+
 def initialize_resource_manager():
     global resource_manager_active
     
@@ -180,13 +726,14 @@ def initialize_resource_manager():
     print(f"[{get_formatted_time()}] [SERVER-TASK9] Initializing YARN-like Resource Manager...")
     print(f"[{get_formatted_time()}] [SERVER-TASK9] Starting cluster monitoring and job scheduling...")
     
+    job_dispatcher.start()
+    
     def resource_manager_thread():
         global resource_manager_active
         resource_manager_active = True
         
         while resource_manager_active:
             try:
-                process_job_queue()
                 monitor_cluster_health()
                 cleanup_old_jobs()
                 time.sleep(5)
@@ -206,6 +753,7 @@ def report_node_metrics(metrics):
         global cluster_resources
         
         cluster_resources[node_id] = metrics
+        job_dispatcher.notify()
         
         resources = metrics.get("resources", {})
         network = metrics.get("network", {})
@@ -222,7 +770,10 @@ def report_node_metrics(metrics):
         else:
             status = "HEALTHY"
         
-        print(f"[{get_formatted_time()}] [SERVER-TASK9] Node {node_id}: CPU={cpu:.1f}% MEM={memory:.1f}% NET={ping_server:.1f}ms STATUS={status}")
+        rpc_queue = metrics.get("rpc_queue", {})
+        queue_wait = rpc_queue.get("avg_queue_wait_ms", 0)
+        
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Node {node_id}: CPU={cpu:.1f}% MEM={memory:.1f}% NET={ping_server:.1f}ms QWAIT={queue_wait:.1f}ms STATUS={status}")
         
         return {"success": True, "status": "metrics_recorded"}
         
@@ -235,6 +786,7 @@ def get_cluster_resources():
         return {
             "success": True,
             "resources": cluster_resources,
+            "reservations": node_reservations.get_stats(),
             "cluster_status": "active",
             "total_nodes": len(cluster_resources)
         }
@@ -242,12 +794,15 @@ def get_cluster_resources():
         print(f"[{get_formatted_time()}] [SERVER-TASK9] Error getting cluster resources: {e}")
         return {"success": False, "message": str(e)}
 
+def next_job_id():
+    global job_counter
+    with job_counter_lock:
+        job_counter += 1
+        return f"job_{job_counter}"
+
 def submit_processing_job(job):
     try:
-        global job_counter
-        job_counter += 1
-        
-        job_id = job.get("job_id", f"job_{job_counter}")
+        job_id = job.get("job_id") or next_job_id()
         job_type = job.get("job_type", "UNKNOWN")
         parameters = job.get("parameters", {})
         
@@ -257,33 +812,44 @@ def submit_processing_job(job):
             "parameters": json.dumps(parameters),
             "status": "queued",
             "submitted_by": job.get("submitted_by", "unknown"),
+            "priority": job_dispatcher.priority_class(job),
+            "resources": job_resource_request(job),
             "submit_time": time.time()
         }
         
-        processing_jobs[job_id] = job_record
-        job_queue.put(job_record)
+        job_registry.add(job_record)
         
-        with db_lock:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO processing_jobs 
-                (job_id, job_type, parameters, status, submitted_by, submit_time)
-                VALUES (?, ?, ?, ?, ?, ?)
+        try:
+            job_writer.write(DB_PATH, [('''
+                INSERT OR REPLACE INTO processing_jobs 
+                (job_id, job_type, parameters, status, submitted_by, submit_time, priority, resources)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (job_id, job_type, json.dumps(parameters), "queued", 
-                  job.get("submitted_by", "unknown"), datetime.now().isoformat()))
-            
-            conn.commit()
-            conn.close()
+                  job.get("submitted_by", "unknown"), job_timestamp(job_record["submit_time"]),
+                  job_record["priority"], json.dumps(job_record["resources"])))]).result()
+        except Exception as e:
+            job_registry.update(job_id, "failed", error_message=f"Could not persist job: {e}")
+            raise
+        
+        cache_key = job_cache_key(job_record)
+        cached = job_result_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            finish_processing_job(job_record, cached, "cache", cache_hit=True)
+            return {
+                "success": True,
+                "job_id": job_id,
+                "message": "Job completed from result cache",
+                "queue_position": 0
+            }
         
+        queue_position = job_dispatcher.submit(job_record)
         print(f"[{get_formatted_time()}] [SERVER-TASK9] Job {job_id} ({job_type}) queued for processing")
         
         return {
             "success": True,
             "job_id": job_id,
             "message": "Job queued successfully",
-            "queue_position": job_queue.qsize()
+            "queue_position": queue_position
         }
         
     except Exception as e:
@@ -292,51 +858,93 @@ def submit_processing_job(job):
 
 def get_job_status(job_id):
     try:
-        if job_id in processing_jobs:
-            job = processing_jobs[job_id]
+        job = job_registry.get(job_id)
+        if job is None:
+            job = load_job_record(job_id)
+        if job is not None:
             return {
                 "success": True,
                 "job": job
             }
         
-        for job in completed_jobs:
-            if job["job_id"] == job_id:
-                return {
-                    "success": True,
-                    "job": job
-                }
-        
-        for job in failed_jobs:
-            if job["job_id"] == job_id:
-                return {
-                    "success": True,
-                    "job": job
-                }
-        
         return {"success": False, "message": "Job not found"}
         
     except Exception as e:
         print(f"[{get_formatted_time()}] [SERVER-TASK9] Error getting job status: {e}")
         return {"success": False, "message": str(e)}
 
-def get_job_queue_status():
+def recover_processing_jobs():
+    global job_counter
+    
     try:
-        queued_jobs = len([j for j in processing_jobs.values() if j["status"] == "queued"])
-        running_jobs = len([j for j in processing_jobs.values() if j["status"] == "running"])
+        conn = db_pool.acquire(DB_PATH)
+        try:
+            last_number = conn.execute(
+                "SELECT MAX(CAST(SUBSTR(job_id, 5) AS INTEGER)) FROM processing_jobs WHERE job_id GLOB 'job_[0-9]*'"
+            ).fetchone()[0]
+            with job_counter_lock:
+                job_counter = max(job_counter, last_number or 0)
+            rows = conn.execute('''
+                SELECT job_id, job_type, parameters, status, submitted_by, submit_time, priority, resources
+                FROM processing_jobs WHERE status IN ('queued', 'running') ORDER BY submit_time
+            ''').fetchall()
+        finally:
+            db_pool.release(DB_PATH, conn)
+        
+        for job_id, job_type, parameters, status, submitted_by, submit_time, priority, resources in rows:
+            try:
+                submitted_at = datetime.fromisoformat(submit_time).timestamp()
+            except (TypeError, ValueError):
+                submitted_at = time.time()
+            try:
+                resources = json.loads(resources) if resources else {}
+            except ValueError:
+                resources = {}
+            
+            job_record = {
+                "job_id": job_id,
+                "job_type": job_type,
+                "parameters": parameters or "{}",
+                "status": "queued",
+                "submitted_by": submitted_by or "unknown",
+                "submit_time": submitted_at,
+                "recovered": True
+            }
+            if priority:
+                job_record["priority"] = priority
+            job_record["resources"] = job_resource_request({"job_type": job_type, "resources": resources})
+            job_registry.add(job_record)
+            if status == "running":
+                persist_job(job_record)
+            job_dispatcher.submit(job_record)
+        
+        if rows:
+            job_dispatcher.start()
+            print(f"[{get_formatted_time()}] [SERVER-TASK9] Recovered {len(rows)} unfinished jobs from processing_jobs")
+        return len(rows)
         
-        recent_jobs = []
-        all_jobs = list(processing_jobs.values()) + completed_jobs + failed_jobs
-        all_jobs.sort(key=lambda x: x.get("submit_time", 0), reverse=True)
+    except Exception as e:
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Job recovery failed: {e}")
+        return 0
+
+def get_job_queue_status():
+    try:
+        counts = job_registry.get_counts()
         
         return {
             "success": True,
             "queue": {
-                "total_jobs": len(all_jobs),
-                "queued_jobs": queued_jobs,
-                "running_jobs": running_jobs,
-                "completed_jobs": len(completed_jobs),
-                "failed_jobs": len(failed_jobs),
-                "recent_jobs": all_jobs[:10]
+                "total_jobs": counts["total"],
+                "queued_jobs": counts["queued"],
+                "running_jobs": counts["running"],
+                "completed_jobs": counts["completed"],
+                "failed_jobs": counts["failed"],
+                "recent_jobs": job_registry.recent_jobs(),
+                "evicted_jobs": job_registry.evicted,
+                "execution": dict(job_execution_stats),
+                "map_reduce": map_reduce.get_stats(),
+                "result_cache": job_result_cache.get_stats(),
+                "dispatcher": job_dispatcher.get_stats()
             }
         }
         
@@ -344,27 +952,111 @@ def get_job_queue_status():
         print(f"[{get_formatted_time()}] [SERVER-TASK9] Error getting job queue status: {e}")
         return {"success": False, "message": str(e)}
 
-def process_job_queue():
-    try:
-        if not job_queue.empty():
-            job = job_queue.get_nowait()
+class NodeReservations:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.nodes = {}
+        self.capacity = {}
+        self.stats = {"reserved": 0, "released": 0, "expired": 0, "no_fit": 0}
+    
+    def place(self, job, nodes):
+        request = job["resources"]
+        with self.lock:
+            best = None
+            best_score = None
+            for node_id, cpu_slots, memory_mb in nodes:
+                self.capacity[node_id] = (cpu_slots, memory_mb)
+                used = self.nodes.get(node_id, {"cpu_slots": 0, "memory_mb": 0})
+                free_cpu = cpu_slots - used["cpu_slots"] - request["cpu_slots"]
+                free_memory = memory_mb - used["memory_mb"] - request["memory_mb"]
+                if free_cpu < 0 or free_memory < 0:
+                    continue
+                score = free_cpu / max(cpu_slots, 1) + free_memory / max(memory_mb, 1)
+                if best_score is None or score < best_score:
+                    best, best_score = node_id, score
             
-            if select_best_node_for_job(job):
-                execute_processing_job(job)
-            else:
-                job_queue.put(job)
-                
-    except queue.Empty:
-        pass
-    except Exception as e:
-        print(f"[{get_formatted_time()}] [SERVER-TASK9] Job processing error: {e}")
+            if best is None:
+                self.stats["no_fit"] += 1
+                return None
+            
+            used = self.nodes.setdefault(best, {"cpu_slots": 0, "memory_mb": 0, "jobs": 0, "busy_until": 0})
+            used["cpu_slots"] += request["cpu_slots"]
+            used["memory_mb"] += request["memory_mb"]
+            used["jobs"] += 1
+            deadline = time.time() + request["estimated_duration"]
+            used["busy_until"] = max(used["busy_until"], deadline)
+            self.jobs[job["job_id"]] = (best, request, deadline)
+            self.stats["reserved"] += 1
+            return best
+    
+    def release(self, job_id, expired=False):
+        with self.lock:
+            reservation = self.jobs.pop(job_id, None)
+            if reservation is None:
+                return False
+            node_id, request, _ = reservation
+            used = self.nodes[node_id]
+            used["cpu_slots"] -= request["cpu_slots"]
+            used["memory_mb"] -= request["memory_mb"]
+            used["jobs"] -= 1
+            if not used["jobs"]:
+                del self.nodes[node_id]
+            self.stats["expired" if expired else "released"] += 1
+        job_dispatcher.notify()
+        return True
+    
+    def expire(self, grace=JOB_REMOTE_TIMEOUT):
+        now = time.time()
+        with self.lock:
+            overdue = [job_id for job_id, (_, _, deadline) in self.jobs.items() if deadline + grace < now]
+        for job_id in overdue:
+            self.release(job_id, expired=True)
+        return len(overdue)
+    
+    def get_stats(self):
+        with self.lock:
+            nodes = {}
+            for node_id, (cpu_slots, memory_mb) in self.capacity.items():
+                used = self.nodes.get(node_id, {"cpu_slots": 0, "memory_mb": 0, "jobs": 0, "busy_until": 0})
+                nodes[node_id] = {
+                    "jobs": used["jobs"],
+                    "cpu_slots": used["cpu_slots"],
+                    "cpu_capacity": cpu_slots,
+                    "memory_mb": used["memory_mb"],
+                    "memory_capacity": memory_mb,
+                    "cpu_utilization": round(used["cpu_slots"] / cpu_slots * 100, 1) if cpu_slots else 0,
+                    "memory_utilization": round(used["memory_mb"] / memory_mb * 100, 1) if memory_mb else 0,
+                    "busy_for": round(max(0, used["busy_until"] - time.time()), 1)
+                }
+            stats = dict(self.stats)
+            stats.update({"active": len(self.jobs), "nodes": nodes})
+        return stats
+
+node_reservations = NodeReservations()
+
+def job_resource_request(job):
+    request = dict(JOB_RESOURCE_REQUESTS.get(job.get("job_type"), JOB_RESOURCE_REQUESTS["default"]))
+    requested = job.get("resources") or {}
+    for key in request:
+        if key in requested:
+            value = float(requested[key])
+            if value < 0:
+                raise ValueError(f"Resource request {key} must not be negative")
+            request[key] = value
+    return request
 
 def select_best_node_for_job(job):
     try:
+        job_type = job["job_type"]
+        if "resources" not in job:
+            job["resources"] = job_resource_request(job)
         available_nodes = []
+        offered = False
         
-        for node_id, metrics in cluster_resources.items():
-            if metrics:
+        for node_id, metrics in list(cluster_resources.items()):
+            if metrics and job_type in metrics.get("capabilities", ()):
+                offered = True
                 resources = metrics.get("resources", {})
                 last_update = time.time() - metrics.get("heartbeat", 0)
                 
@@ -372,19 +1064,22 @@ def select_best_node_for_job(job):
                     cpu = resources.get("cpu_percent", 100)
                     memory = resources.get("memory_percent", 100)
                     
-                    if cpu < 80 and memory < 80:
-                        available_nodes.append({
-                            "node_id": node_id,
-                            "cpu": cpu,
-                            "memory": memory,
-                            "score": cpu + memory
-                        })
-        
-        if available_nodes:
-            best_node = min(available_nodes, key=lambda x: x["score"])
-            job["assigned_node"] = best_node["node_id"]
-            print(f"[{get_formatted_time()}] [SERVER-TASK9] Job {job['job_id']} assigned to node {best_node['node_id']}")
+                    if cpu < 80 and memory < 80 and resources.get("disk_free", 0) >= NODE_MIN_DISK_FREE:
+                        available_nodes.append((node_id, resources.get("cpu_count", 1),
+                                                resources.get("memory_total", resources.get("memory_available", 0))))
+        
+        best_node = node_reservations.place(job, available_nodes) if available_nodes else None
+        if best_node is not None:
+            job["assigned_node"] = best_node
+            print(f"[{get_formatted_time()}] [SERVER-TASK9] Job {job['job_id']} assigned to node {best_node}")
+            return True
+        elif job_type in LOCAL_JOB_HANDLERS:
+            job["assigned_node"] = "server"
+            print(f"[{get_formatted_time()}] [SERVER-TASK9] Job {job['job_id']} assigned to node server")
             return True
+        elif not offered:
+            print(f"[{get_formatted_time()}] [SERVER-TASK9] No node offers {job_type} yet, job {job['job_id']} stays pending")
+            return False
         else:
             print(f"[{get_formatted_time()}] [SERVER-TASK9] No available nodes for job {job['job_id']}")
             return False
@@ -393,235 +1088,272 @@ def select_best_node_for_job(job):
         print(f"[{get_formatted_time()}] [SERVER-TASK9] Node selection error: {e}")
         return False
 
-def execute_processing_job(job):
-    def job_execution_thread():
-        try:
-            job_id = job["job_id"]
-            job_type = job["job_type"]
-            
-            processing_jobs[job_id]["status"] = "running"
-            processing_jobs[job_id]["start_time"] = time.time()
-            
-            print(f"[{get_formatted_time()}] [SERVER-TASK9] Executing job {job_id} ({job_type}) on node {job.get('assigned_node', 'server')}")
-            
-            result = None
-            if job_type == "COUNT_STUDENTS":
-                result = execute_count_students_job()
-            elif job_type == "AVERAGE_SCORES":
-                result = execute_average_scores_job()
-            elif job_type == "FILTER_BY_SCORE":
-                parameters = json.loads(job.get("parameters", "{}"))
-                min_score = parameters.get("min_score", 80)
-                result = execute_filter_by_score_job(min_score)
-            elif job_type == "GENERATE_REPORT":
-                result = execute_generate_report_job()
-            elif job_type == "PROCESS_SUBMISSIONS":
-                result = execute_process_submissions_job()
-            else:
-                result = {"error": f"Unknown job type: {job_type}"}
-            
-            if "error" in result:
-                processing_jobs[job_id]["status"] = "failed"
-                processing_jobs[job_id]["error_message"] = result["error"]
-                failed_jobs.append(processing_jobs[job_id])
-                print(f"[{get_formatted_time()}] [SERVER-TASK9] Job {job_id} failed: {result['error']}")
-            else:
-                processing_jobs[job_id]["status"] = "completed"
-                processing_jobs[job_id]["result"] = json.dumps(result)
-                processing_jobs[job_id]["completion_time"] = time.time()
-                completed_jobs.append(processing_jobs[job_id])
-                print(f"[{get_formatted_time()}] [SERVER-TASK9] Job {job_id} completed successfully")
-                print(f"[{get_formatted_time()}] [SERVER-TASK9] Result: {result}")
-            
-            del processing_jobs[job_id]
-            
-        except Exception as e:
-            print(f"[{get_formatted_time()}] [SERVER-TASK9] Job execution error: {e}")
-            if job_id in processing_jobs:
-                processing_jobs[job_id]["status"] = "failed"
-                processing_jobs[job_id]["error_message"] = str(e)
-                failed_jobs.append(processing_jobs[job_id])
-                del processing_jobs[job_id]
-    
-    job_thread = threading.Thread(target=job_execution_thread, daemon=True)
-    job_thread.start()
+def node_rpc_url(node_id):
+    metrics = cluster_resources.get(node_id) or {}
+    return metrics.get("rpc_url") or {"teacher": teacher_url, "client": client_url}.get(node_id, "")
 
-def execute_count_students_job():
+def record_job_execution(kind):
+    with job_execution_lock:
+        job_execution_stats[kind] += 1
+
+def job_cache_key(job):
+    data_version = JOB_DATA_VERSIONS.get(job["job_type"])
+    if data_version is None:
+        return None
     try:
-        print(f"[{get_formatted_time()}] [SERVER-TASK9] Processing: COUNT_STUDENTS across all chunks")
-        
-        total_students = 0
-        chunk_counts = {}
-        
-        with replication_lock:
-            conn = sqlite3.connect(REPLICATION_DB_PATH)
-            cursor = conn.cursor()
-            
-            for chunk_id in range(3):
-                table_name = f"chunk_{chunk_id}_replica_1"
-                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                count = cursor.fetchone()[0]
-                
-                chunk_counts[f"chunk_{chunk_id}"] = count
-                total_students += count
-                
-                print(f"[{get_formatted_time()}] [SERVER-TASK9] Chunk {chunk_id}: {count} students")
-            
-            conn.close()
-        
-        return {
-            "job_type": "COUNT_STUDENTS",
-            "total_students": total_students,
-            "chunk_distribution": chunk_counts,
-            "replication_factor": 3
-        }
-        
+        return job_result_cache.key(job["job_type"], json.loads(job.get("parameters") or "{}"), data_version())
     except Exception as e:
-        return {"error": str(e)}
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Could not read data version for {job['job_type']}: {e}")
+        return None
+
+def run_local_job(job):
+    handler = LOCAL_JOB_HANDLERS.get(job["job_type"])
+    if handler is None:
+        return {"error": f"No node can run job type: {job['job_type']}"}
+    
+    cache_key = job_cache_key(job)
+    result = handler(json.loads(job.get("parameters") or "{}"))
+    if cache_key is not None and "error" not in result:
+        job_result_cache.put(cache_key, result)
+    return result
 
-def execute_average_scores_job():
+def run_remote_job(job):
     try:
-        print(f"[{get_formatted_time()}] [SERVER-TASK9] Processing: AVERAGE_SCORES from replicated data")
-        
-        all_scores = []
-        chunk_averages = {}
-        
-        with replication_lock:
-            conn = sqlite3.connect(REPLICATION_DB_PATH)
-            cursor = conn.cursor()
-            
-            for chunk_id in range(3):
-                table_name = f"chunk_{chunk_id}_replica_1"
-                cursor.execute(f"SELECT roll_number, total FROM {table_name}")
-                students = cursor.fetchall()
-                
-                chunk_scores = [total for roll, total in students]
-                chunk_avg = sum(chunk_scores) / len(chunk_scores) if chunk_scores else 0
-                
-                chunk_averages[f"chunk_{chunk_id}"] = {
-                    "average": round(chunk_avg, 2),
-                    "student_count": len(chunk_scores),
-                    "students": [{"roll": roll, "total": total} for roll, total in students]
-                }
-                
-                all_scores.extend(chunk_scores)
-                
-                print(f"[{get_formatted_time()}] [SERVER-TASK9] Chunk {chunk_id}: avg={chunk_avg:.2f}")
-            
-            conn.close()
+        call_remote_job(job)
+    finally:
+        node_reservations.release(job["job_id"])
+
+def call_remote_job(job):
+    job_id = job["job_id"]
+    node_id = job["assigned_node"]
+    try:
+        url = node_rpc_url(node_id)
+        if not url:
+            raise ConnectionError(f"no RPC address known for node {node_id}")
         
-        overall_average = sum(all_scores) / len(all_scores) if all_scores else 0
+        start = time.time()
+        response = rpc_pool.call(url, "execute_job", job, timeout=JOB_REMOTE_TIMEOUT)
+        if not response.get("success") and "result" not in response:
+            raise RuntimeError(response.get("message", "node rejected job"))
         
-        return {
-            "job_type": "AVERAGE_SCORES",
-            "overall_average": round(overall_average, 2),
-            "total_students": len(all_scores),
-            "chunk_averages": chunk_averages
-        }
+        record_job_execution("remote")
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Job {job_id} returned from node {node_id} in {(time.time() - start) * 1000:.1f}ms")
+        finish_processing_job(job, response.get("result") or {"error": response.get("message", "empty result")}, node_id,
+                              cache_hit=bool(response.get("cache_hit")))
         
     except Exception as e:
-        return {"error": str(e)}
+        if job["job_type"] not in LOCAL_JOB_HANDLERS:
+            print(f"[{get_formatted_time()}] [SERVER-TASK9] Node {node_id} unreachable for job {job_id}: {e}")
+            finish_processing_job(job, {"error": f"Node {node_id} unreachable: {e}"}, node_id)
+            return
+        
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Node {node_id} unreachable for job {job_id} ({e}), running locally")
+        node_reservations.release(job_id)
+        record_job_execution("fallback")
+        try:
+            finish_processing_job(job, run_local_job(job), "server")
+        except Exception as local_error:
+            finish_processing_job(job, {"error": str(local_error)}, "server")
+
+def finish_processing_job(job, result, executed_on, **fields):
+    job_id = job["job_id"]
+    
+    if "error" in result:
+        job_registry.update(job_id, "failed", error_message=result["error"], executed_on=executed_on, completion_time=time.time(), **fields)
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Job {job_id} failed: {result['error']}")
+    elif fields.get("cache_hit"):
+        job_registry.update(job_id, "completed", result=json.dumps(result), executed_on=executed_on, completion_time=time.time(), **fields)
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Job {job_id} completed from result cache ({executed_on})")
+    else:
+        job_registry.update(job_id, "completed", result=json.dumps(result), executed_on=executed_on, completion_time=time.time(), **fields)
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Job {job_id} completed successfully")
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Result: {result}")
 
-def execute_filter_by_score_job(min_score):
+def execute_processing_job(job):
+    job_id = job["job_id"]
+    node_id = job.get("assigned_node", "server")
     try:
-        print(f"[{get_formatted_time()}] [SERVER-TASK9] Processing: FILTER_BY_SCORE (min={min_score})")
+        job_registry.update(job_id, "running", start_time=time.time())
         
-        high_scorers = []
-        chunk_results = {}
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Executing job {job_id} ({job['job_type']}) on node {node_id}")
         
-        with replication_lock:
-            conn = sqlite3.connect(REPLICATION_DB_PATH)
-            cursor = conn.cursor()
-            
-            for chunk_id in range(3):
-                table_name = f"chunk_{chunk_id}_replica_1"
-                cursor.execute(f"SELECT roll_number, name, total FROM {table_name} WHERE total >= ?", (min_score,))
-                students = cursor.fetchall()
-                
-                chunk_high_scorers = [{"roll": roll, "name": name, "total": total} for roll, name, total in students]
-                chunk_results[f"chunk_{chunk_id}"] = chunk_high_scorers
-                high_scorers.extend(chunk_high_scorers)
-                
-                print(f"[{get_formatted_time()}] [SERVER-TASK9] Chunk {chunk_id}: {len(chunk_high_scorers)} students above {min_score}")
-            
-            conn.close()
+        if node_id != "server":
+            return remote_job_executor.submit(run_remote_job, job)
         
-        return {
-            "job_type": "FILTER_BY_SCORE",
-            "min_score": min_score,
-            "total_high_scorers": len(high_scorers),
-            "high_scorers": high_scorers,
-            "chunk_results": chunk_results
-        }
+        record_job_execution("local")
+        finish_processing_job(job, run_local_job(job), "server")
         
     except Exception as e:
-        return {"error": str(e)}
-
-def execute_generate_report_job():
-    try:
-        print(f"[{get_formatted_time()}] [SERVER-TASK9] Processing: GENERATE_REPORT distributed analysis")
-        
-        report = {
-            "job_type": "GENERATE_REPORT",
-            "generated_at": datetime.now().isoformat(),
-            "replication_analysis": {},
-            "system_analysis": {}
-        }
-        
-        with replication_lock:
-            conn = sqlite3.connect(REPLICATION_DB_PATH)
-            cursor = conn.cursor()
-            
-            for chunk_id in range(3):
-                table_name = f"chunk_{chunk_id}_replica_1"
-                cursor.execute(f"SELECT COUNT(*), AVG(total), MIN(total), MAX(total) FROM {table_name}")
-                stats = cursor.fetchone()
-                
-                count, avg_score, min_score, max_score = stats
-                
-                report["replication_analysis"][f"chunk_{chunk_id}"] = {
-                    "student_count": count,
-                    "average_score": round(avg_score, 2) if avg_score else 0,
-                    "min_score": min_score if min_score else 0,
-                    "max_score": max_score if max_score else 0
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Job execution error: {e}")
+        node_reservations.release(job_id)
+        job_registry.update(job_id, "failed", error_message=str(e), completion_time=time.time())
+
+remote_job_executor = ThreadPoolExecutor(max_workers=JOB_REMOTE_WORKERS, thread_name_prefix="job-remote")
+job_execution_stats = {"local": 0, "remote": 0, "fallback": 0}
+job_execution_lock = threading.Lock()
+job_dispatcher = JobDispatcher(execute_processing_job, select_best_node_for_job)
+
+class MapReduceEngine:
+    def __init__(self, workers=MAP_REDUCE_WORKERS, name="map-reduce"):
+        self.jobs = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.stats_lock = threading.Lock()
+        self.stats = {}
+    
+    def register(self, name, mapper, reducer):
+        self.jobs[name] = (mapper, reducer)
+    
+    def _map(self, mapper, chunk_id, parameters):
+        start = time.perf_counter()
+        partial = mapper(chunk_id, parameters)
+        return partial, time.perf_counter() - start
+    
+    def run(self, name, parameters=None, chunk_ids=None):
+        mapper, reducer = self.jobs[name]
+        parameters = parameters or {}
+        chunk_ids = list(partitioner.chunk_ids() if chunk_ids is None else chunk_ids)
+        print(f"[{get_formatted_time()}] [SERVER-TASK9] Processing: {name} map/reduce over {len(chunk_ids)} chunks")
+        
+        start = time.perf_counter()
+        futures = {chunk_id: self.executor.submit(self._map, mapper, chunk_id, parameters) for chunk_id in chunk_ids}
+        partials = {}
+        map_times = []
+        for chunk_id, future in futures.items():
+            partials[chunk_id], elapsed = future.result()
+            map_times.append(elapsed)
+        result = reducer(partials, parameters)
+        wall = time.perf_counter() - start
+        
+        with self.stats_lock:
+            stats = self.stats.setdefault(name, {"runs": 0, "wall": 0.0, "map_total": 0.0, "map_max": 0.0})
+            stats["runs"] += 1
+            stats["wall"] += wall
+            stats["map_total"] += sum(map_times)
+            stats["map_max"] += max(map_times, default=0)
+        return result
+    
+    def get_stats(self):
+        with self.stats_lock:
+            return {
+                name: {
+                    "runs": stats["runs"],
+                    "avg_wall_ms": round(stats["wall"] / stats["runs"] * 1000, 3),
+                    "avg_map_sum_ms": round(stats["map_total"] / stats["runs"] * 1000, 3),
+                    "avg_map_max_ms": round(stats["map_max"] / stats["runs"] * 1000, 3),
+                    "parallel_speedup": round(stats["map_total"] / stats["wall"], 2) if stats["wall"] else 0
                 }
-            
-            conn.close()
-        
-        report["system_analysis"] = {
-            "total_chunks": 3,
+                for name, stats in self.stats.items()
+            }
+
+map_reduce = MapReduceEngine()
+
+def query_chunk_replica(chunk_id, sql, params=(), fetch_all=True):
+    def fetch(cursor, replica_id):
+        cursor.execute(sql.format(table=f"chunk_{chunk_id}_replica_{replica_id}"), params)
+        return cursor.fetchall() if fetch_all else cursor.fetchone()
+    return replica_set.query(fetch)
+
+def count_students_mapper(chunk_id, parameters):
+    count = query_chunk_replica(chunk_id, "SELECT COUNT(*) FROM {table}", fetch_all=False)[0]
+    print(f"[{get_formatted_time()}] [SERVER-TASK9] Chunk {chunk_id}: {count} students")
+    return count
+
+def count_students_reducer(partials, parameters):
+    return {
+        "job_type": "COUNT_STUDENTS",
+        "total_students": sum(partials.values()),
+        "chunk_distribution": {f"chunk_{chunk_id}": count for chunk_id, count in partials.items()},
+        "replication_factor": 3
+    }
+
+def average_scores_mapper(chunk_id, parameters):
+    students = query_chunk_replica(chunk_id, "SELECT roll_number, total FROM {table}")
+    
+    chunk_scores = [total for roll, total in students]
+    chunk_avg = sum(chunk_scores) / len(chunk_scores) if chunk_scores else 0
+    print(f"[{get_formatted_time()}] [SERVER-TASK9] Chunk {chunk_id}: avg={chunk_avg:.2f}")
+    
+    return sum(chunk_scores), {
+        "average": round(chunk_avg, 2),
+        "student_count": len(chunk_scores),
+        "students": [{"roll": roll, "total": total} for roll, total in students]
+    }
+
+def average_scores_reducer(partials, parameters):
+    total_score = sum(score_sum for score_sum, _ in partials.values())
+    total_students = sum(summary["student_count"] for _, summary in partials.values())
+    
+    return {
+        "job_type": "AVERAGE_SCORES",
+        "overall_average": round(total_score / total_students, 2) if total_students else 0,
+        "total_students": total_students,
+        "chunk_averages": {f"chunk_{chunk_id}": summary for chunk_id, (_, summary) in partials.items()}
+    }
+
+def filter_by_score_mapper(chunk_id, parameters):
+    min_score = parameters.get("min_score", 80)
+    students = query_chunk_replica(chunk_id, "SELECT roll_number, name, total FROM {table} WHERE total >= ?", (min_score,))
+    print(f"[{get_formatted_time()}] [SERVER-TASK9] Chunk {chunk_id}: {len(students)} students above {min_score}")
+    return [{"roll": roll, "name": name, "total": total} for roll, name, total in students]
+
+def filter_by_score_reducer(partials, parameters):
+    high_scorers = [student for chunk_high_scorers in partials.values() for student in chunk_high_scorers]
+    
+    return {
+        "job_type": "FILTER_BY_SCORE",
+        "min_score": parameters.get("min_score", 80),
+        "total_high_scorers": len(high_scorers),
+        "high_scorers": high_scorers,
+        "chunk_results": {f"chunk_{chunk_id}": chunk_high_scorers for chunk_id, chunk_high_scorers in partials.items()}
+    }
+
+def generate_report_mapper(chunk_id, parameters):
+    count, avg_score, min_score, max_score = query_chunk_replica(
+        chunk_id, "SELECT COUNT(*), AVG(total), MIN(total), MAX(total) FROM {table}", fetch_all=False)
+    
+    return {
+        "student_count": count,
+        "average_score": round(avg_score, 2) if avg_score else 0,
+        "min_score": min_score if min_score else 0,
+        "max_score": max_score if max_score else 0
+    }
+
+def generate_report_reducer(partials, parameters):
+    job_counts = job_registry.get_counts()
+    
+    return {
+        "job_type": "GENERATE_REPORT",
+        "generated_at": datetime.now().isoformat(),
+        "replication_analysis": {f"chunk_{chunk_id}": stats for chunk_id, stats in partials.items()},
+        "system_analysis": {
+            "total_chunks": partitioner.num_chunks,
             "replication_factor": 3,
             "cluster_nodes": len(cluster_resources),
-            "active_jobs": len(processing_jobs),
-            "completed_jobs": len(completed_jobs)
+            "active_jobs": job_counts["queued"] + job_counts["running"],
+            "completed_jobs": job_counts["completed"]
         }
-        
-        return report
-        
-    except Exception as e:
-        return {"error": str(e)}
+    }
 
 def execute_process_submissions_job():
     try:
         print(f"[{get_formatted_time()}] [SERVER-TASK9] Processing: PROCESS_SUBMISSIONS analysis")
         
-        with db_lock:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM submission_db")
-            total_submissions = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT server_used, COUNT(*) FROM submission_db GROUP BY server_used")
-            server_distribution = dict(cursor.fetchall())
-            
-            cursor.execute("SELECT submission_type, COUNT(*) FROM submission_db GROUP BY submission_type")
-            submission_types = dict(cursor.fetchall())
-            
-            cursor.execute("SELECT AVG(score), AVG(final_marks) FROM submission_db")
-            avg_stats = cursor.fetchone()
-            
-            conn.close()
+        conn = db_pool.acquire(DB_PATH)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT COUNT(*) FROM submission_db")
+        total_submissions = cursor.fetchone()[0]
+        
+        cursor.execute("SELECT server_used, COUNT(*) FROM submission_db GROUP BY server_used")
+        server_distribution = dict(cursor.fetchall())
+        
+        cursor.execute("SELECT submission_type, COUNT(*) FROM submission_db GROUP BY submission_type")
+        submission_types = dict(cursor.fetchall())
+        
+        cursor.execute("SELECT AVG(score), AVG(final_marks) FROM submission_db")
+        avg_stats = cursor.fetchone()
+        
+        db_pool.release(DB_PATH, conn)
         
         return {
             "job_type": "PROCESS_SUBMISSIONS",
@@ -635,6 +1367,45 @@ def execute_process_submissions_job():
     except Exception as e:
         return {"error": str(e)}
 
+def replica_data_version():
+    parts = []
+    for chunk_id in partitioner.chunk_ids():
+        count, version_sum = query_chunk_replica(chunk_id, "SELECT COUNT(*), COALESCE(SUM(version), 0) FROM {table}", fetch_all=False)
+        parts.append(f"{chunk_id}:{count}:{version_sum}")
+    return ",".join(parts)
+
+def submissions_data_version():
+    conn = db_pool.acquire(DB_PATH)
+    try:
+        count, last_row = conn.execute("SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM submission_db").fetchone()
+    finally:
+        db_pool.release(DB_PATH, conn)
+    return f"{count}:{last_row}"
+
+LOCAL_JOB_HANDLERS = {
+    "PROCESS_SUBMISSIONS": lambda parameters: execute_process_submissions_job()
+}
+JOB_DATA_VERSIONS = {
+    "PROCESS_SUBMISSIONS": submissions_data_version
+}
+
+def run_map_reduce_job(name, parameters):
+    try:
+        return map_reduce.run(name, parameters)
+    except Exception as e:
+        return {"error": str(e)}
+
+def register_map_reduce_job(name, mapper, reducer, data_version=replica_data_version):
+    map_reduce.register(name, mapper, reducer)
+    LOCAL_JOB_HANDLERS[name] = lambda parameters: run_map_reduce_job(name, parameters)
+    if data_version is not None:
+        JOB_DATA_VERSIONS[name] = data_version
+
+register_map_reduce_job("COUNT_STUDENTS", count_students_mapper, count_students_reducer)
+register_map_reduce_job("AVERAGE_SCORES", average_scores_mapper, average_scores_reducer)
+register_map_reduce_job("FILTER_BY_SCORE", filter_by_score_mapper, filter_by_score_reducer)
+register_map_reduce_job("GENERATE_REPORT", generate_report_mapper, generate_report_reducer, data_version=None)
+
 def monitor_cluster_health():
     try:
         current_time = time.time()
@@ -656,15 +1427,68 @@ def monitor_cluster_health():
 
 def cleanup_old_jobs():
     try:
-        current_time = time.time()
-        
-        global completed_jobs, failed_jobs
-        completed_jobs = [job for job in completed_jobs if current_time - job.get("completion_time", 0) < 3600]
-        failed_jobs = [job for job in failed_jobs if current_time - job.get("submit_time", 0) < 3600]
+        job_registry.evict()
+        expired = node_reservations.expire()
+        if expired:
+            print(f"[{get_formatted_time()}] [SERVER-TASK9] Released {expired} overdue node reservations")
         
     except Exception as e:
         print(f"[{get_formatted_time()}] [SERVER-TASK9] Job cleanup error: {e}")
 
+class RowCache:
+    def __init__(self, capacity=ROW_CACHE_SIZE):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+    
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[2] is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[2]
+    
+    def put(self, key, version, value):
+        with self.lock:
+            entry = self.entries.get(key)
+            floor = entry[0] if entry else 0
+            if version < floor:
+                return False
+            self.entries[key] = [floor, version, value]
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            return True
+    
+    def invalidate(self, key, version):
+        with self.lock:
+            entry = self.entries.setdefault(key, [0, 0, None])
+            entry[0] = max(entry[0], version)
+            if entry[1] < entry[0]:
+                entry[1], entry[2] = 0, None
+            self.entries.move_to_end(key)
+            self.stats["invalidations"] += 1
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+    
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["size"] = sum(1 for entry in self.entries.values() if entry[2] is not None)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups * 100, 1) if lookups else 0
+        return stats
+
+partitioner = ChunkPartitioner()
+replica_set = ReplicaSet(db_pool, REPLICATION_DB_PATH)
+row_cache = RowCache()
+
 def initialize_replication_system():
     global replication_initialized
     
@@ -694,12 +1518,12 @@ def setup_replication_database():
             conn = sqlite3.connect(REPLICATION_DB_PATH)
             cursor = conn.cursor()
             
-            print(f"[{get_formatted_time()}] [SERVER-TASK8] Setting up chunk replica tables...")
+            print(f"[{get_formatted_time()}] [SERVER-TASK8] Setting up chunk replica tables ({replica_set.layout} layout)...")
             
-            for chunk_id in range(3):
-                for replica_id in range(1, 4):
+            def create_replica_tables(replica_cursor, replica_id):
+                for chunk_id in partitioner.chunk_ids():
                     table_name = f"chunk_{chunk_id}_replica_{replica_id}"
-                    cursor.execute(f'''
+                    replica_cursor.execute(f'''
                         CREATE TABLE IF NOT EXISTS {table_name} (
                             roll_number INTEGER PRIMARY KEY,
                             name TEXT NOT NULL,
@@ -711,7 +1535,11 @@ def setup_replication_database():
                             version INTEGER DEFAULT 1
                         )
                     ''')
-                    print(f"[{get_formatted_time()}] [SERVER-TASK8] Created table: {table_name}")
+                    print(f"[{get_formatted_time()}] [SERVER-TASK8] Created table: {table_name} in {replica_set.path(replica_id)}")
+            
+            for replica_id, result in replica_set.write(create_replica_tables, record=False).items():
+                if isinstance(result, Exception):
+                    raise result
             
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS chunk_metadata (
@@ -722,6 +1550,12 @@ def setup_replication_database():
                 )
             ''')
             
+            ensure_columns(cursor, "chunk_metadata", {
+                "range_start": "INTEGER",
+                "range_end": "INTEGER",
+                "partition_mode": "TEXT DEFAULT 'range'"
+            })
+            
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS replica_status (
                     chunk_id INTEGER,
@@ -739,6 +1573,21 @@ def setup_replication_database():
         except Exception as e:
             print(f"[{get_formatted_time()}] [SERVER-TASK8] Replication database setup failed: {e}")
 
+def load_partition_map():
+    with replication_lock:
+        try:
+            conn = sqlite3.connect(REPLICATION_DB_PATH)
+            try:
+                rows = conn.execute("SELECT chunk_id, range_start FROM chunk_metadata WHERE status = 'active'").fetchall()
+            finally:
+                conn.close()
+        except sqlite3.OperationalError:
+            return 0
+        
+        partitioner.load(rows)
+        print(f"[{get_formatted_time()}] [SERVER-TASK8] Loaded partition map for {len(rows)} chunks")
+        return len(rows)
+
 def create_chunks_and_replicas():
     students_data = [
         {"roll": 29, "name": "Mayuresh", "ISA": 95, "MSE": 87, "ESE": 92},
@@ -748,53 +1597,71 @@ def create_chunks_and_replicas():
         {"roll": 52, "name": "Rushikesh", "ISA": 90, "MSE": 88, "ESE": 95}
     ]
     
-    chunks = [
-        {"chunk_id": 0, "students": students_data[0:2], "range": "29-40"},
-        {"chunk_id": 1, "students": students_data[2:4], "range": "42-50"},
-        {"chunk_id": 2, "students": students_data[4:5], "range": "52"}
-    ]
+    students_by_roll = {student["roll"]: student for student in students_data}
+    chunks = []
+    for chunk_id, rolls in partitioner.plan(students_by_roll):
+        chunks.append({
+            "chunk_id": chunk_id,
+            "students": [students_by_roll[roll] for roll in rolls],
+            "range": partitioner.describe(rolls),
+            "range_start": rolls[0] if rolls and partitioner.mode == "range" else None,
+            "range_end": rolls[-1] if rolls and partitioner.mode == "range" else None
+        })
     
     with replication_lock:
         try:
-            conn = sqlite3.connect(REPLICATION_DB_PATH)
-            cursor = conn.cursor()
-            
-            for chunk in chunks:
-                chunk_id = chunk["chunk_id"]
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO chunk_metadata (chunk_id, student_range, replica_count, status)
-                    VALUES (?, ?, 3, 'active')
-                ''', (chunk_id, chunk["range"]))
-                
-                print(f"[{get_formatted_time()}] [SERVER-TASK8] Creating Chunk {chunk_id} with students {chunk['range']}")
-                
-                for replica_id in range(1, 4):
-                    table_name = f"chunk_{chunk_id}_replica_{replica_id}"
+            def populate_replica(replica_cursor, replica_id):
+                for chunk in chunks:
+                    table_name = f"chunk_{chunk['chunk_id']}_replica_{replica_id}"
                     
-                    cursor.execute(f"DELETE FROM {table_name}")
+                    replica_cursor.execute(f"DELETE FROM {table_name}")
                     
                     for student in chunk["students"]:
                         total = student["ISA"] + student["MSE"] + student["ESE"]
-                        cursor.execute(f'''
+                        replica_cursor.execute(f'''
                             INSERT INTO {table_name} 
                             (roll_number, name, ISA, MSE, ESE, total, last_updated, version)
                             VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, 1)
                         ''', (student["roll"], student["name"], student["ISA"], 
                               student["MSE"], student["ESE"], total))
-                    
+            
+            for replica_id, result in replica_set.write(populate_replica, record=False).items():
+                if isinstance(result, Exception):
+                    raise result
+            
+            conn = sqlite3.connect(REPLICATION_DB_PATH)
+            cursor = conn.cursor()
+            
+            cursor.execute("DELETE FROM chunk_metadata WHERE chunk_id >= ?", (partitioner.num_chunks,))
+            
+            for chunk in chunks:
+                chunk_id = chunk["chunk_id"]
+                
+                cursor.execute('''
+                    INSERT OR REPLACE INTO chunk_metadata 
+                    (chunk_id, student_range, replica_count, status, range_start, range_end, partition_mode)
+                    VALUES (?, ?, 3, 'active', ?, ?, ?)
+                ''', (chunk_id, chunk["range"], chunk["range_start"], chunk["range_end"], partitioner.mode))
+                
+                print(f"[{get_formatted_time()}] [SERVER-TASK8] Creating Chunk {chunk_id} with students {chunk['range']}")
+            
+            for chunk in chunks:
+                for replica_id in replica_set.replica_ids():
                     cursor.execute('''
                         INSERT OR REPLACE INTO replica_status 
                         (chunk_id, replica_id, node_location, status, last_sync)
                         VALUES (?, ?, ?, 'online', CURRENT_TIMESTAMP)
-                    ''', (chunk_id, replica_id, f"node_{replica_id}"))
+                    ''', (chunk["chunk_id"], replica_id, f"node_{replica_id}"))
                     
-                    print(f"[{get_formatted_time()}] [SERVER-TASK8] Replicated Chunk {chunk_id} to Node {replica_id}")
+                    print(f"[{get_formatted_time()}] [SERVER-TASK8] Replicated Chunk {chunk['chunk_id']} to Node {replica_id} ({replica_set.path(replica_id)})")
             
             conn.commit()
+            
+            cursor.execute("SELECT chunk_id, range_start FROM chunk_metadata WHERE status = 'active'")
+            partitioner.load(cursor.fetchall())
             conn.close()
             
-            print(f"[{get_formatted_time()}] [SERVER-TASK8] All chunks replicated successfully with RF=3")
+            print(f"[{get_formatted_time()}] [SERVER-TASK8] All chunks replicated successfully with RF=3 ({partitioner.num_chunks} chunks, {partitioner.mode} partitioning)")
             
         except Exception as e:
             print(f"[{get_formatted_time()}] [SERVER-TASK8] Chunk creation failed: {e}")
@@ -802,136 +1669,191 @@ def create_chunks_and_replicas():
 def start_replication_sync_process():
     def sync_replicas():
         while True:
-            time.sleep(15)
+            chunk_ids = list(partitioner.chunk_ids())
+            pause = ANTI_ENTROPY_INTERVAL / max(len(chunk_ids), 1)
             
-            try:
-                with replication_lock:
-                    conn = sqlite3.connect(REPLICATION_DB_PATH)
-                    cursor = conn.cursor()
-                    
-                    cursor.execute("SELECT chunk_id, student_range FROM chunk_metadata WHERE status='active'")
-                    chunks = cursor.fetchall()
-                    
-                    for chunk_id, student_range in chunks:
-                        
-                        primary_table = f"chunk_{chunk_id}_replica_1"
-                        cursor.execute(f"SELECT COUNT(*) FROM {primary_table}")
-                        record_count = cursor.fetchone()[0]
-                        
-                        if record_count > 0:
-                            print(f"[{get_formatted_time()}] [SERVER-TASK8] Sync check: Chunk {chunk_id} ({student_range}) - {record_count} records consistent across 3 replicas")
-                    
-                    conn.close()
-                    
-            except Exception as e:
-                print(f"[{get_formatted_time()}] [SERVER-TASK8] Sync process error: {e}")
+            for chunk_id in chunk_ids:
+                time.sleep(pause)
+                try:
+                    anti_entropy_chunk(chunk_id)
+                except Exception as e:
+                    print(f"[{get_formatted_time()}] [SERVER-TASK8] Sync process error: {e}")
+            
+            with anti_entropy_lock:
+                anti_entropy_stats["passes"] += 1
+                anti_entropy_stats["last_pass"] = get_formatted_time()
     
     sync_thread = threading.Thread(target=sync_replicas, daemon=True)
     sync_thread.start()
 
+chunk_locks = ChunkLockManager()
+
 def acquire_read_lock(chunk_id):
-    if chunk_id not in read_locks:
-        read_locks[chunk_id] = 0
-    if chunk_id not in write_locks:
-        write_locks[chunk_id] = False
-    
-    while write_locks[chunk_id]:
-        time.sleep(0.1)
+    if not chunk_locks.acquire_read(chunk_id):
+        print(f"[{get_formatted_time()}] [SERVER-TASK8] Read lock timed out for Chunk {chunk_id}")
+        return False
     
-    read_locks[chunk_id] += 1
-    print(f"[{get_formatted_time()}] [SERVER-TASK8] Read lock acquired for Chunk {chunk_id} (readers: {read_locks[chunk_id]})")
+    print(f"[{get_formatted_time()}] [SERVER-TASK8] Read lock acquired for Chunk {chunk_id} (readers: {chunk_locks.get_chunk_state(chunk_id)['readers']})")
     return True
 
 def release_read_lock(chunk_id):
-    if chunk_id in read_locks:
-        read_locks[chunk_id] = max(0, read_locks[chunk_id] - 1)
-        print(f"[{get_formatted_time()}] [SERVER-TASK8] Read lock released for Chunk {chunk_id} (readers: {read_locks[chunk_id]})")
+    chunk_locks.release_read(chunk_id)
+    print(f"[{get_formatted_time()}] [SERVER-TASK8] Read lock released for Chunk {chunk_id} (readers: {chunk_locks.get_chunk_state(chunk_id)['readers']})")
 
 def acquire_write_lock(chunk_id):
-    if chunk_id not in read_locks:
-        read_locks[chunk_id] = 0
-    if chunk_id not in write_locks:
-        write_locks[chunk_id] = False
-    
-    while write_locks[chunk_id] or read_locks[chunk_id] > 0:
-        time.sleep(0.1)
+    if not chunk_locks.acquire_write(chunk_id):
+        print(f"[{get_formatted_time()}] [SERVER-TASK8] Write lock timed out for Chunk {chunk_id}")
+        return False
     
-    write_locks[chunk_id] = True
     print(f"[{get_formatted_time()}] [SERVER-TASK8] Write lock acquired for Chunk {chunk_id} (exclusive access)")
     return True
 
 def release_write_lock(chunk_id):
-    if chunk_id in write_locks:
-        write_locks[chunk_id] = False
-        print(f"[{get_formatted_time()}] [SERVER-TASK8] Write lock released for Chunk {chunk_id}")
+    chunk_locks.release_write(chunk_id)
+    print(f"[{get_formatted_time()}] [SERVER-TASK8] Write lock released for Chunk {chunk_id}")
+
+REPLICA_ROW_COLUMNS = "roll_number, name, ISA, MSE, ESE, total, version"
+
+def fetch_replica_row(chunk_id, student_id):
+    def fetch(cursor, replica_id):
+        cursor.execute(f"SELECT {REPLICA_ROW_COLUMNS} FROM chunk_{chunk_id}_replica_{replica_id} WHERE roll_number = ?", (student_id,))
+        return cursor.fetchone()
+    return fetch
+
+def replica_upsert_sql(table_name, allow_equal=False):
+    return f'''
+        INSERT INTO {table_name} ({REPLICA_ROW_COLUMNS}, last_updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(roll_number) DO UPDATE SET
+            name = excluded.name, ISA = excluded.ISA, MSE = excluded.MSE, ESE = excluded.ESE,
+            total = excluded.total, version = excluded.version, last_updated = CURRENT_TIMESTAMP
+        WHERE excluded.version {'>=' if allow_equal else '>'} {table_name}.version
+    '''
+
+def upsert_replica_row(cursor, table_name, row, allow_equal=False):
+    cursor.execute(replica_upsert_sql(table_name, allow_equal), row)
+    return cursor.rowcount > 0
+
+def repair_replica_row(chunk_id):
+    def repair(cursor, replica_id, row):
+        upsert_replica_row(cursor, f"chunk_{chunk_id}_replica_{replica_id}", row)
+    return repair
+
+anti_entropy_stats = {"passes": 0, "chunks_checked": 0, "divergent_rows": 0, "repaired_rows": 0, "last_pass": None}
+anti_entropy_lock = threading.Lock()
+
+def anti_entropy_chunk(chunk_id):
+    if not chunk_locks.acquire_read(chunk_id):
+        return None
+    try:
+        trees = {}
+        for replica_id in replica_set.replica_ids():
+            with replica_set.connection(replica_id) as conn:
+                trees[replica_id] = MerkleTree(conn.execute(f"SELECT {REPLICA_ROW_COLUMNS} FROM chunk_{chunk_id}_replica_{replica_id}"))
+    finally:
+        chunk_locks.release_read(chunk_id)
+    
+    divergent, repairs = plan_anti_entropy_repairs(trees)
+    repaired = 0
+    for replica_id, rows in repairs.items():
+        table_name = f"chunk_{chunk_id}_replica_{replica_id}"
+        with replica_set.connection(replica_id) as conn:
+            cursor = conn.cursor()
+            for row in rows:
+                repaired += upsert_replica_row(cursor, table_name, row, allow_equal=True)
+            conn.commit()
+    
+    with anti_entropy_lock:
+        anti_entropy_stats["chunks_checked"] += 1
+        anti_entropy_stats["divergent_rows"] += len(divergent)
+        anti_entropy_stats["repaired_rows"] += repaired
+    
+    if divergent:
+        print(f"[{get_formatted_time()}] [SERVER-TASK8] Anti-entropy: Chunk {chunk_id} had {len(divergent)} divergent rows, repaired {repaired} replica rows")
+    return {"chunk_id": chunk_id, "root": trees[1].root.hex(), "divergent": len(divergent), "repaired": repaired}
 
-def read_from_replicas(student_id):
-    chunk_id = get_chunk_for_student(student_id)
+def read_from_replicas(student_id, consistency=None):
+    consistency = consistency or READ_CONSISTENCY
+    try:
+        chunk_id = get_chunk_for_student(student_id)
+    except LookupError as e:
+        print(f"[{get_formatted_time()}] [SERVER-TASK8] Read failed for student {student_id}: {e}")
+        return None
+    
+    cached = row_cache.get(student_id)
+    if cached is not None:
+        print(f"[{get_formatted_time()}] [SERVER-TASK8] Read student {student_id} from cache (version {cached['version']})")
+        return dict(cached)
     
     if acquire_read_lock(chunk_id):
         try:
-            with replication_lock:
-                conn = sqlite3.connect(REPLICATION_DB_PATH)
-                cursor = conn.cursor()
-                
-                table_name = f"chunk_{chunk_id}_replica_1"
-                cursor.execute(f'''
-                    SELECT roll_number, name, ISA, MSE, ESE, total 
-                    FROM {table_name} WHERE roll_number = ?
-                ''', (student_id,))
-                
-                result = cursor.fetchone()
-                conn.close()
-                
-                if result:
-                    print(f"[{get_formatted_time()}] [SERVER-TASK8] Read student {student_id} from Chunk {chunk_id}")
-                    return {
-                        "roll": result[0],
-                        "name": result[1],
-                        "ISA": result[2],
-                        "MSE": result[3],
-                        "ESE": result[4],
-                        "total": result[5]
-                    }
+            outcome = replica_set.read(fetch_replica_row(chunk_id, student_id), consistency, repair=repair_replica_row(chunk_id))
+            
+            if outcome["stale"]:
+                print(f"[{get_formatted_time()}] [SERVER-TASK8] Read repair: student {student_id} replicas {outcome['stale']} behind version {outcome['version']}")
+            
+            if not outcome["succeeded"]:
+                print(f"[{get_formatted_time()}] [SERVER-TASK8] Read {consistency} failed for student {student_id}: {outcome['acks']}/{outcome['required']} replicas answered")
                 return None
-                
+            
+            result = outcome["row"]
+            if result:
+                print(f"[{get_formatted_time()}] [SERVER-TASK8] Read student {student_id} from Chunk {chunk_id} ({consistency}, version {outcome['version']})")
+                student = {
+                    "roll": result[0],
+                    "name": result[1],
+                    "ISA": result[2],
+                    "MSE": result[3],
+                    "ESE": result[4],
+                    "total": result[5],
+                    "version": result[6]
+                }
+                row_cache.put(student_id, result[6], student)
+                return dict(student)
+            return None
+            
         finally:
             release_read_lock(chunk_id)
     
     return None
 
-def write_to_replicas(student_id, updates):
-    chunk_id = get_chunk_for_student(student_id)
+def write_to_replicas(student_id, updates, consistency=None):
+    consistency = consistency or WRITE_CONSISTENCY
+    try:
+        chunk_id = get_chunk_for_student(student_id)
+    except LookupError as e:
+        print(f"[{get_formatted_time()}] [SERVER-TASK8] Write failed for student {student_id}: {e}")
+        return False
     
     if acquire_write_lock(chunk_id):
         try:
-            print(f"[{get_formatted_time()}] [SERVER-TASK8] Writing updates for student {student_id} to all replicas...")
+            print(f"[{get_formatted_time()}] [SERVER-TASK8] Writing updates for student {student_id} to replicas ({consistency})...")
+            
+            current = replica_set.read(fetch_replica_row(chunk_id, student_id), "ALL", record=False)
+            if current["row"] is None:
+                print(f"[{get_formatted_time()}] [SERVER-TASK8] Student {student_id} not found on any replica of Chunk {chunk_id}")
+                return False
+            
+            total = updates.get("ISA", 0) + updates.get("MSE", 0) + updates.get("ESE", 0)
+            row = (student_id, current["row"][1], updates.get("ISA", 0), updates.get("MSE", 0),
+                   updates.get("ESE", 0), total, current["version"] + 1)
+            
+            def update_replica(cursor, replica_id):
+                if not upsert_replica_row(cursor, f"chunk_{chunk_id}_replica_{replica_id}", row):
+                    raise ValueError(f"replica {replica_id} already holds a newer version of student {student_id}")
+            
+            row_cache.invalidate(student_id, row[-1])
+            results = replica_set.write(update_replica, consistency)
+            print(f"[{get_formatted_time()}] [SERVER-TASK8] Replica write latency for student {student_id}: {format_replica_latencies(results)}")
+            
+            acks = replica_set.acks(results)
+            if acks < replica_set.required_acks(consistency):
+                print(f"[{get_formatted_time()}] [SERVER-TASK8] Write {consistency} failed for student {student_id}: {acks}/{replica_set.required_acks(consistency)} acks")
+                return False
+            
+            print(f"[{get_formatted_time()}] [SERVER-TASK8] Replicas acknowledged version {row[-1]} for student {student_id} ({acks} acks, {consistency})")
+            return True
             
-            with replication_lock:
-                conn = sqlite3.connect(REPLICATION_DB_PATH)
-                cursor = conn.cursor()
-                
-                for replica_id in range(1, 4):
-                    table_name = f"chunk_{chunk_id}_replica_{replica_id}"
-                    
-                    total = updates.get("ISA", 0) + updates.get("MSE", 0) + updates.get("ESE", 0)
-                    
-                    cursor.execute(f'''
-                        UPDATE {table_name} 
-                        SET ISA = ?, MSE = ?, ESE = ?, total = ?, 
-                            last_updated = CURRENT_TIMESTAMP, version = version + 1
-                        WHERE roll_number = ?
-                    ''', (updates.get("ISA", 0), updates.get("MSE", 0), 
-                          updates.get("ESE", 0), total, student_id))
-                    
-                    print(f"[{get_formatted_time()}] [SERVER-TASK8] Updated student {student_id} in {table_name}")
-                
-                conn.commit()
-                conn.close()
-                
-                print(f"[{get_formatted_time()}] [SERVER-TASK8] All replicas updated successfully for student {student_id}")
-                return True
-                
         except Exception as e:
             print(f"[{get_formatted_time()}] [SERVER-TASK8] Write to replicas failed: {e}")
             return False
@@ -940,15 +1862,104 @@ def write_to_replicas(student_id, updates):
     
     return False
 
+def latest_replica_rows(chunk_id, student_ids):
+    placeholders = ", ".join("?" for _ in student_ids)
+    
+    def fetch(cursor, replica_id):
+        cursor.execute(f"SELECT {REPLICA_ROW_COLUMNS} FROM chunk_{chunk_id}_replica_{replica_id} WHERE roll_number IN ({placeholders})", student_ids)
+        return cursor.fetchall()
+    
+    latest = {}
+    for response in replica_set.collect(fetch, replica_set.replication_factor).values():
+        if response is None or isinstance(response, Exception):
+            continue
+        for row in response[0]:
+            if row[0] not in latest or row[-1] > latest[row[0]][-1]:
+                latest[row[0]] = row
+    return latest
+
+def write_chunk_batch(chunk_id, updates, consistency):
+    if not acquire_write_lock(chunk_id):
+        return {student_id: ("failed", "write lock timeout", None) for student_id in updates}
+    try:
+        latest = latest_replica_rows(chunk_id, list(updates))
+        outcomes = {student_id: ("not_found", "student not on any replica", None) for student_id in updates if student_id not in latest}
+        rows = []
+        for student_id, update in updates.items():
+            if student_id in latest:
+                total = update.get("ISA", 0) + update.get("MSE", 0) + update.get("ESE", 0)
+                rows.append((student_id, latest[student_id][1], update.get("ISA", 0), update.get("MSE", 0),
+                             update.get("ESE", 0), total, latest[student_id][-1] + 1))
+        if not rows:
+            return outcomes
+        
+        def update_replica(cursor, replica_id):
+            cursor.executemany(replica_upsert_sql(f"chunk_{chunk_id}_replica_{replica_id}"), rows)
+            if cursor.rowcount < len(rows):
+                raise ValueError(f"replica {replica_id} already holds newer versions for {len(rows) - cursor.rowcount} rows")
+        
+        for row in rows:
+            row_cache.invalidate(row[0], row[-1])
+        results = replica_set.write(update_replica, consistency)
+        acks = replica_set.acks(results)
+        print(f"[{get_formatted_time()}] [SERVER-TASK8] Batch write to Chunk {chunk_id}: {len(rows)} rows, {acks} acks ({consistency}) | {format_replica_latencies(results)}")
+        
+        if acks >= replica_set.required_acks(consistency):
+            outcomes.update({row[0]: ("applied", None, row[-1]) for row in rows})
+        else:
+            errors = "; ".join(str(result) for result in results.values() if isinstance(result, Exception))
+            outcomes.update({row[0]: ("failed", f"{acks}/{replica_set.required_acks(consistency)} acks: {errors}", None) for row in rows})
+        return outcomes
+    
+    except Exception as e:
+        return {student_id: ("failed", str(e), None) for student_id in updates}
+    finally:
+        release_write_lock(chunk_id)
+
+def write_batch_to_replicas(updates, consistency=None):
+    consistency = consistency or WRITE_CONSISTENCY
+    by_chunk = {}
+    rejected = {}
+    last_index = {}
+    for index, update in enumerate(updates):
+        try:
+            student_id = int(update["student_id"])
+        except KeyError:
+            rejected[index] = (None, "missing student_id")
+            continue
+        except (TypeError, ValueError) as e:
+            rejected[index] = (None, f"invalid student_id: {e}")
+            continue
+        try:
+            chunk_id = get_chunk_for_student(student_id)
+        except LookupError as e:
+            rejected[index] = (student_id, str(e))
+            continue
+        by_chunk.setdefault(chunk_id, {})[student_id] = update
+        last_index[student_id] = index
+    
+    print(f"[{get_formatted_time()}] [SERVER-TASK8] Batch write: {len(updates)} updates across {len(by_chunk)} chunks ({consistency})")
+    
+    outcomes = {}
+    for chunk_id, chunk_updates in sorted(by_chunk.items()):
+        outcomes.update(write_chunk_batch(chunk_id, chunk_updates, consistency))
+    
+    results = []
+    for index, update in enumerate(updates):
+        if index in rejected:
+            student_id, error = rejected[index]
+            results.append({"student_id": student_id, "status": "failed", "version": None, "error": error})
+            continue
+        student_id = int(update["student_id"])
+        status, error, version = outcomes[student_id] if last_index[student_id] == index else ("superseded", "later update in the same batch", None)
+        results.append({"student_id": student_id, "status": status, "version": version, "error": error})
+    
+    applied = sum(1 for result in results if result["status"] == "applied")
+    print(f"[{get_formatted_time()}] [SERVER-TASK8] Batch write finished: {applied}/{len(results)} applied")
+    return {"applied": applied, "failed": len(results) - applied, "chunks": len(by_chunk), "results": results}
+
 def get_chunk_for_student(student_id):
-    if student_id in [29, 40]:
-        return 0
-    elif student_id in [42, 50]:
-        return 1
-    elif student_id == 52:
-        return 2
-    else:
-        return 0
+    return partitioner.chunk_for(student_id)
 
 def show_replication_status():
     print(f"\n[{get_formatted_time()}] " + "="*80)
@@ -975,7 +1986,7 @@ def show_replication_status():
                 print(f"[{get_formatted_time()}] Chunk {chunk_id} Replica {replica_id}: {node_location} ({status})")
             
             print(f"\n[{get_formatted_time()}] SAMPLE DATA FROM REPLICAS:")
-            for chunk_id in range(3):
+            for chunk_id in partitioner.chunk_ids():
                 table_name = f"chunk_{chunk_id}_replica_1"
                 cursor.execute(f"SELECT roll_number, name, total FROM {table_name} LIMIT 2")
                 students = cursor.fetchall()
@@ -984,10 +1995,37 @@ def show_replication_status():
                     print(f"[{get_formatted_time()}] Chunk {chunk_id}: {roll} ({name}) Total: {total}")
             
             print(f"\n[{get_formatted_time()}] LOCK STATUS:")
-            for chunk_id in range(3):
-                readers = read_locks.get(chunk_id, 0)
-                writers = "LOCKED" if write_locks.get(chunk_id, False) else "FREE"
-                print(f"[{get_formatted_time()}] Chunk {chunk_id}: Read locks: {readers} | Write lock: {writers}")
+            for chunk_id in partitioner.chunk_ids():
+                lock_state = chunk_locks.get_chunk_state(chunk_id)
+                writers = "LOCKED" if lock_state["writer"] else "FREE"
+                print(f"[{get_formatted_time()}] Chunk {chunk_id}: Read locks: {lock_state['readers']} | Write lock: {writers} | Waiting writers: {lock_state['waiting_writers']}")
+            
+            lock_stats = chunk_locks.get_stats()
+            for mode in ("read", "write"):
+                stats = lock_stats[mode]
+                print(f"[{get_formatted_time()}] {mode.capitalize()} locks: {stats['acquired']} acquired | avg wait {stats['avg_wait_us']} us | max wait {stats['max_wait_ms']} ms | timeouts {stats['timeouts']}")
+            
+            print(f"\n[{get_formatted_time()}] REPLICA WRITE LATENCY ({replica_set.layout} layout):")
+            for replica_id, stats in replica_set.get_stats().items():
+                print(f"[{get_formatted_time()}] Replica {replica_id} ({stats['path']}): {stats['writes']} writes | avg {stats['avg_ms']} ms | p99 {stats['p99_ms']} ms | failures {stats['failures']}")
+            
+            print(f"\n[{get_formatted_time()}] CONSISTENCY LEVEL LATENCY (reads {READ_CONSISTENCY}, writes {WRITE_CONSISTENCY} by default):")
+            consistency_stats = replica_set.get_consistency_stats()
+            for operation in ("read", "write"):
+                for consistency, stats in consistency_stats.get(operation, {}).items():
+                    print(f"[{get_formatted_time()}] {operation.capitalize()} {consistency}: {stats['count']} ok | p50 {stats['p50_ms']} ms | p95 {stats['p95_ms']} ms | p99 {stats['p99_ms']} ms | failures {stats['failures']}")
+            print(f"[{get_formatted_time()}] Read repairs issued: {consistency_stats['read_repairs']}")
+            
+            print(f"\n[{get_formatted_time()}] REPLICA READ DISTRIBUTION ({replica_set.read_policy}):")
+            for replica_id, stats in replica_set.get_read_distribution().items():
+                health = "healthy" if stats["healthy"] else "backing off"
+                print(f"[{get_formatted_time()}] Replica {replica_id}: {stats['reads']} reads ({stats['share']}%) | ewma {stats['ewma_ms']} ms | {health}")
+            cache_stats = row_cache.get_stats()
+            print(f"[{get_formatted_time()}] Row cache: {cache_stats['hit_rate']}% hit rate | {cache_stats['hits']} hits | {cache_stats['misses']} misses | {cache_stats['invalidations']} invalidations | {cache_stats['size']}/{row_cache.capacity} rows")
+            
+            with anti_entropy_lock:
+                entropy = dict(anti_entropy_stats)
+            print(f"[{get_formatted_time()}] Anti-entropy: {entropy['passes']} passes | {entropy['chunks_checked']} chunk checks | {entropy['divergent_rows']} divergent rows | {entropy['repaired_rows']} repaired | last pass {entropy['last_pass']}")
             
             conn.close()
     
@@ -1001,7 +2039,7 @@ def start_backup_server():
     global backup_server_instance, backup_running
     
     def backup_server_thread():
-        global backup_running
+        global backup_running, backup_server_instance
         backup_running = True
         
         try:
@@ -1010,14 +2048,16 @@ def start_backup_server():
             
             print(f"[{get_formatted_time()}] [BACKUP-SERVER] Starting on {local_ip}:{BACKUP_PORT}")
             
-            backup_server_instance = SimpleXMLRPCServer(("0.0.0.0", BACKUP_PORT), allow_none=True)
+            backup_server_instance = PooledXMLRPCServer(("0.0.0.0", BACKUP_PORT), name="backup", allow_none=True)
             
             backup_server_instance.register_function(backup_start_interactive_exam, "start_interactive_exam")
             backup_server_instance.register_function(backup_get_question, "get_question")
             backup_server_instance.register_function(backup_submit_answer, "submit_answer")
+            backup_server_instance.register_function(backup_submit_answer_and_get_next, "submit_answer_and_get_next")
             backup_server_instance.register_function(backup_submit_exam_final, "submit_exam_final")
+            backup_server_instance.register_multicall_functions()
             
-            print(f"[{get_formatted_time()}] [BACKUP-SERVER] Ready to serve on port {BACKUP_PORT}")
+            print(f"[{get_formatted_time()}] [BACKUP-SERVER] Ready to serve on port {BACKUP_PORT} ({RPC_WORKER_THREADS} workers, queue depth {RPC_QUEUE_DEPTH})")
             
             backup_server_instance.serve_forever()
             
@@ -1044,8 +2084,8 @@ def register(client, teacher):
     print(f"[{get_formatted_time()}] [SERVER] Registering teacher: {teacher}")
     
     try:
-        clients["client"] = xmlrpc.client.ServerProxy(client + "/RPC2", allow_none=True)
-        clients["teacher"] = xmlrpc.client.ServerProxy(teacher + "/RPC2", allow_none=True)
+        clients["client"] = PooledServerProxy(client, timeout=RPC_PEER_TIMEOUT)
+        clients["teacher"] = PooledServerProxy(teacher, timeout=RPC_PEER_TIMEOUT)
         teacher_proxy = clients["teacher"]
         
         test_client = clients["client"].get_time_for_berkeley()
@@ -1110,11 +2150,13 @@ def check_load_balancing():
 def start_interactive_exam(student_id):
     global total_requests, main_server_processed, backup_server_processed
     
-    total_requests += 1
+    with load_balancer_lock:
+        total_requests += 1
+        request_number = total_requests
     
-    print(f"[{get_formatted_time()}] [SERVER-TASK7] Request #{total_requests} for student {student_id}")
+    print(f"[{get_formatted_time()}] [SERVER-TASK7] Request #{request_number} for student {student_id}")
     
-    if student_id in main_exam_sessions or student_id in backup_exam_sessions:
+    if exam_sessions.get(student_id) is not None:
         print(f"[{get_formatted_time()}] [SERVER-TASK7] Student {student_id} already has active session")
         return {"success": False, "message": "Student already has active exam session"}
     
@@ -1129,293 +2171,146 @@ def start_interactive_exam(student_id):
     else:
         return process_exam_on_main(student_id)
 
-def process_exam_on_backup_direct(student_id):
-    global backup_server_processed
-    
-    backup_server_processed += 1
-    
-    print(f"[{get_formatted_time()}] [SERVER-BACKUP] Processing exam for student {student_id}")
-    
-    exam_session = {
-        "student_id": student_id,
-        "questions": exam_questions.copy(),
-        "current_question": 0,
-        "answers": [],
-        "score": 0,
-        "start_time": time.time(),
-        "duration": exam_timer,
-        "status": "ACTIVE",
-        "server": "backup"
-    }
+def get_server_buffer(backend):
+    return main_server_buffer if backend == "main" else backup_server_buffer
+
+def no_session_response(backend):
+    if backend == "backup":
+        return {"success": False, "message": "No active backup exam session"}
+    return {"success": False, "message": "No active exam session"}
+
+def open_exam_session(student_id, backend, reject_when_full=False):
+    print(f"[{get_formatted_time()}] [SERVER-{backend.upper()}] Processing exam for student {student_id}")
     
-    backup_exam_sessions[student_id] = exam_session
+    exam_session = ExamSession(student_id, backend)
+    if not exam_sessions.add(exam_session):
+        return {"success": False, "message": "Student already has active exam session"}
     
     try:
-        backup_server_buffer.put(f"exam_{student_id}", block=False)
-        print(f"[{get_formatted_time()}] [SERVER-BACKUP] Added to backup buffer successfully")
+        get_server_buffer(backend).put(f"exam_{student_id}", block=False)
+        print(f"[{get_formatted_time()}] [SERVER-{backend.upper()}] Added to {backend} buffer")
     except queue.Full:
-        print(f"[{get_formatted_time()}] [SERVER-BACKUP] Backup buffer full but continuing")
-    
-    def backup_auto_submit_timer():
-        time.sleep(exam_session["duration"])
-        if student_id in backup_exam_sessions and backup_exam_sessions[student_id]["status"] == "ACTIVE":
-            print(f"[{get_formatted_time()}] [SERVER-BACKUP] Auto-submit for student {student_id}")
-            attempt_backup_auto_submission(student_id)
+        if reject_when_full:
+            exam_sessions.remove(exam_session)
+            return None
+        print(f"[{get_formatted_time()}] [SERVER-{backend.upper()}] {backend.capitalize()} buffer full but continuing")
     
-    threading.Thread(target=backup_auto_submit_timer, daemon=True).start()
+    exam_session.auto_submit_timer = exam_scheduler.schedule(exam_session.duration, attempt_auto_submission, student_id, backend)
     
     return {
         "success": True,
-        "duration": exam_session["duration"],
-        "total_questions": len(exam_questions),
-        "message": "Backup server exam started successfully",
-        "server": "backup"
+        "duration": exam_session.duration,
+        "total_questions": exam_session.total_questions,
+        "message": f"{backend.capitalize()} server exam started successfully",
+        "server": backend
     }
 
+def process_exam_on_backup_direct(student_id):
+    global backup_server_processed
+    
+    result = open_exam_session(student_id, "backup")
+    if result["success"]:
+        with load_balancer_lock:
+            backup_server_processed += 1
+    return result
+
 def process_exam_on_main(student_id):
     global main_server_processed
     
     try:
-        main_server_processed += 1
-        
-        print(f"[{get_formatted_time()}] [SERVER-MAIN] Processing exam for student {student_id}")
-        
-        exam_session = {
-            "student_id": student_id,
-            "questions": exam_questions.copy(),
-            "current_question": 0,
-            "answers": [],
-            "score": 0,
-            "start_time": time.time(),
-            "duration": exam_timer,
-            "status": "ACTIVE",
-            "server": "main"
+        result = open_exam_session(student_id, "main", reject_when_full=True)
+    except Exception as e:
+        print(f"[{get_formatted_time()}] [SERVER-MAIN] Error processing exam: {e}")
+        return process_exam_on_backup_direct(student_id)
+    
+    if result is None:
+        print(f"[{get_formatted_time()}] [SERVER-MAIN] Buffer full, redirecting to backup")
+        return process_exam_on_backup_direct(student_id)
+    
+    if result["success"]:
+        with load_balancer_lock:
+            main_server_processed += 1
+    return result
+
+def backup_start_interactive_exam(student_id):
+    return open_exam_session(student_id, "backup")
+
+def session_get_question(student_id, backend=None):
+    with exam_sessions.lock_for(student_id):
+        session = exam_sessions.get(student_id, backend)
+        if session is None or session.status != "ACTIVE":
+            return no_session_response(backend)
+        
+        remaining_time = session.remaining_time()
+        
+        if remaining_time <= 0:
+            return {"success": False, "time_expired": True, "message": "Time expired"}
+        
+        if session.completed:
+            return {"success": False, "completed": True, "message": "All questions answered"}
+        
+        return {
+            "success": True,
+            "question": session.current(),
+            "question_number": session.current_question + 1,
+            "total_questions": session.total_questions,
+            "remaining_time": remaining_time
         }
+
+def session_submit_answer(student_id, answer, backend=None):
+    with exam_sessions.lock_for(student_id):
+        session = exam_sessions.get(student_id, backend)
+        if session is None or session.status != "ACTIVE":
+            return no_session_response(backend)
         
-        main_exam_sessions[student_id] = exam_session
+        remaining_time = session.remaining_time()
         
-        try:
-            main_server_buffer.put(f"exam_{student_id}", block=False)
-            print(f"[{get_formatted_time()}] [SERVER-MAIN] Added to main buffer")
-        except queue.Full:
-            print(f"[{get_formatted_time()}] [SERVER-MAIN] Buffer full, redirecting to backup")
-            del main_exam_sessions[student_id]
-            main_server_processed -= 1
-            return process_exam_on_backup_direct(student_id)
+        if remaining_time <= 0:
+            return {"success": False, "time_expired": True, "message": "Time expired"}
         
-        def main_auto_submit_timer():
-            time.sleep(exam_session["duration"])
-            if student_id in main_exam_sessions and main_exam_sessions[student_id]["status"] == "ACTIVE":
-                attempt_main_auto_submission(student_id)
+        if session.completed:
+            return {"success": False, "message": "No more questions"}
         
-        threading.Thread(target=main_auto_submit_timer, daemon=True).start()
+        current_q, is_correct = session.record_answer(answer)
         
         return {
             "success": True,
-            "duration": exam_session["duration"],
-            "total_questions": len(exam_questions),
-            "message": "Main server exam started successfully",
-            "server": "main"
+            "is_correct": is_correct,
+            "correct_answer": current_q["correct"],
+            "remaining_time": remaining_time,
+            "all_completed": session.completed
         }
-        
-    except Exception as e:
-        print(f"[{get_formatted_time()}] [SERVER-MAIN] Error processing exam: {e}")
-        main_server_processed -= 1
-        return process_exam_on_backup_direct(student_id)
 
-def backup_start_interactive_exam(student_id):
-    print(f"[{get_formatted_time()}] [BACKUP-SERVER] Processing exam for student {student_id}")
-    
-    if student_id in backup_exam_sessions:
-        return {"success": False, "message": "Exam already in progress on backup"}
-    
-    exam_session = {
-        "student_id": student_id,
-        "questions": exam_questions.copy(),
-        "current_question": 0,
-        "answers": [],
-        "score": 0,
-        "start_time": time.time(),
-        "duration": exam_timer,
-        "status": "ACTIVE",
-        "server": "backup"
-    }
-    
-    backup_exam_sessions[student_id] = exam_session
-    
-    try:
-        backup_server_buffer.put(f"exam_{student_id}")
-        print(f"[{get_formatted_time()}] [BACKUP-SERVER] Added to backup buffer")
-    except queue.Full:
-        print(f"[{get_formatted_time()}] [BACKUP-SERVER] Backup buffer full")
-    
-    def backup_auto_submit_timer():
-        time.sleep(exam_session["duration"])
-        if student_id in backup_exam_sessions and backup_exam_sessions[student_id]["status"] == "ACTIVE":
-            print(f"[{get_formatted_time()}] [BACKUP-SERVER] Auto-submit for student {student_id}")
-            attempt_backup_auto_submission(student_id)
-    
-    threading.Thread(target=backup_auto_submit_timer, daemon=True).start()
-    
-    return {
-        "success": True,
-        "duration": exam_session["duration"],
-        "total_questions": len(exam_questions),
-        "message": "Backup server exam started successfully",
-        "server": "backup"
-    }
-
-def get_question(student_id):
-    if student_id in main_exam_sessions:
-        return get_question_from_main(student_id)
-    elif student_id in backup_exam_sessions:
-        return backup_get_question(student_id)
-    else:
-        return {"success": False, "message": "No active exam session"}
-
-def get_question_from_main(student_id):
-    session = main_exam_sessions[student_id]
-    elapsed_time = time.time() - session["start_time"]
-    remaining_time = max(0, session["duration"] - elapsed_time)
-    
-    if remaining_time <= 0:
-        return {"success": False, "time_expired": True, "message": "Time expired"}
-    
-    if session["current_question"] >= len(session["questions"]):
-        return {"success": False, "completed": True, "message": "All questions answered"}
-    
-    current_q = session["questions"][session["current_question"]]
-    
-    return {
-        "success": True,
-        "question": current_q,
-        "question_number": session["current_question"] + 1,
-        "total_questions": len(session["questions"]),
-        "remaining_time": remaining_time
-    }
-
-def backup_get_question(student_id):
-    if student_id not in backup_exam_sessions:
-        return {"success": False, "message": "No active backup exam session"}
-    
-    session = backup_exam_sessions[student_id]
-    elapsed_time = time.time() - session["start_time"]
-    remaining_time = max(0, session["duration"] - elapsed_time)
-    
-    if remaining_time <= 0:
-        return {"success": False, "time_expired": True, "message": "Time expired"}
-    
-    if session["current_question"] >= len(session["questions"]):
-        return {"success": False, "completed": True, "message": "All questions answered"}
-    
-    current_q = session["questions"][session["current_question"]]
+def session_submit_answer_and_get_next(student_id, answer, backend=None):
+    with exam_sessions.lock_for(student_id):
+        answer_result = session_submit_answer(student_id, answer, backend)
+        
+        if answer_result.get("success") and not answer_result.get("all_completed"):
+            answer_result["next_question"] = session_get_question(student_id, backend)
     
-    return {
-        "success": True,
-        "question": current_q,
-        "question_number": session["current_question"] + 1,
-        "total_questions": len(session["questions"]),
-        "remaining_time": remaining_time
-    }
+    return answer_result
 
-def submit_answer(student_id, answer):
-    if student_id in main_exam_sessions:
-        return submit_answer_to_main(student_id, answer)
-    elif student_id in backup_exam_sessions:
-        return backup_submit_answer(student_id, answer)
-    else:
-        return {"success": False, "message": "No active exam session"}
+peer_notify_executor = ThreadPoolExecutor(max_workers=PEER_NOTIFY_WORKERS, thread_name_prefix="peer-notify")
 
-def submit_answer_to_main(student_id, answer):
-    session = main_exam_sessions[student_id]
-    elapsed_time = time.time() - session["start_time"]
-    remaining_time = max(0, session["duration"] - elapsed_time)
-    
-    if remaining_time <= 0:
-        return {"success": False, "time_expired": True, "message": "Time expired"}
-    
-    if session["current_question"] >= len(session["questions"]):
-        return {"success": False, "message": "No more questions"}
-    
-    current_q = session["questions"][session["current_question"]]
-    is_correct = (answer == current_q["correct"])
-    
-    if is_correct:
-        session["score"] += 1
-    
-    session["answers"].append({
-        "question_id": current_q["id"],
-        "user_answer": answer,
-        "correct_answer": current_q["correct"],
-        "is_correct": is_correct
-    })
-    
-    session["current_question"] += 1
-    
-    all_completed = session["current_question"] >= len(session["questions"])
-    
-    return {
-        "success": True,
-        "is_correct": is_correct,
-        "correct_answer": current_q["correct"],
-        "remaining_time": remaining_time,
-        "all_completed": all_completed
-    }
-
-def backup_submit_answer(student_id, answer):
-    if student_id not in backup_exam_sessions:
-        return {"success": False, "message": "No active backup exam session"}
-    
-    session = backup_exam_sessions[student_id]
-    elapsed_time = time.time() - session["start_time"]
-    remaining_time = max(0, session["duration"] - elapsed_time)
-    
-    if remaining_time <= 0:
-        return {"success": False, "time_expired": True, "message": "Time expired"}
-    
-    if session["current_question"] >= len(session["questions"]):
-        return {"success": False, "message": "No more questions"}
-    
-    current_q = session["questions"][session["current_question"]]
-    is_correct = (answer == current_q["correct"])
-    
-    if is_correct:
-        session["score"] += 1
-    
-    session["answers"].append({
-        "question_id": current_q["id"],
-        "user_answer": answer,
-        "correct_answer": current_q["correct"],
-        "is_correct": is_correct
-    })
-    
-    session["current_question"] += 1
-    
-    all_completed = session["current_question"] >= len(session["questions"])
+def notify_peer(peer, method, *args):
+    def send():
+        try:
+            getattr(clients[peer], method)(*args)
+        except Exception as e:
+            print(f"[{get_formatted_time()}] [SERVER] Failed to notify {peer} ({method}): {e}")
     
-    return {
-        "success": True,
-        "is_correct": is_correct,
-        "correct_answer": current_q["correct"],
-        "remaining_time": remaining_time,
-        "all_completed": all_completed
-    }
+    peer_notify_executor.submit(send)
 
-def submit_exam_final(student_id, submission_source="manual"):
-    if student_id in main_exam_sessions:
-        return submit_exam_final_main(student_id, submission_source)
-    elif student_id in backup_exam_sessions:
-        return backup_submit_exam_final(student_id, submission_source)
-    else:
-        return {"success": False, "message": "No active exam session"}
-
-def submit_exam_final_main(student_id, submission_source="manual"):
-    print(f"[{get_formatted_time()}] [SERVER-TASK6] FINAL SUBMISSION - MAIN SERVER")
-    
-    with deadlock_detection_lock:
-        session = main_exam_sessions[student_id]
-        elapsed_time = time.time() - session["start_time"]
-        remaining_time = max(0, session["duration"] - elapsed_time)
+def session_submit_exam_final(student_id, submission_source="manual", backend=None):
+    with exam_sessions.lock_for(student_id):
+        session = exam_sessions.get(student_id, backend)
+        if session is None or session.status != "ACTIVE":
+            return no_session_response(backend)
+        
+        server_used = session.server
+        print(f"[{get_formatted_time()}] [SERVER-TASK6] FINAL SUBMISSION - {server_used.upper()} SERVER")
+        
+        remaining_time = session.remaining_time()
         
         deadlock_detected = False
         resolution_strategy = "none"
@@ -1425,121 +2320,96 @@ def submit_exam_final_main(student_id, submission_source="manual"):
             resolution_strategy = "manual_priority"
             print(f"[{get_formatted_time()}] [SERVER-TASK6] DEADLOCK DETECTED AND RESOLVED")
         
-        final_score = session["score"]
+        final_score = session.score
         submission_type = "manual" if submission_source == "manual" else "auto"
         
-        update_task6_databases(student_id, final_score, submission_type, deadlock_detected, resolution_strategy, session, "main")
+        session.status = "SUBMITTED"
+        exam_scheduler.cancel(session.auto_submit_timer)
+        
+        update_task6_databases(student_id, final_score, submission_type, deadlock_detected, resolution_strategy, session, server_used)
         
         try:
-            main_server_buffer.get(block=False)
+            get_server_buffer(server_used).get(block=False)
         except queue.Empty:
             pass
         
-        del main_exam_sessions[student_id]
-        
-        try:
-            clients["teacher"].receive_exam_submission(student_id, final_score, submission_type)
-        except Exception as e:
-            print(f"[{get_formatted_time()}] [SERVER] Failed to notify teacher: {e}")
-        
-        return {
-            "success": True,
-            "score": final_score,
-            "type": submission_type,
-            "deadlock_resolved": deadlock_detected,
-            "resolution_strategy": resolution_strategy,
-            "server_used": "main",
-            "message": f"Main server submission - {submission_type}"
-        }
-
-def backup_submit_exam_final(student_id, submission_source="manual"):
-    print(f"[{get_formatted_time()}] [BACKUP-SERVER] FINAL SUBMISSION")
-    
-    session = backup_exam_sessions[student_id]
-    final_score = session["score"]
-    submission_type = "manual" if submission_source == "manual" else "auto"
+        exam_sessions.remove(session)
     
-    update_task6_databases(student_id, final_score, submission_type, False, "none", session, "backup")
-    
-    try:
-        backup_server_buffer.get(block=False)
-    except queue.Empty:
-        pass
-    
-    del backup_exam_sessions[student_id]
-    
-    try:
-        clients["teacher"].receive_exam_submission(student_id, final_score, submission_type)
-    except Exception as e:
-        print(f"[{get_formatted_time()}] [BACKUP] Failed to notify teacher: {e}")
+    notify_peer("teacher", "receive_exam_submission", student_id, final_score, submission_type)
     
     return {
         "success": True,
         "score": final_score,
         "type": submission_type,
-        "server_used": "backup",
-        "message": f"Backup server submission - {submission_type}"
+        "deadlock_resolved": deadlock_detected,
+        "resolution_strategy": resolution_strategy,
+        "server_used": server_used,
+        "message": f"{server_used.capitalize()} server submission - {submission_type}"
     }
 
-def attempt_main_auto_submission(student_id):
-    if student_id not in main_exam_sessions:
+def attempt_auto_submission(student_id, backend):
+    session = exam_sessions.get(student_id, backend)
+    if session is None or session.status != "ACTIVE" or session.manual_submission_attempted:
         return
     
-    session = main_exam_sessions[student_id]
-    if session.get("manual_submission_attempted", False):
-        return
+    print(f"[{get_formatted_time()}] [SERVER-{backend.upper()}] Auto-submit for student {student_id}")
     
-    try:
-        clients["client"].handle_exam_timeout(student_id)
-    except Exception as e:
-        pass
-    
-    return submit_exam_final_main(student_id, "auto")
+    result = session_submit_exam_final(student_id, "auto", backend)
+    if result.get("success"):
+        notify_peer("client", "handle_exam_timeout", student_id)
+    return result
 
-def attempt_backup_auto_submission(student_id):
-    if student_id not in backup_exam_sessions:
-        return
-    
-    session = backup_exam_sessions[student_id]
-    if session.get("manual_submission_attempted", False):
-        return
-    
-    try:
-        clients["client"].handle_exam_timeout(student_id)
-    except Exception as e:
-        pass
-    
-    return backup_submit_exam_final(student_id, "auto")
+def get_question(student_id):
+    return session_get_question(student_id)
+
+def submit_answer(student_id, answer):
+    return session_submit_answer(student_id, answer)
+
+def submit_answer_and_get_next(student_id, answer):
+    return session_submit_answer_and_get_next(student_id, answer)
+
+def submit_exam_final(student_id, submission_source="manual"):
+    return session_submit_exam_final(student_id, submission_source)
+
+def backup_get_question(student_id):
+    return session_get_question(student_id, "backup")
+
+def backup_submit_answer(student_id, answer):
+    return session_submit_answer(student_id, answer, "backup")
+
+def backup_submit_answer_and_get_next(student_id, answer):
+    return session_submit_answer_and_get_next(student_id, answer, "backup")
+
+def backup_submit_exam_final(student_id, submission_source="manual"):
+    return session_submit_exam_final(student_id, submission_source, "backup")
 
 def update_task6_databases(student_id, score, submission_type, deadlock_detected, resolution_strategy, session, server_used="main"):
-    with db_lock:
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO status_db (student_id, status, exam_type) 
-                VALUES (?, ?, ?)
-            ''', (student_id, "exam_submitted", "Interactive"))
-            
-            final_marks = score * 10
-            result = "PASS" if final_marks >= 50 else "FAIL"
-            
-            answers_json = json.dumps(session.get("answers", []))
-            cursor.execute('''
-                INSERT INTO submission_db 
-                (student_id, score, submission_type, deadlock_detected, resolution_strategy, answers, exam_duration, server_used, final_marks, result)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (student_id, score, submission_type, deadlock_detected, 
-                  resolution_strategy, answers_json, session.get("duration", exam_timer), server_used, final_marks, result))
-            
-            conn.commit()
-            conn.close()
-            
+    final_marks = score * 10
+    result = "PASS" if final_marks >= 50 else "FAIL"
+    answers_json = json.dumps(session.answer_records())
+    
+    future = submission_writer.write(DB_PATH, [
+        ('''
+            INSERT INTO status_db (student_id, status, exam_type) 
+            VALUES (?, ?, ?)
+        ''', (student_id, "exam_submitted", "Interactive")),
+        ('''
+            INSERT INTO submission_db 
+            (student_id, score, submission_type, deadlock_detected, resolution_strategy, answers, exam_duration, server_used, final_marks, result)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (student_id, score, submission_type, deadlock_detected, 
+              resolution_strategy, answers_json, session.duration, server_used, final_marks, result))
+    ])
+    
+    def report_write(completed):
+        error = completed.exception()
+        if error is None:
             print(f"[{get_formatted_time()}] [SERVER] Databases updated - server: {server_used}, result: {result}")
-            
-        except Exception as e:
-            print(f"[{get_formatted_time()}] [SERVER-DB] Failed to update databases: {e}")
+        else:
+            print(f"[{get_formatted_time()}] [SERVER-DB] Failed to update databases: {error}")
+    
+    future.add_done_callback(report_write)
+    return future
 
 def get_load_balancer_stats():
     return {
@@ -1550,17 +2420,32 @@ def get_load_balancer_stats():
         "buffer_size": main_server_buffer.maxsize,
         "current_main_load": main_server_buffer.qsize(),
         "current_backup_load": backup_server_buffer.qsize(),
+        "active_main_sessions": exam_sessions.count("main"),
+        "active_backup_sessions": exam_sessions.count("backup"),
+        "db_pool": db_pool.get_stats(),
+        "submission_writer": submission_writer.get_stats(),
+        "job_writer": job_writer.get_stats(),
+        "chunk_locks": chunk_locks.get_stats(),
         "load_threshold": load_threshold,
         "success_rate": ((main_server_processed + backup_server_processed) / total_requests * 100) if total_requests > 0 else 0,
-        "backup_running": backup_running
+        "backup_running": backup_running,
+        "rpc_queue": get_rpc_server_stats(),
+        "proxy_pool": rpc_pool.get_stats(),
+        "exam_timers": exam_scheduler.get_stats(),
+        "job_dispatch": job_dispatcher.get_stats()
     }
 
+def get_rpc_server_stats():
+    stats = {}
+    if main_rpc_server:
+        stats["main"] = main_rpc_server.get_queue_stats()
+    if backup_server_instance:
+        stats["backup"] = backup_server_instance.get_queue_stats()
+    return stats
+
 def send_request_with_timeout(url, method, *args, timeout=5):
     try:
-        proxy = xmlrpc.client.ServerProxy(url + "/RPC2", allow_none=True)
-        proxy._ServerProxy__transport.timeout = timeout
-        result = getattr(proxy, method)(*args)
-        return result
+        return rpc_pool.call(url, method, *args, timeout=timeout)
     except Exception as e:
         print(f"[{get_formatted_time()}] [SERVER-RA] Timeout/Error calling {method}: {e}")
         return False
@@ -1603,10 +2488,12 @@ def receive_reply(sender_id, timestamp):
     return True
 
 def run_server():
-    global time_now
+    global time_now, main_rpc_server
     time_now = input_time()
     
     init_database()
+    load_partition_map()
+    recover_processing_jobs()
     
     hostname = socket.gethostname()
     local_ip = socket.gethostbyname(hostname)
@@ -1620,8 +2507,10 @@ def run_server():
     print(f"[{get_formatted_time()}] [SERVER] TASK 9: Hadoop-style Resource Manager + Distributed Processing")
     print(f"[{get_formatted_time()}] [SERVER] Reduced exam timer: {exam_timer} seconds")
     print(f"[{get_formatted_time()}] [SERVER] Buffer: {main_server_buffer.maxsize} slots, Threshold: {load_threshold}")
+    print(f"[{get_formatted_time()}] [SERVER] RPC worker pool: {RPC_WORKER_THREADS} workers, queue depth {RPC_QUEUE_DEPTH}")
     
-    server = SimpleXMLRPCServer(("0.0.0.0", 8000), allow_none=True)
+    server = PooledXMLRPCServer(("0.0.0.0", 8000), name="main", allow_none=True)
+    main_rpc_server = server
     
     server.register_function(register, "register")
     server.register_function(get_time, "get_time")
@@ -1634,14 +2523,17 @@ def run_server():
     server.register_function(start_interactive_exam, "start_interactive_exam")
     server.register_function(get_question, "get_question")
     server.register_function(submit_answer, "submit_answer")
+    server.register_function(submit_answer_and_get_next, "submit_answer_and_get_next")
     server.register_function(submit_exam_final, "submit_exam_final")
     
     server.register_function(get_load_balancer_stats, "get_load_balancer_stats")
+    server.register_function(get_rpc_server_stats, "get_rpc_server_stats")
     
     server.register_function(initialize_replication_system, "initialize_replication_system")
     server.register_function(show_replication_status, "show_replication_status")
     server.register_function(read_from_replicas, "read_from_replicas")
     server.register_function(write_to_replicas, "write_to_replicas")
+    server.register_function(write_batch_to_replicas, "write_batch_to_replicas")
     
     server.register_function(initialize_resource_manager, "initialize_resource_manager")
     server.register_function(report_node_metrics, "report_node_metrics")
@@ -1650,6 +2542,8 @@ def run_server():
     server.register_function(get_job_status, "get_job_status")
     server.register_function(get_job_queue_status, "get_job_queue_status")
     
+    server.register_multicall_functions()
+    
     print(f"[{get_formatted_time()}] [SERVER] Ready to handle requests with replication, load balancing, and distributed processing...")
     
     try:
@@ -1,4 +1,4 @@
-from xmlrpc.server import SimpleXMLRPCServer, SimpleXMLRPCRequestHandler
+from xmlrpc.server import SimpleXMLRPCRequestHandler
 from xmlrpc.client import ServerProxy
 import threading
 import time
@@ -6,11 +6,11 @@ from datetime import datetime, timedelta, timezone
 import queue
 import socket
 import random
-import xmlrpc.client
 import sqlite3
 import json
 import psutil
 import subprocess
+from common import RPC_WORKER_THREADS, RPC_QUEUE_DEPTH, PooledXMLRPCServer, PooledServerProxy, rpc_pool, SQLiteConnectionPool, ChunkLockManager, ChunkPartitioner, ensure_columns, ReplicaSet, format_replica_latencies, MerkleTree, plan_anti_entropy_repairs, JobResultCache
 
 students = {
     29: {"name": "Mayuresh", "marks": 100, "reason": "", "status": "ACTIVE"},
@@ -36,6 +36,13 @@ replies_received = 0
 cs_lock = threading.Lock()
 my_process_id = "teacher"
 
+WRITE_CONSISTENCY = "QUORUM"
+ANTI_ENTROPY_INTERVAL = 20
+TEACHER_REPLICATION_MODE = "async"
+LOG_SHIP_INTERVAL = 0.5
+LOG_SHIP_BATCH = 256
+rpc_server = None
+
 exam_results = {}
 interactive_exam_active = False
 DB_PATH = "exam_system.db"
@@ -52,6 +59,9 @@ teacher_replication_initialized = False
 node_manager_active = False
 resource_monitor_active = False
 processing_jobs_completed = 0
+processing_jobs_lock = threading.Lock()
+teacher_data_version = 0
+teacher_data_version_lock = threading.Lock()
 system_resources = {
     "cpu_percent": 0,
     "memory_percent": 0,
@@ -81,12 +91,16 @@ def get_formatted_time():
 
 def increment_clock():
     global logical_clock
-    logical_clock += 1
-    return logical_clock
+    with cs_lock:
+        logical_clock += 1
+        return logical_clock
 
 def update_clock(received_timestamp):
     global logical_clock
-    logical_clock = max(logical_clock, received_timestamp) + 1
+    with cs_lock:
+        logical_clock = max(logical_clock, received_timestamp) + 1
+
+db_pool = SQLiteConnectionPool()
 
 def get_time():
     global clock_offset
@@ -130,8 +144,10 @@ def get_system_resources():
         global system_resources
         system_resources = {
             "cpu_percent": cpu_percent,
+            "cpu_count": psutil.cpu_count() or 1,
             "memory_percent": memory.percent,
             "memory_available": memory.available // (1024*1024),
+            "memory_total": memory.total // (1024*1024),
             "disk_percent": disk.percent,
             "disk_free": disk.free // (1024*1024*1024),
             "network_bytes_sent": net_io.bytes_sent,
@@ -144,8 +160,10 @@ def get_system_resources():
         print(f"[{get_formatted_time()}] [TEACHER-TASK9] Error getting system resources: {e}")
         return {
             "cpu_percent": 0,
+            "cpu_count": 1,
             "memory_percent": 0,
             "memory_available": 1000,
+            "memory_total": 1000,
             "disk_percent": 50,
             "disk_free": 10,
             "network_bytes_sent": 0,
@@ -205,11 +223,15 @@ def initialize_node_manager():
                     "status": "active",
                     "heartbeat": time.time(),
                     "jobs_completed": processing_jobs_completed,
-                    "node_type": "teacher_node"
+                    "node_type": "teacher_node",
+                    "rpc_url": self_url,
+                    "capabilities": sorted(TEACHER_JOB_HANDLERS),
+                    "rpc_queue": rpc_server.get_queue_stats() if rpc_server else {},
+                    "rpc_pool": rpc_pool.get_stats()
                 }
                 
                 try:
-                    server_proxy = xmlrpc.client.ServerProxy(server_url + "/RPC2", allow_none=True)
+                    server_proxy = PooledServerProxy(server_url, timeout=10)
                     server_proxy.report_node_metrics(node_metrics)
                 except Exception as e:
                     print(f"[{get_formatted_time()}] [TEACHER-TASK9] Failed to report metrics to Resource Manager: {e}")
@@ -226,24 +248,41 @@ def initialize_node_manager():
     print(f"[{get_formatted_time()}] [TEACHER-TASK9] Node Manager initialized successfully")
     return True
 
-def process_teacher_job(job_type, parameters=None):
+job_result_cache = JobResultCache()
+
+def bump_teacher_data_version():
+    global teacher_data_version
+    with teacher_data_version_lock:
+        teacher_data_version += 1
+
+def run_teacher_job(job_type, parameters=None):
     global processing_jobs_completed
     
-    try:
-        print(f"[{get_formatted_time()}] [TEACHER-TASK9] Processing job: {job_type}")
-        
+    print(f"[{get_formatted_time()}] [TEACHER-TASK9] Processing job: {job_type}")
+    
+    with processing_jobs_lock:
         processing_jobs_completed += 1
-        
-        if job_type == "ANALYZE_MARKSHEET":
-            return analyze_marksheet_data()
-        elif job_type == "CALCULATE_GRADES":
-            return calculate_distributed_grades()
-        elif job_type == "VALIDATE_SUBMISSIONS":
-            return validate_exam_submissions()
-        elif job_type == "PROCESS_REPLICATION":
-            return process_replication_status()
-        else:
-            return {"error": f"Unknown teacher job type: {job_type}"}
+    
+    handler = TEACHER_JOB_HANDLERS.get(job_type)
+    if handler is None:
+        return {"error": f"Unknown teacher job type: {job_type}"}, False
+    
+    cache_key = None
+    if job_type in TEACHER_CACHEABLE_JOBS:
+        cache_key = job_result_cache.key(job_type, parameters, teacher_data_version)
+        cached = job_result_cache.get(cache_key)
+        if cached is not None:
+            print(f"[{get_formatted_time()}] [TEACHER-TASK9] {job_type} served from result cache")
+            return cached, True
+    
+    result = handler()
+    if cache_key is not None and "error" not in result:
+        job_result_cache.put(cache_key, result)
+    return result, False
+
+def process_teacher_job(job_type, parameters=None):
+    try:
+        return run_teacher_job(job_type, parameters)[0]
             
     except Exception as e:
         print(f"[{get_formatted_time()}] [TEACHER-TASK9] Job processing error: {e}")
@@ -314,14 +353,14 @@ def calculate_distributed_grades():
         for student_id, info in students.items():
             marks = info["marks"]
             grade = "A" if marks >= 90 else "B" if marks >= 70 else "C" if marks >= 50 else "F"
-            all_students[student_id] = {"name": info["name"], "marks": marks, "grade": grade, "type": "traditional"}
+            all_students[str(student_id)] = {"name": info["name"], "marks": marks, "grade": grade, "type": "traditional"}
             grade_distribution["grade_counts"][grade] += 1
         
         for student_id, exam_data in exam_results.items():
             final_marks = exam_data.get("score", 0) * 10
             grade = "A" if final_marks >= 90 else "B" if final_marks >= 70 else "C" if final_marks >= 50 else "F"
             student_name = students.get(student_id, {}).get("name", f"Student_{student_id}")
-            all_students[student_id] = {"name": student_name, "marks": final_marks, "grade": grade, "type": "interactive"}
+            all_students[str(student_id)] = {"name": student_name, "marks": final_marks, "grade": grade, "type": "interactive"}
             grade_distribution["grade_counts"][grade] += 1
         
         grade_distribution["detailed_grades"] = all_students
@@ -412,8 +451,8 @@ def process_replication_status():
                         
                         for replica_id in range(1, replica_count + 1):
                             table_name = f"marksheet_chunk_{chunk_id}_replica_{replica_id}"
-                            cursor.execute(f"SELECT COUNT(*), AVG(marks) FROM {table_name}")
-                            stats = cursor.fetchone()
+                            with replica_set.connection(replica_id) as replica_conn:
+                                stats = replica_conn.execute(f"SELECT COUNT(*), AVG(marks) FROM {table_name}").fetchone()
                             
                             replica_health[f"replica_{replica_id}"] = {
                                 "record_count": stats[0] if stats[0] else 0,
@@ -453,6 +492,132 @@ def process_replication_status():
     except Exception as e:
         return {"error": str(e)}
 
+TEACHER_JOB_HANDLERS = {
+    "ANALYZE_MARKSHEET": analyze_marksheet_data,
+    "CALCULATE_GRADES": calculate_distributed_grades,
+    "VALIDATE_SUBMISSIONS": validate_exam_submissions,
+    "PROCESS_REPLICATION": process_replication_status
+}
+TEACHER_CACHEABLE_JOBS = ("ANALYZE_MARKSHEET", "CALCULATE_GRADES")
+
+def execute_job(job):
+    job_type = job.get("job_type")
+    if job_type not in TEACHER_JOB_HANDLERS:
+        return {"success": False, "node_id": "teacher", "message": f"Teacher node cannot run {job_type} jobs"}
+    
+    print(f"[{get_formatted_time()}] [TEACHER-TASK9] Executing job {job.get('job_id')} ({job_type}) for Resource Manager")
+    start = time.time()
+    try:
+        result, cache_hit = run_teacher_job(job_type, json.loads(job.get("parameters") or "{}"))
+    except Exception as e:
+        result, cache_hit = {"error": str(e)}, False
+    
+    return {
+        "success": "error" not in result,
+        "node_id": "teacher",
+        "result": result,
+        "cache_hit": cache_hit,
+        "message": result.get("error", ""),
+        "elapsed_ms": round((time.time() - start) * 1000, 3),
+        "result_cache": job_result_cache.get_stats()
+    }
+
+class LogShipper:
+    def __init__(self, replicas, interval=LOG_SHIP_INTERVAL, batch_size=LOG_SHIP_BATCH):
+        self.replicas = replicas
+        self.interval = interval
+        self.batch_size = batch_size
+        self.wakeup = threading.Condition()
+        self.pending = False
+        self.thread = None
+        self.stats_lock = threading.Lock()
+        self.stats = {"shipped": 0, "batches": 0, "errors": 0}
+    
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="log-shipper", daemon=True)
+            self.thread.start()
+    
+    def notify(self):
+        with self.wakeup:
+            self.pending = True
+            self.wakeup.notify()
+    
+    def followers(self):
+        return [replica_id for replica_id in self.replicas.replica_ids() if replica_id != 1]
+    
+    def log_head(self):
+        with self.replicas.connection(1) as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM replication_log").fetchone()[0]
+    
+    def applied_offset(self, replica_id):
+        with self.replicas.connection(replica_id) as conn:
+            row = conn.execute("SELECT last_applied_id FROM log_apply_state WHERE replica_id = ?", (replica_id,)).fetchone()
+        return row[0] if row else 0
+    
+    def ship(self, replica_id):
+        offset = self.applied_offset(replica_id)
+        with self.replicas.connection(1) as conn:
+            entries = conn.execute(
+                "SELECT id, chunk_id, payload FROM replication_log WHERE id > ? ORDER BY id LIMIT ?",
+                (offset, self.batch_size)
+            ).fetchall()
+        if not entries:
+            return 0
+        
+        with self.replicas.connection(replica_id) as conn:
+            cursor = conn.cursor()
+            for _, chunk_id, payload in entries:
+                if payload:
+                    upsert_marksheet_row(cursor, f"marksheet_chunk_{chunk_id}_replica_{replica_id}", tuple(json.loads(payload)))
+            cursor.execute('''
+                INSERT OR REPLACE INTO log_apply_state (replica_id, last_applied_id, last_applied_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            ''', (replica_id, entries[-1][0]))
+            conn.commit()
+        
+        with self.stats_lock:
+            self.stats["shipped"] += len(entries)
+            self.stats["batches"] += 1
+        return len(entries)
+    
+    def run(self):
+        while True:
+            with self.wakeup:
+                self.wakeup.wait_for(lambda: self.pending, timeout=self.interval)
+                self.pending = False
+            
+            for replica_id in self.followers():
+                try:
+                    while self.ship(replica_id) == self.batch_size:
+                        pass
+                except Exception as e:
+                    with self.stats_lock:
+                        self.stats["errors"] += 1
+                    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Log shipping to replica {replica_id} failed: {e}")
+    
+    def get_lag(self):
+        head = self.log_head()
+        lag = {}
+        for replica_id in self.followers():
+            offset = self.applied_offset(replica_id)
+            with self.replicas.connection(1) as conn:
+                oldest = conn.execute(
+                    "SELECT MIN(logged_at) FROM replication_log WHERE id > ?", (offset,)
+                ).fetchone()[0]
+            lag[f"replica_{replica_id}"] = {
+                "applied_offset": offset,
+                "lag_records": head - offset,
+                "lag_ms": round((time.time() - oldest) * 1000, 1) if oldest else 0
+            }
+        with self.stats_lock:
+            stats = dict(self.stats)
+        return {"mode": TEACHER_REPLICATION_MODE, "log_head": head, "replicas": lag, "stats": stats}
+
+partitioner = ChunkPartitioner()
+replica_set = ReplicaSet(db_pool, TEACHER_REPLICATION_DB)
+log_shipper = LogShipper(replica_set)
+
 def initialize_replication_system():
     global teacher_replication_initialized
     
@@ -481,12 +646,12 @@ def setup_teacher_replication_database():
             conn = sqlite3.connect(TEACHER_REPLICATION_DB)
             cursor = conn.cursor()
             
-            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Setting up teacher marksheet replica tables...")
+            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Setting up teacher marksheet replica tables ({replica_set.layout} layout)...")
             
-            for chunk_id in range(3):
-                for replica_id in range(1, 4):
+            def create_replica_tables(replica_cursor, replica_id):
+                for chunk_id in partitioner.chunk_ids():
                     table_name = f"marksheet_chunk_{chunk_id}_replica_{replica_id}"
-                    cursor.execute(f'''
+                    replica_cursor.execute(f'''
                         CREATE TABLE IF NOT EXISTS {table_name} (
                             roll_number INTEGER PRIMARY KEY,
                             name TEXT NOT NULL,
@@ -501,7 +666,19 @@ def setup_teacher_replication_database():
                             version INTEGER DEFAULT 1
                         )
                     ''')
-                    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Created marksheet table: {table_name}")
+                    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Created marksheet table: {table_name} in {replica_set.path(replica_id)}")
+                
+                replica_cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS log_apply_state (
+                        replica_id INTEGER PRIMARY KEY,
+                        last_applied_id INTEGER DEFAULT 0,
+                        last_applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+            
+            for replica_id, result in replica_set.write(create_replica_tables, record=False).items():
+                if isinstance(result, Exception):
+                    raise result
             
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS teacher_chunk_metadata (
@@ -514,6 +691,12 @@ def setup_teacher_replication_database():
                 )
             ''')
             
+            ensure_columns(cursor, "teacher_chunk_metadata", {
+                "range_start": "INTEGER",
+                "range_end": "INTEGER",
+                "partition_mode": "TEXT DEFAULT 'range'"
+            })
+            
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS teacher_replica_status (
                     chunk_id INTEGER,
@@ -537,12 +720,33 @@ def setup_teacher_replication_database():
                 )
             ''')
             
+            ensure_columns(cursor, "replication_log", {
+                "version": "INTEGER",
+                "payload": "TEXT",
+                "logged_at": "REAL"
+            })
+            
             conn.commit()
             conn.close()
             
         except Exception as e:
             print(f"[{get_formatted_time()}] [TEACHER-TASK8] Teacher replication database setup failed: {e}")
 
+def load_partition_map():
+    with replication_lock:
+        try:
+            conn = sqlite3.connect(TEACHER_REPLICATION_DB)
+            try:
+                rows = conn.execute("SELECT chunk_id, range_start FROM teacher_chunk_metadata WHERE status = 'active'").fetchall()
+            finally:
+                conn.close()
+        except sqlite3.OperationalError:
+            return 0
+        
+        partitioner.load(rows)
+        print(f"[{get_formatted_time()}] [TEACHER-TASK8] Loaded marksheet partition map for {len(rows)} chunks")
+        return len(rows)
+
 def create_marksheet_replicas():
     students_data = [
         {"roll": 29, "name": "Mayuresh", "marks": 100, "ISA": 95, "MSE": 87, "ESE": 92},
@@ -552,53 +756,77 @@ def create_marksheet_replicas():
         {"roll": 52, "name": "Rushikesh", "marks": 100, "ISA": 90, "MSE": 88, "ESE": 95}
     ]
     
-    chunks = [
-        {"chunk_id": 0, "students": students_data[0:2], "range": "29-40"},
-        {"chunk_id": 1, "students": students_data[2:4], "range": "42-50"},
-        {"chunk_id": 2, "students": students_data[4:5], "range": "52"}
-    ]
+    students_by_roll = {student["roll"]: student for student in students_data}
+    chunks = []
+    for chunk_id, rolls in partitioner.plan(students_by_roll):
+        chunks.append({
+            "chunk_id": chunk_id,
+            "students": [students_by_roll[roll] for roll in rolls],
+            "range": partitioner.describe(rolls),
+            "range_start": rolls[0] if rolls and partitioner.mode == "range" else None,
+            "range_end": rolls[-1] if rolls and partitioner.mode == "range" else None
+        })
     
     with replication_lock:
         try:
-            conn = sqlite3.connect(TEACHER_REPLICATION_DB)
-            cursor = conn.cursor()
+            log_head = log_shipper.log_head()
             
-            for chunk in chunks:
-                chunk_id = chunk["chunk_id"]
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO teacher_chunk_metadata (chunk_id, student_range, replica_count, status)
-                    VALUES (?, ?, 3, 'active')
-                ''', (chunk_id, chunk["range"]))
+            def populate_replica(replica_cursor, replica_id):
+                replica_cursor.execute('''
+                    INSERT OR REPLACE INTO log_apply_state (replica_id, last_applied_id, last_applied_at)
+                    VALUES (?, ?, CURRENT_TIMESTAMP)
+                ''', (replica_id, log_head))
                 
-                print(f"[{get_formatted_time()}] [TEACHER-TASK8] Creating Marksheet Chunk {chunk_id} with students {chunk['range']}")
-                
-                for replica_id in range(1, 4):
-                    table_name = f"marksheet_chunk_{chunk_id}_replica_{replica_id}"
+                for chunk in chunks:
+                    table_name = f"marksheet_chunk_{chunk['chunk_id']}_replica_{replica_id}"
                     
-                    cursor.execute(f"DELETE FROM {table_name}")
+                    replica_cursor.execute(f"DELETE FROM {table_name}")
                     
                     for student in chunk["students"]:
                         total = student["ISA"] + student["MSE"] + student["ESE"]
-                        cursor.execute(f'''
+                        replica_cursor.execute(f'''
                             INSERT INTO {table_name} 
                             (roll_number, name, marks, reason, status, ISA, MSE, ESE, total, last_updated, version)
                             VALUES (?, ?, ?, '', 'ACTIVE', ?, ?, ?, ?, CURRENT_TIMESTAMP, 1)
                         ''', (student["roll"], student["name"], student["marks"], 
                               student["ISA"], student["MSE"], student["ESE"], total))
-                    
+            
+            for replica_id, result in replica_set.write(populate_replica, record=False).items():
+                if isinstance(result, Exception):
+                    raise result
+            
+            conn = sqlite3.connect(TEACHER_REPLICATION_DB)
+            cursor = conn.cursor()
+            
+            cursor.execute("DELETE FROM teacher_chunk_metadata WHERE chunk_id >= ?", (partitioner.num_chunks,))
+            
+            for chunk in chunks:
+                chunk_id = chunk["chunk_id"]
+                
+                cursor.execute('''
+                    INSERT OR REPLACE INTO teacher_chunk_metadata 
+                    (chunk_id, student_range, replica_count, status, range_start, range_end, partition_mode)
+                    VALUES (?, ?, 3, 'active', ?, ?, ?)
+                ''', (chunk_id, chunk["range"], chunk["range_start"], chunk["range_end"], partitioner.mode))
+                
+                print(f"[{get_formatted_time()}] [TEACHER-TASK8] Creating Marksheet Chunk {chunk_id} with students {chunk['range']}")
+                
+                for replica_id in replica_set.replica_ids():
                     cursor.execute('''
                         INSERT OR REPLACE INTO teacher_replica_status 
                         (chunk_id, replica_id, node_location, status, last_sync)
                         VALUES (?, ?, ?, 'online', CURRENT_TIMESTAMP)
                     ''', (chunk_id, replica_id, f"teacher_node_{replica_id}"))
                     
-                    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Replicated Marksheet Chunk {chunk_id} to Teacher Node {replica_id}")
+                    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Replicated Marksheet Chunk {chunk_id} to Teacher Node {replica_id} ({replica_set.path(replica_id)})")
             
             conn.commit()
+            
+            cursor.execute("SELECT chunk_id, range_start FROM teacher_chunk_metadata WHERE status = 'active'")
+            partitioner.load(cursor.fetchall())
             conn.close()
             
-            print(f"[{get_formatted_time()}] [TEACHER-TASK8] All marksheet chunks replicated successfully with RF=3")
+            print(f"[{get_formatted_time()}] [TEACHER-TASK8] All marksheet chunks replicated successfully with RF=3 ({partitioner.num_chunks} chunks, {partitioner.mode} partitioning)")
             
         except Exception as e:
             print(f"[{get_formatted_time()}] [TEACHER-TASK8] Marksheet chunk creation failed: {e}")
@@ -606,112 +834,190 @@ def create_marksheet_replicas():
 def start_teacher_replication_sync():
     def sync_teacher_replicas():
         while True:
-            time.sleep(20)
+            chunk_ids = list(partitioner.chunk_ids())
+            pause = ANTI_ENTROPY_INTERVAL / max(len(chunk_ids), 1)
             
-            try:
-                with replication_lock:
-                    conn = sqlite3.connect(TEACHER_REPLICATION_DB)
-                    cursor = conn.cursor()
-                    
-                    cursor.execute("SELECT chunk_id, student_range FROM teacher_chunk_metadata WHERE status='active'")
-                    chunks = cursor.fetchall()
-                    
-                    for chunk_id, student_range in chunks:
-                        primary_table = f"marksheet_chunk_{chunk_id}_replica_1"
-                        cursor.execute(f"SELECT COUNT(*) FROM {primary_table}")
-                        record_count = cursor.fetchone()[0]
-                        
-                        if record_count > 0:
-                            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Sync check: Marksheet Chunk {chunk_id} ({student_range}) - {record_count} records consistent across 3 replicas")
-                    
-                    conn.close()
-                    
-            except Exception as e:
-                print(f"[{get_formatted_time()}] [TEACHER-TASK8] Teacher sync process error: {e}")
+            for chunk_id in chunk_ids:
+                time.sleep(pause)
+                try:
+                    anti_entropy_chunk(chunk_id)
+                except Exception as e:
+                    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Teacher sync process error: {e}")
+            
+            with anti_entropy_lock:
+                anti_entropy_stats["passes"] += 1
+                anti_entropy_stats["last_pass"] = get_formatted_time()
     
     sync_thread = threading.Thread(target=sync_teacher_replicas, daemon=True)
     sync_thread.start()
+    
+    if TEACHER_REPLICATION_MODE == "async":
+        log_shipper.start()
+        print(f"[{get_formatted_time()}] [TEACHER-TASK8] Asynchronous log shipping started for replicas {log_shipper.followers()}")
+
+chunk_locks = ChunkLockManager()
 
 def acquire_teacher_write_lock(chunk_id):
-    with replication_lock:
-        try:
-            conn = sqlite3.connect(TEACHER_REPLICATION_DB)
-            cursor = conn.cursor()
-            
-            while True:
-                cursor.execute("SELECT write_locked, read_count FROM teacher_chunk_metadata WHERE chunk_id = ?", (chunk_id,))
-                result = cursor.fetchone()
-                
-                if result and not result[0] and result[1] == 0:
-                    cursor.execute("UPDATE teacher_chunk_metadata SET write_locked = TRUE WHERE chunk_id = ?", (chunk_id,))
-                    conn.commit()
-                    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Write lock acquired for Marksheet Chunk {chunk_id}")
-                    conn.close()
-                    return True
-                
-                time.sleep(0.1)
-                
-        except Exception as e:
-            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Error acquiring write lock: {e}")
-            return False
+    if not chunk_locks.acquire_write(chunk_id):
+        print(f"[{get_formatted_time()}] [TEACHER-TASK8] Write lock timed out for Marksheet Chunk {chunk_id}")
+        return False
+    
+    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Write lock acquired for Marksheet Chunk {chunk_id}")
+    return True
 
 def release_teacher_write_lock(chunk_id):
-    with replication_lock:
-        try:
-            conn = sqlite3.connect(TEACHER_REPLICATION_DB)
+    chunk_locks.release_write(chunk_id)
+    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Write lock released for Marksheet Chunk {chunk_id}")
+    return True
+
+MARKSHEET_ROW_COLUMNS = "roll_number, name, marks, reason, status, ISA, MSE, ESE, total, version"
+
+def fetch_marksheet_row(chunk_id, student_id):
+    def fetch(cursor, replica_id):
+        cursor.execute(f"SELECT {MARKSHEET_ROW_COLUMNS} FROM marksheet_chunk_{chunk_id}_replica_{replica_id} WHERE roll_number = ?", (student_id,))
+        return cursor.fetchone()
+    return fetch
+
+def marksheet_upsert_sql(table_name, allow_equal=False):
+    return f'''
+        INSERT INTO {table_name} ({MARKSHEET_ROW_COLUMNS}, last_updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(roll_number) DO UPDATE SET
+            name = excluded.name, marks = excluded.marks, reason = excluded.reason, status = excluded.status,
+            ISA = excluded.ISA, MSE = excluded.MSE, ESE = excluded.ESE, total = excluded.total,
+            version = excluded.version, last_updated = CURRENT_TIMESTAMP
+        WHERE excluded.version {'>=' if allow_equal else '>'} {table_name}.version
+    '''
+
+def upsert_marksheet_row(cursor, table_name, row, allow_equal=False):
+    cursor.execute(marksheet_upsert_sql(table_name, allow_equal), row)
+    return cursor.rowcount > 0
+
+def marks_status(marks):
+    return "CAUGHT" if marks == 0 else "WARNED" if marks == 50 else "ACTIVE"
+
+def repair_marksheet_row(chunk_id):
+    def repair(cursor, replica_id, row):
+        upsert_marksheet_row(cursor, f"marksheet_chunk_{chunk_id}_replica_{replica_id}", row)
+    return repair
+
+anti_entropy_stats = {"passes": 0, "chunks_checked": 0, "divergent_rows": 0, "repaired_rows": 0, "last_pass": None}
+anti_entropy_lock = threading.Lock()
+
+def anti_entropy_chunk(chunk_id):
+    if not chunk_locks.acquire_read(chunk_id):
+        return None
+    try:
+        trees = {}
+        for replica_id in replica_set.replica_ids():
+            with replica_set.connection(replica_id) as conn:
+                trees[replica_id] = MerkleTree(conn.execute(f"SELECT {MARKSHEET_ROW_COLUMNS} FROM marksheet_chunk_{chunk_id}_replica_{replica_id}"))
+    finally:
+        chunk_locks.release_read(chunk_id)
+    
+    divergent, repairs = plan_anti_entropy_repairs(trees)
+    repaired = 0
+    for replica_id, rows in repairs.items():
+        table_name = f"marksheet_chunk_{chunk_id}_replica_{replica_id}"
+        with replica_set.connection(replica_id) as conn:
             cursor = conn.cursor()
-            
-            cursor.execute("UPDATE teacher_chunk_metadata SET write_locked = FALSE WHERE chunk_id = ?", (chunk_id,))
+            for row in rows:
+                repaired += upsert_marksheet_row(cursor, table_name, row, allow_equal=True)
             conn.commit()
-            conn.close()
-            
-            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Write lock released for Marksheet Chunk {chunk_id}")
-            return True
-            
-        except Exception as e:
-            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Error releasing write lock: {e}")
-            return False
+    
+    with anti_entropy_lock:
+        anti_entropy_stats["chunks_checked"] += 1
+        anti_entropy_stats["divergent_rows"] += len(divergent)
+        anti_entropy_stats["repaired_rows"] += repaired
+    
+    if divergent:
+        print(f"[{get_formatted_time()}] [TEACHER-TASK8] Anti-entropy: Marksheet Chunk {chunk_id} had {len(divergent)} divergent rows, repaired {repaired} replica rows")
+    return {"chunk_id": chunk_id, "root": trees[1].root.hex(), "divergent": len(divergent), "repaired": repaired}
 
-def write_to_marksheet_replicas(student_id, marks_update, reason=""):
-    chunk_id = get_marksheet_chunk_for_student(student_id)
+def log_marksheet_updates(cursor, entries):
+    cursor.executemany('''
+        INSERT INTO replication_log (operation, chunk_id, student_id, old_value, new_value, timestamp, version, payload, logged_at)
+        VALUES ('UPDATE_MARKS', ?, ?, ?, ?, CURRENT_TIMESTAMP, ?, ?, ?)
+    ''', [(chunk_id, row[0], str(old_marks), str(row[2]), row[-1], json.dumps(row), time.time())
+          for chunk_id, old_marks, row in entries])
+
+def commit_marksheet_on_primary(chunk_id, updates):
+    table_name = f"marksheet_chunk_{chunk_id}_replica_1"
+    outcomes = {}
+    entries = []
+    
+    with replica_set.connection(1) as conn:
+        cursor = conn.cursor()
+        for student_id, (marks, reason) in updates.items():
+            current = cursor.execute(f"SELECT {MARKSHEET_ROW_COLUMNS} FROM {table_name} WHERE roll_number = ?", (student_id,)).fetchone()
+            if current is None:
+                outcomes[student_id] = ("not_found", "student not on the primary replica", None)
+                continue
+            row = (student_id, current[1], marks, reason, marks_status(marks)) + tuple(current[5:9]) + (current[-1] + 1,)
+            upsert_marksheet_row(cursor, table_name, row)
+            entries.append((chunk_id, current[2], row))
+            outcomes[student_id] = ("applied", None, row[-1])
+        
+        log_marksheet_updates(cursor, entries)
+        conn.commit()
+    
+    if entries:
+        log_shipper.notify()
+    return outcomes, entries
+
+def write_to_marksheet_replicas(student_id, marks_update, reason="", consistency=None):
+    consistency = consistency or WRITE_CONSISTENCY
+    try:
+        chunk_id = get_marksheet_chunk_for_student(student_id)
+    except LookupError as e:
+        print(f"[{get_formatted_time()}] [TEACHER-TASK8] Marksheet write failed for student {student_id}: {e}")
+        return False
     
     if acquire_teacher_write_lock(chunk_id):
         try:
-            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Writing marksheet updates for student {student_id} to all replicas...")
-            
-            with replication_lock:
-                conn = sqlite3.connect(TEACHER_REPLICATION_DB)
-                cursor = conn.cursor()
-                
-                old_marks = 0
-                cursor.execute(f"SELECT marks FROM marksheet_chunk_{chunk_id}_replica_1 WHERE roll_number = ?", (student_id,))
-                result = cursor.fetchone()
-                if result:
-                    old_marks = result[0]
-                
-                for replica_id in range(1, 4):
-                    table_name = f"marksheet_chunk_{chunk_id}_replica_{replica_id}"
-                    
-                    cursor.execute(f'''
-                        UPDATE {table_name} 
-                        SET marks = ?, reason = ?, status = ?,
-                            last_updated = CURRENT_TIMESTAMP, version = version + 1
-                        WHERE roll_number = ?
-                    ''', (marks_update, reason, "CAUGHT" if marks_update == 0 else "WARNED" if marks_update == 50 else "ACTIVE", student_id))
-                    
-                    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Updated student {student_id} marks in {table_name}")
-                
-                cursor.execute('''
-                    INSERT INTO replication_log (operation, chunk_id, student_id, old_value, new_value, timestamp)
-                    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ''', ("UPDATE_MARKS", chunk_id, student_id, str(old_marks), str(marks_update)))
-                
-                conn.commit()
-                conn.close()
-                
-                print(f"[{get_formatted_time()}] [TEACHER-TASK8] All marksheet replicas updated successfully for student {student_id} (marks: {old_marks}→{marks_update})")
+            if TEACHER_REPLICATION_MODE == "async":
+                start = time.perf_counter()
+                outcomes, entries = commit_marksheet_on_primary(chunk_id, {student_id: (marks_update, reason)})
+                status, error, version = outcomes[student_id]
+                if status != "applied":
+                    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Marksheet write for student {student_id} failed: {error}")
+                    return False
+                print(f"[{get_formatted_time()}] [TEACHER-TASK8] Primary committed version {version} for student {student_id} in {(time.perf_counter() - start) * 1000:.2f} ms (marks: {entries[0][1]}→{marks_update}); followers catch up from the log")
                 return True
-                
+            
+            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Writing marksheet updates for student {student_id} to replicas ({consistency})...")
+            
+            current = replica_set.read(fetch_marksheet_row(chunk_id, student_id), "ALL",
+                                       repair=repair_marksheet_row(chunk_id), record=False)
+            if current["row"] is None:
+                print(f"[{get_formatted_time()}] [TEACHER-TASK8] Student {student_id} not found on any replica of Marksheet Chunk {chunk_id}")
+                return False
+            if current["stale"]:
+                print(f"[{get_formatted_time()}] [TEACHER-TASK8] Read repair: student {student_id} replicas {current['stale']} behind version {current['version']}")
+            
+            old_marks = current["row"][2]
+            row = (student_id, current["row"][1], marks_update, reason, marks_status(marks_update)) + tuple(current["row"][5:9]) + (current["version"] + 1,)
+            
+            def update_replica(replica_cursor, replica_id):
+                if not upsert_marksheet_row(replica_cursor, f"marksheet_chunk_{chunk_id}_replica_{replica_id}", row):
+                    raise ValueError(f"replica {replica_id} already holds a newer version of student {student_id}")
+            
+            results = replica_set.write(update_replica, consistency)
+            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Replica write latency for student {student_id}: {format_replica_latencies(results)}")
+            
+            acks = replica_set.acks(results)
+            if acks < replica_set.required_acks(consistency):
+                print(f"[{get_formatted_time()}] [TEACHER-TASK8] Write {consistency} failed for student {student_id}: {acks}/{replica_set.required_acks(consistency)} acks")
+                return False
+            
+            conn = sqlite3.connect(TEACHER_REPLICATION_DB)
+            log_marksheet_updates(conn.cursor(), [(chunk_id, old_marks, row)])
+            conn.commit()
+            conn.close()
+            
+            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Marksheet replicas acknowledged version {row[-1]} for student {student_id} ({acks} acks, {consistency}, marks: {old_marks}→{marks_update})")
+            return True
+            
         except Exception as e:
             print(f"[{get_formatted_time()}] [TEACHER-TASK8] Write to marksheet replicas failed: {e}")
             return False
@@ -720,15 +1026,120 @@ def write_to_marksheet_replicas(student_id, marks_update, reason=""):
     
     return False
 
+def latest_marksheet_rows(chunk_id, student_ids):
+    placeholders = ", ".join("?" for _ in student_ids)
+    
+    def fetch(cursor, replica_id):
+        cursor.execute(f"SELECT {MARKSHEET_ROW_COLUMNS} FROM marksheet_chunk_{chunk_id}_replica_{replica_id} WHERE roll_number IN ({placeholders})", student_ids)
+        return cursor.fetchall()
+    
+    latest = {}
+    for response in replica_set.collect(fetch, replica_set.replication_factor).values():
+        if response is None or isinstance(response, Exception):
+            continue
+        for row in response[0]:
+            if row[0] not in latest or row[-1] > latest[row[0]][-1]:
+                latest[row[0]] = row
+    return latest
+
+def write_marksheet_chunk_batch(chunk_id, updates, consistency):
+    if not acquire_teacher_write_lock(chunk_id):
+        return {student_id: ("failed", "write lock timeout", None) for student_id in updates}
+    try:
+        if TEACHER_REPLICATION_MODE == "async":
+            outcomes, entries = commit_marksheet_on_primary(chunk_id, {student_id: (int(update["marks"]), update.get("reason", ""))
+                                                                        for student_id, update in updates.items()})
+            print(f"[{get_formatted_time()}] [TEACHER-TASK8] Batch write to Marksheet Chunk {chunk_id}: {len(entries)} rows committed on primary, shipping to followers")
+            return outcomes
+        
+        latest = latest_marksheet_rows(chunk_id, list(updates))
+        outcomes = {student_id: ("not_found", "student not on any replica", None) for student_id in updates if student_id not in latest}
+        rows = []
+        log_entries = []
+        for student_id, update in updates.items():
+            if student_id in latest:
+                current = latest[student_id]
+                marks = int(update["marks"])
+                rows.append((student_id, current[1], marks, update.get("reason", ""), marks_status(marks)) + tuple(current[5:9]) + (current[-1] + 1,))
+                log_entries.append((chunk_id, current[2], rows[-1]))
+        if not rows:
+            return outcomes
+        
+        def update_replica(replica_cursor, replica_id):
+            replica_cursor.executemany(marksheet_upsert_sql(f"marksheet_chunk_{chunk_id}_replica_{replica_id}"), rows)
+            if replica_cursor.rowcount < len(rows):
+                raise ValueError(f"replica {replica_id} already holds newer versions for {len(rows) - replica_cursor.rowcount} rows")
+        
+        results = replica_set.write(update_replica, consistency)
+        acks = replica_set.acks(results)
+        print(f"[{get_formatted_time()}] [TEACHER-TASK8] Batch write to Marksheet Chunk {chunk_id}: {len(rows)} rows, {acks} acks ({consistency}) | {format_replica_latencies(results)}")
+        
+        if acks < replica_set.required_acks(consistency):
+            errors = "; ".join(str(result) for result in results.values() if isinstance(result, Exception))
+            outcomes.update({row[0]: ("failed", f"{acks}/{replica_set.required_acks(consistency)} acks: {errors}", None) for row in rows})
+            return outcomes
+        
+        conn = sqlite3.connect(TEACHER_REPLICATION_DB)
+        log_marksheet_updates(conn.cursor(), log_entries)
+        conn.commit()
+        conn.close()
+        
+        outcomes.update({row[0]: ("applied", None, row[-1]) for row in rows})
+        return outcomes
+    
+    except Exception as e:
+        return {student_id: ("failed", str(e), None) for student_id in updates}
+    finally:
+        release_teacher_write_lock(chunk_id)
+
+def write_batch_to_marksheet_replicas(updates, consistency=None):
+    consistency = consistency or WRITE_CONSISTENCY
+    by_chunk = {}
+    rejected = {}
+    last_index = {}
+    for index, update in enumerate(updates):
+        try:
+            student_id = int(update["student_id"])
+        except KeyError:
+            rejected[index] = (None, "missing student_id")
+            continue
+        except (TypeError, ValueError) as e:
+            rejected[index] = (None, f"invalid student_id: {e}")
+            continue
+        try:
+            chunk_id = get_marksheet_chunk_for_student(student_id)
+        except LookupError as e:
+            rejected[index] = (student_id, str(e))
+            continue
+        by_chunk.setdefault(chunk_id, {})[student_id] = update
+        last_index[student_id] = index
+    
+    mode = "async, primary only" if TEACHER_REPLICATION_MODE == "async" else consistency
+    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Batch marksheet write: {len(updates)} updates across {len(by_chunk)} chunks ({mode})")
+    
+    outcomes = {}
+    for chunk_id, chunk_updates in sorted(by_chunk.items()):
+        outcomes.update(write_marksheet_chunk_batch(chunk_id, chunk_updates, consistency))
+    
+    results = []
+    for index, update in enumerate(updates):
+        if index in rejected:
+            student_id, error = rejected[index]
+            results.append({"student_id": student_id, "status": "failed", "version": None, "error": error})
+            continue
+        student_id = int(update["student_id"])
+        status, error, version = outcomes[student_id] if last_index[student_id] == index else ("superseded", "later update in the same batch", None)
+        results.append({"student_id": student_id, "status": status, "version": version, "error": error})
+    
+    applied = sum(1 for result in results if result["status"] == "applied")
+    print(f"[{get_formatted_time()}] [TEACHER-TASK8] Batch marksheet write finished: {applied}/{len(results)} applied")
+    return {"applied": applied, "failed": len(results) - applied, "chunks": len(by_chunk), "results": results}
+
+def get_replication_lag():
+    return log_shipper.get_lag()
+
 def get_marksheet_chunk_for_student(student_id):
-    if student_id in [29, 40]:
-        return 0
-    elif student_id in [42, 50]:
-        return 1
-    elif student_id == 52:
-        return 2
-    else:
-        return 0
+    return partitioner.chunk_for(student_id)
 
 def show_replication_status():
     print(f"\n[{get_formatted_time()}] " + "="*80)
@@ -755,7 +1166,7 @@ def show_replication_status():
                 print(f"[{get_formatted_time()}] Marksheet Chunk {chunk_id} Replica {replica_id}: {node_location} ({status})")
             
             print(f"\n[{get_formatted_time()}] CURRENT MARKSHEET DATA FROM REPLICAS:")
-            for chunk_id in range(3):
+            for chunk_id in partitioner.chunk_ids():
                 table_name = f"marksheet_chunk_{chunk_id}_replica_1"
                 cursor.execute(f"SELECT roll_number, name, marks, status FROM {table_name}")
                 students_data = cursor.fetchall()
@@ -763,6 +1174,34 @@ def show_replication_status():
                 for roll, name, marks, status in students_data:
                     print(f"[{get_formatted_time()}] Marksheet Chunk {chunk_id}: {roll} ({name}) Marks: {marks} Status: {status}")
             
+            print(f"\n[{get_formatted_time()}] MARKSHEET LOCK WAITS:")
+            lock_stats = chunk_locks.get_stats()
+            for mode in ("read", "write"):
+                stats = lock_stats[mode]
+                print(f"[{get_formatted_time()}] {mode.capitalize()} locks: {stats['acquired']} acquired | avg wait {stats['avg_wait_us']} us | max wait {stats['max_wait_ms']} ms | timeouts {stats['timeouts']}")
+            
+            print(f"\n[{get_formatted_time()}] MARKSHEET REPLICA WRITE LATENCY ({replica_set.layout} layout):")
+            for replica_id, stats in replica_set.get_stats().items():
+                print(f"[{get_formatted_time()}] Replica {replica_id} ({stats['path']}): {stats['writes']} writes | avg {stats['avg_ms']} ms | p99 {stats['p99_ms']} ms | failures {stats['failures']}")
+            
+            write_default = f"writes {WRITE_CONSISTENCY} by default" if TEACHER_REPLICATION_MODE == "sync" else f"async mode writes the primary only; WRITE_CONSISTENCY={WRITE_CONSISTENCY} applies in sync mode"
+            print(f"\n[{get_formatted_time()}] MARKSHEET CONSISTENCY LEVEL LATENCY ({write_default}):")
+            consistency_stats = replica_set.get_consistency_stats()
+            for operation in ("read", "write"):
+                for consistency, stats in consistency_stats.get(operation, {}).items():
+                    print(f"[{get_formatted_time()}] {operation.capitalize()} {consistency}: {stats['count']} ok | p50 {stats['p50_ms']} ms | p95 {stats['p95_ms']} ms | p99 {stats['p99_ms']} ms | failures {stats['failures']}")
+            print(f"[{get_formatted_time()}] Read repairs issued: {consistency_stats['read_repairs']}")
+            
+            with anti_entropy_lock:
+                entropy = dict(anti_entropy_stats)
+            print(f"[{get_formatted_time()}] Anti-entropy: {entropy['passes']} passes | {entropy['chunks_checked']} chunk checks | {entropy['divergent_rows']} divergent rows | {entropy['repaired_rows']} repaired | last pass {entropy['last_pass']}")
+            
+            print(f"\n[{get_formatted_time()}] LOG SHIPPING ({TEACHER_REPLICATION_MODE} mode):")
+            lag = log_shipper.get_lag()
+            for replica, replica_lag in lag["replicas"].items():
+                print(f"[{get_formatted_time()}] {replica}: applied offset {replica_lag['applied_offset']}/{lag['log_head']} | lag {replica_lag['lag_records']} records, {replica_lag['lag_ms']} ms")
+            print(f"[{get_formatted_time()}] Shipped {lag['stats']['shipped']} entries in {lag['stats']['batches']} batches | errors {lag['stats']['errors']}")
+            
             print(f"\n[{get_formatted_time()}] RECENT REPLICATION LOG:")
             cursor.execute("SELECT operation, chunk_id, student_id, old_value, new_value, timestamp FROM replication_log ORDER BY timestamp DESC LIMIT 5")
             logs = cursor.fetchall()
@@ -785,6 +1224,7 @@ def warn_student(roll_no):
         students[roll_no]["marks"] = 50
         students[roll_no]["reason"] = "Warning"
         students[roll_no]["status"] = "WARNED"
+        bump_teacher_data_version()
         
         write_to_marksheet_replicas(roll_no, 50, "Warning")
         
@@ -800,6 +1240,7 @@ def catch_student(roll_no):
         students[roll_no]["marks"] = 0
         students[roll_no]["reason"] = "Cheating"
         students[roll_no]["status"] = "FAILED"
+        bump_teacher_data_version()
         
         write_to_marksheet_replicas(roll_no, 0, "Cheating")
         
@@ -918,8 +1359,7 @@ def receive_exam_submission(student_id, score, submission_type):
     
     server_used = "main"
     try:
-        from xmlrpc.client import ServerProxy
-        server_proxy = ServerProxy(server_url + "/RPC2", allow_none=True)
+        server_proxy = PooledServerProxy(server_url, timeout=10)
         server_stats = server_proxy.get_load_balancer_stats()
         
         global load_balancer_stats
@@ -958,6 +1398,7 @@ def receive_exam_submission(student_id, score, submission_type):
         students[student_id]["marks"] = final_marks
         students[student_id]["server_used"] = server_used
         print(f"[{get_formatted_time()}] [TEACHER] Local student data updated for roll {student_id}")
+    bump_teacher_data_version()
     
     print_results()
     return True
@@ -971,10 +1412,7 @@ def get_database_connection():
 
 def send_request_with_timeout(url, method, *args, timeout=5):
     try:
-        proxy = xmlrpc.client.ServerProxy(url + "/RPC2", allow_none=True)
-        proxy._ServerProxy__transport.timeout = timeout
-        result = getattr(proxy, method)(*args)
-        return result
+        return rpc_pool.call(url, method, *args, timeout=timeout)
     except Exception as e:
         print(f"[{get_formatted_time()}] [TEACHER-RA] Timeout/Error calling {method}: {e}")
         return False
@@ -1059,8 +1497,9 @@ def register_urls(client, server, self_):
     return True
 
 def run_teacher():
-    global clock_offset
+    global clock_offset, rpc_server
     clock_offset = input_initial_time()
+    load_partition_map()
     
     hostname = socket.gethostname()
     local_ip = socket.gethostbyname(hostname)
@@ -1075,14 +1514,17 @@ def run_teacher():
     print(f"[{get_formatted_time()}] [TEACHER] Teacher hostname: {hostname}")
     print(f"[{get_formatted_time()}] [TEACHER] Teacher IP address: {local_ip}")
     print(f"[{get_formatted_time()}] [TEACHER] Teacher server running at port 9001")
+    print(f"[{get_formatted_time()}] [TEACHER] RPC worker pool: {RPC_WORKER_THREADS} workers, queue depth {RPC_QUEUE_DEPTH}")
     print(f"[{get_formatted_time()}] [TEACHER] Database: {DB_PATH}")
     print(f"[{get_formatted_time()}] [TEACHER] Replication Database: {TEACHER_REPLICATION_DB}")
     print(f"[{get_formatted_time()}] [TEACHER-RA] Initially holding Critical Section (marksheet)")
     print(f"[{get_formatted_time()}] [TEACHER-RA] Ricart-Agrawala algorithm initialized, process ID: {my_process_id}")
     
-    with SimpleXMLRPCServer(("0.0.0.0", 9001),
-                           requestHandler=SimpleXMLRPCRequestHandler,
-                           allow_none=True) as server:
+    with PooledXMLRPCServer(("0.0.0.0", 9001),
+                            name="teacher",
+                            requestHandler=SimpleXMLRPCRequestHandler,
+                            allow_none=True) as server:
+        rpc_server = server
         
         server.register_function(get_time, "get_time")
         server.register_function(adjust_time, "adjust_time")
@@ -1103,9 +1545,12 @@ def run_teacher():
         server.register_function(initialize_replication_system, "initialize_replication_system")
         server.register_function(show_replication_status, "show_replication_status")
         server.register_function(write_to_marksheet_replicas, "write_to_marksheet_replicas")
+        server.register_function(write_batch_to_marksheet_replicas, "write_batch_to_marksheet_replicas")
+        server.register_function(get_replication_lag, "get_replication_lag")
         
         server.register_function(initialize_node_manager, "initialize_node_manager")
         server.register_function(process_teacher_job, "process_teacher_job")
+        server.register_function(execute_job, "execute_job")
         server.register_function(analyze_marksheet_data, "analyze_marksheet_data")
         server.register_function(calculate_distributed_grades, "calculate_distributed_grades")
         server.register_function(validate_exam_submissions, "validate_exam_submissions")
@@ -1117,8 +1562,8 @@ def run_teacher():
         print(f"[{get_formatted_time()}] [TEACHER] - Enhanced Marksheet: print_results (Traditional + Task 6 + Task 7 + Task 8 + Task 9)")
         print(f"[{get_formatted_time()}] [TEACHER] - Ricart-Agrawala: receive_request, receive_reply, release_critical_section")
         print(f"[{get_formatted_time()}] [TEACHER] - TASK 6 Functions: receive_exam_submission")
-        print(f"[{get_formatted_time()}] [TEACHER] - TASK 8 Functions: initialize_replication_system, show_replication_status, write_to_marksheet_replicas")
-        print(f"[{get_formatted_time()}] [TEACHER] - TASK 9 NEW: initialize_node_manager, process_teacher_job, analyze_marksheet_data, calculate_distributed_grades")
+        print(f"[{get_formatted_time()}] [TEACHER] - TASK 8 Functions: initialize_replication_system, show_replication_status, write_to_marksheet_replicas, write_batch_to_marksheet_replicas, get_replication_lag")
+        print(f"[{get_formatted_time()}] [TEACHER] - TASK 9 NEW: initialize_node_manager, execute_job, process_teacher_job, analyze_marksheet_data, calculate_distributed_grades")
         print(f"[{get_formatted_time()}] [TEACHER] Ready to handle requests with full replication and distributed processing support...")
         
         try:
@@ -0,0 +1,115 @@
+import time
+
+import server
+from common import JobResultCache
+
+def make_job(job_id, status="queued"):
+    return {"job_id": job_id, "job_type": "COUNT_STUDENTS", "status": status, "submit_time": time.time()}
+
+def test_registry_evicts_oldest_finished_jobs_past_history_size():
+    registry = server.JobRegistry(max_finished=2, max_age=3600)
+    for i in range(4):
+        registry.add(make_job(f"job_{i}"))
+    
+    for i in range(3):
+        registry.update(f"job_{i}", "completed")
+    
+    assert registry.get("job_0") is None
+    assert registry.get("job_1")["status"] == "completed"
+    assert registry.get("job_3")["status"] == "queued"
+    assert registry.get_counts() == {"queued": 1, "running": 0, "completed": 2, "failed": 0, "total": 3}
+    assert registry.evicted == 1
+
+def test_registry_evicts_finished_jobs_past_history_age():
+    registry = server.JobRegistry(max_finished=100, max_age=60)
+    registry.add(make_job("old"))
+    registry.add(make_job("new"))
+    
+    registry.update("old", "failed", completion_time=time.time() - 120)
+    registry.update("new", "completed")
+    
+    assert registry.get("old") is None
+    assert registry.get("new") is not None
+    assert registry.get_counts()["failed"] == 0
+
+def test_registry_keeps_a_resubmitted_job_when_its_old_run_is_evicted():
+    registry = server.JobRegistry(max_finished=1, max_age=3600)
+    registry.add(make_job("report"))
+    registry.update("report", "completed")
+    registry.add(make_job("report"))
+    registry.add(make_job("other"))
+    
+    registry.update("other", "completed")
+    
+    assert registry.get("report")["status"] == "queued"
+    assert registry.get_counts()["queued"] == 1
+
+def test_result_cache_evicts_least_recently_used():
+    cache = JobResultCache(capacity=2, ttl=300)
+    cache.put("a", {"count": 1})
+    cache.put("b", {"count": 2})
+    cache.get("a")
+    
+    cache.put("c", {"count": 3})
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == {"count": 1} and cache.get("c") == {"count": 3}
+    assert cache.get_stats()["evictions"] == 1
+
+def test_result_cache_expires_entries_after_ttl():
+    cache = JobResultCache(capacity=2, ttl=0)
+    cache.put("a", {"count": 1})
+    
+    assert cache.get("a") is None
+    assert cache.get_stats()["expirations"] == 1 and cache.get_stats()["size"] == 0
+
+def test_job_cache_key_follows_data_version(monkeypatch):
+    version = ["1:10"]
+    monkeypatch.setitem(server.JOB_DATA_VERSIONS, "COUNT_STUDENTS", lambda: version[0])
+    job = {"job_type": "COUNT_STUDENTS", "parameters": '{"b": 2, "a": 1}'}
+    
+    key = server.job_cache_key(job)
+    assert key == server.job_cache_key({"job_type": "COUNT_STUDENTS", "parameters": '{"a": 1, "b": 2}'})
+    
+    version[0] = "1:11"
+    assert server.job_cache_key(job) != key
+    assert server.job_cache_key({"job_type": "GENERATE_REPORT", "parameters": "{}"}) is None
+
+def placement_job(job_id, cpu_slots=1, memory_mb=512):
+    return {"job_id": job_id, "job_type": "ANALYZE_MARKSHEET",
+            "resources": {"cpu_slots": cpu_slots, "memory_mb": memory_mb, "estimated_duration": 30}}
+
+def test_reservations_place_jobs_on_the_tightest_fitting_node():
+    reservations = server.NodeReservations()
+    nodes = [("big", 8, 8192), ("small", 2, 2048)]
+    
+    placed = [reservations.place(placement_job(f"job_{i}"), nodes) for i in range(3)]
+    
+    assert placed == ["small", "small", "big"]
+    assert reservations.get_stats()["nodes"]["small"]["cpu_slots"] == 2
+
+def test_reservations_refuse_oversized_jobs_until_capacity_is_released():
+    reservations = server.NodeReservations()
+    nodes = [("teacher", 2, 1024)]
+    assert reservations.place(placement_job("first", memory_mb=768), nodes) == "teacher"
+    
+    assert reservations.place(placement_job("second", memory_mb=512), nodes) is None
+    assert reservations.get_stats()["no_fit"] == 1
+    
+    assert reservations.release("first")
+    assert reservations.place(placement_job("second", memory_mb=512), nodes) == "teacher"
+
+def test_placement_measures_memory_against_total_memory(monkeypatch):
+    monkeypatch.setattr(server, "node_reservations", server.NodeReservations())
+    monkeypatch.setattr(server, "cluster_resources", {
+        "teacher": {
+            "capabilities": ["ANALYZE_MARKSHEET"],
+            "heartbeat": time.time(),
+            "resources": {"cpu_percent": 20, "memory_percent": 60, "disk_free": 10, "cpu_count": 4,
+                          "memory_available": 256, "memory_total": 4096}
+        }
+    })
+    job = placement_job("report", memory_mb=1024)
+    
+    assert server.select_best_node_for_job(job)
+    assert job["assigned_node"] == "teacher"
@@ -0,0 +1,87 @@
+import sqlite3
+
+import pytest
+
+import server
+from common import ReplicaSet
+
+@pytest.fixture
+def replicas(tmp_path, monkeypatch):
+    path = str(tmp_path / "marksheet_replicated.db")
+    replica_set = ReplicaSet(server.db_pool, path, layout="per_node")
+    monkeypatch.setattr(server, "REPLICATION_DB_PATH", path)
+    monkeypatch.setattr(server, "replica_set", replica_set)
+    server.setup_replication_database()
+    server.create_chunks_and_replicas()
+    yield replica_set
+    replica_set.executor.shutdown(wait=True)
+
+def replica_table(replica_id, student_id=29):
+    return f"chunk_{server.get_chunk_for_student(student_id)}_replica_{replica_id}"
+
+def replica_version(replicas, replica_id, student_id=29):
+    with replicas.connection(replica_id) as conn:
+        return conn.execute(f"SELECT version FROM {replica_table(replica_id, student_id)} WHERE roll_number = ?", (student_id,)).fetchone()[0]
+
+def write_failing_on(down):
+    def apply(cursor, replica_id):
+        if replica_id in down:
+            raise sqlite3.OperationalError(f"replica {replica_id} is down")
+        cursor.execute(f"UPDATE {replica_table(replica_id)} SET ISA = 70 WHERE roll_number = 29")
+    return apply
+
+def test_write_acks_follow_consistency_level(replicas):
+    assert [replicas.required_acks(level) for level in ("ONE", "QUORUM", "ALL")] == [1, 2, 3]
+    
+    results = replicas.write(write_failing_on({3}), "ALL")
+    assert replicas.acks(results) == 2
+    assert isinstance(results[3], sqlite3.OperationalError)
+    
+    results = replicas.write(write_failing_on({3}), "QUORUM")
+    assert replicas.acks(results) >= replicas.required_acks("QUORUM")
+    
+    results = replicas.write(write_failing_on({2, 3}), "QUORUM")
+    assert replicas.acks(results) == 1
+    
+    results = replicas.write(write_failing_on({2, 3}), "ONE")
+    assert replicas.acks(results) >= replicas.required_acks("ONE")
+
+def test_read_fails_over_to_the_next_replica(replicas):
+    with replicas.connection(3) as conn:
+        conn.execute(f"DROP TABLE {replica_table(3)}")
+        conn.commit()
+    fetch = server.fetch_replica_row(server.get_chunk_for_student(29), 29)
+    
+    assert replicas.read(fetch, "QUORUM")["succeeded"]
+    outcome = replicas.read(fetch, "ALL")
+    assert not outcome["succeeded"] and outcome["acks"] == 2
+
+def test_write_with_older_version_is_rejected(replicas):
+    with replicas.connection(3) as conn:
+        conn.execute(f"UPDATE {replica_table(3)} SET ISA = 99, version = 10 WHERE roll_number = 29")
+        conn.commit()
+    row = (29, "Mayuresh", 70, 80, 90, 240, 2)
+    
+    def update(cursor, replica_id):
+        if not server.upsert_replica_row(cursor, replica_table(replica_id), row):
+            raise ValueError(f"replica {replica_id} holds a newer version")
+    
+    results = replicas.write(update, "ALL")
+    
+    assert replicas.acks(results) == 2
+    assert isinstance(results[3], ValueError)
+    assert [replica_version(replicas, replica_id) for replica_id in (1, 2, 3)] == [2, 2, 10]
+
+def test_read_returns_newest_version_and_repairs_stale_replicas(replicas):
+    with replicas.connection(2) as conn:
+        conn.execute(f"UPDATE {replica_table(2)} SET ISA = 10, version = 5 WHERE roll_number = 29")
+        conn.commit()
+    chunk_id = server.get_chunk_for_student(29)
+    
+    outcome = replicas.read(server.fetch_replica_row(chunk_id, 29), "ALL", repair=server.repair_replica_row(chunk_id))
+    replicas.executor.shutdown(wait=True)
+    
+    assert outcome["version"] == 5 and outcome["row"][2] == 10
+    assert sorted(outcome["stale"]) == [1, 3]
+    assert [replica_version(replicas, replica_id) for replica_id in (1, 2, 3)] == [5, 5, 5]
+    assert replicas.get_consistency_stats()["read_repairs"] == 2
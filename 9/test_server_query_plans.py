@@ -0,0 +1,23 @@
+import sqlite3
+
+import server
+
+def test_hot_queries_use_indexes(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "exam_system.db")
+    monkeypatch.setattr(server, "DB_PATH", db_path)
+    server.init_database()
+    
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(server.SCHEMA_MIGRATIONS)
+        assert server.check_query_plans(conn) == []
+    finally:
+        conn.close()
+
+def test_check_query_plans_reports_full_scans():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE submission_db (server_used TEXT, score INTEGER)")
+    
+    problems = server.check_query_plans(conn, {"by_server": ("SELECT score FROM submission_db WHERE server_used = ?", ("main",))})
+    
+    assert len(problems) == 1 and problems[0].startswith("by_server: full table scan")